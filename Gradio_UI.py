@@ -17,6 +17,7 @@ import mimetypes
 import os
 import re
 import shutil
+import uuid
 from typing import Optional
 
 from smolagents.agent_types import AgentAudio, AgentImage, AgentText, handle_agent_output_types
@@ -24,11 +25,48 @@ from smolagents.agents import ActionStep, MultiStepAgent
 from smolagents.memory import MemoryStep
 from smolagents.utils import _is_package_available
 
+from tools.answer_builder import AnswerBuilder, bind_answer_builder
+from tools.answer_formatter import parse_model_output
+from tools.image_jobs import DEFAULT_IMAGE_TIMEOUT, get_image_jobs, strip_handles
+from tools.image_postprocess import display_image, expanded_image, thumbnail_image
+from tools.observation_store import ObservationStore, preview
+from tools.session_store import Session, SessionStore, get_session_store
+
+# Messages kept in the chat window; older ones stay in the session history (0 shows everything)
+HISTORY_WINDOW = int(os.environ.get("JOURNI_CHAT_HISTORY_WINDOW", "60"))
+
+EXECUTION_LOGS_PATTERN = re.compile(r"^Execution logs:\s*")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+UNSAFE_FILENAME_PATTERN = re.compile(r"[^\w\-.]")
+
+
+def observation_message(content: str, label: str, step_id: str, expanded: bool = False):
+    """
+    A collapsible message holding `content`, or only its preview until the user expands it.
+
+    The metadata id is the step id under which the full text is kept in the session's ObservationStore.
+    """
+    import gradio as gr
+
+    action = "select to collapse" if expanded else "select to show all"
+    return gr.ChatMessage(
+        role="assistant",
+        content=content if expanded else preview(content),
+        metadata={"title": f"{label} · {len(content):,} characters · {action}", "id": step_id, "status": "done"},
+    )
+
 
 def pull_messages_from_step(
     step_log: MemoryStep,
+    observations: Optional[ObservationStore] = None,
+    step_id: Optional[str] = None,
 ):
-    """Extract ChatMessage objects from agent steps with proper nesting"""
+    """
+    Extract ChatMessage objects from agent steps with proper nesting
+
+    With an `observations` store, long observations are shown as a preview and
+    their full text is kept in the store under `step_id`.
+    """
     import gradio as gr
 
     if isinstance(step_log, ActionStep):
@@ -44,15 +82,8 @@ def pull_messages_from_step(
             # Clean up the LLM output
             model_output = step_log.model_output.strip()
             
-            # Extract the thought process
-            thought_match = re.search(r"Thought:(.*?)(?:Code:|$)", model_output, re.DOTALL)
-            if thought_match:
-                thought_content = thought_match.group(1).strip()
-            
-            # Extract the code
-            code_match = re.search(r"Code:\s*```(?:python|py)?\s*(.*?)(?:```|<end_code>)", model_output, re.DOTALL)
-            if code_match:
-                code_content = code_match.group(1).strip()
+            # Thought and code in one scan
+            thought_content, code_content = parse_model_output(model_output)
             
             # Create a single step message with thought and code
             if step_number:
@@ -71,11 +102,17 @@ def pull_messages_from_step(
                 log_content = step_log.observations.strip()
                 if log_content:
                     # Remove "Execution logs:" prefix if present
-                    log_content = re.sub(r"^Execution logs:\s*", "", log_content)
+                    log_content = EXECUTION_LOGS_PATTERN.sub("", log_content, count=1)
+                    # Background image handles are replaced by the image itself once it is ready
+                    log_content = strip_handles(log_content).strip()
                     
                     # Format the output based on content type
                     if "Generated image" in log_content:
                         yield gr.ChatMessage(role="assistant", content=log_content)
+                    elif observations is not None and preview(log_content) is not None:
+                        observations.add(step_id, log_content)
+                        label = "Search Results" if tool_name in ["web_search", "visit_webpage"] else "Tool output"
+                        yield observation_message(log_content, label, step_id)
                     elif tool_name in ["web_search", "visit_webpage"]:
                         yield gr.ChatMessage(role="assistant", content=f"**Search Results:**\n\n{log_content}")
                     else:
@@ -92,13 +129,48 @@ def pull_messages_from_step(
         # Don't show step footers or separators to keep the display cleaner and more like in the screenshots
 
 
+def image_message(path: str, thumbnail: bool = False):
+    """Build a chat message displaying the compressed version of the image at `path`, or its thumbnail."""
+    import gradio as gr
+
+    path = thumbnail_image(path) if thumbnail else display_image(path)
+    mime_type = mimetypes.guess_type(path)[0] or "image/png"
+    return gr.ChatMessage(role="assistant", content={"path": path, "mime_type": mime_type})
+
+
+def image_path(message) -> Optional[str]:
+    """Path of the image an image message shows, None for any other message."""
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+    return content.get("path") if isinstance(content, dict) else None
+
+
+def message_dict(message) -> dict:
+    """A chat message as plain data, for the session store."""
+    if isinstance(message, dict):
+        return message
+    return {"role": message.role, "content": message.content, "metadata": dict(message.metadata or {})}
+
+
 def stream_to_gradio(
     agent,
     task: str,
     reset_agent_memory: bool = False,
     additional_args: Optional[dict] = None,
+    image_timeout: float = DEFAULT_IMAGE_TIMEOUT,
+    observations: Optional[ObservationStore] = None,
 ):
-    """Runs an agent with the given task and streams the messages from the agent as gradio ChatMessages."""
+    """
+    Runs an agent with the given task and streams the messages from the agent as gradio ChatMessages.
+
+    Images rendered in the background by `generate_image` are inserted as soon as they
+    are ready, or when the final answer arrives, whichever comes first. An image that is
+    still rendering `image_timeout` seconds after it was requested is dropped.
+
+    Sections added with `add_answer_section` are shown after the step that added them;
+    the final answer then only repeats what the user hasn't seen yet.
+
+    Long observations are shortened to a preview when an `observations` store is given to keep them in.
+    """
     if not _is_package_available("gradio"):
         raise ModuleNotFoundError(
             "Please install 'gradio' extra to use the GradioUI: `pip install 'smolagents[gradio]'`"
@@ -108,13 +180,28 @@ def stream_to_gradio(
     total_input_tokens = 0
     total_output_tokens = 0
 
+    image_jobs = get_image_jobs()
+    pending_images = {}  # Background image jobs seen in this run but not shown yet
+    answer = AnswerBuilder()
+    # Step numbers restart with every run, so observations are kept under run id + step number
+    run_id = uuid.uuid4().hex[:8]
+
     # For MAS, add a welcome message
     yield gr.ChatMessage(
         role="assistant", 
         content="🧳 **I'm Journi, your AI travel companion!** I'll use multiple specialized agents to help you plan your perfect trip."
     )
 
-    for step_log in agent.run(task, stream=True, reset=reset_agent_memory, additional_args=additional_args):
+    run = agent.run(task, stream=True, reset=reset_agent_memory, additional_args=additional_args)
+    while True:
+        # Tools find this run's answer builder through a context variable. It is bound around
+        # each step because Gradio may resume this generator on a different thread.
+        with bind_answer_builder(answer):
+            step_log = next(run, None)
+        if step_log is None:
+            break
+        final_answer = step_log  # Last log is the run's final_answer
+
         # Track tokens if model provides them
         if hasattr(agent.model, "last_input_token_count"):
             total_input_tokens += agent.model.last_input_token_count
@@ -125,54 +212,191 @@ def stream_to_gradio(
 
         for message in pull_messages_from_step(
             step_log,
+            observations,
+            f"{run_id}-{getattr(step_log, 'step_number', None)}",
         ):
             yield message
 
-    final_answer = step_log  # Last log is the run's final_answer
+        # Answer sections are shown as soon as their step is done
+        for section in answer.take_new():
+            yield gr.ChatMessage(role="assistant", content=strip_handles(section.render()).strip())
+
+        # Deliver background images as soon as they are ready
+        if isinstance(step_log, ActionStep):
+            for job in image_jobs.find(step_log.observations or ""):
+                pending_images.setdefault(job.id, job)
+        for job_id, job in list(pending_images.items()):
+            if job.done():
+                del pending_images[job_id]
+                if job.path():
+                    yield image_message(job.path())
+
     final_answer = handle_agent_output_types(final_answer)
 
+    # Images still rendering get until their timeout, then the answer ships without them
+    if isinstance(final_answer, (AgentText, str)):
+        for job in image_jobs.find(str(final_answer)):
+            pending_images.setdefault(job.id, job)
+    for job in pending_images.values():
+        image_path = job.wait(image_timeout)
+        if image_path:
+            yield image_message(image_path)
+
     if isinstance(final_answer, AgentText):
-        yield gr.ChatMessage(
-            role="assistant",
-            content=f"**Final answer:**\n{final_answer.to_string()}\n",
-        )
+        # Sections already streamed are not sent twice
+        final_text = strip_handles(final_answer.to_string())
+        for section in answer.streamed():
+            final_text = final_text.replace(strip_handles(section), "")
+        final_text = BLANK_LINES_PATTERN.sub("\n\n", final_text).strip()
+        if final_text or not answer.streamed():
+            yield gr.ChatMessage(role="assistant", content=f"**Final answer:**\n{final_text}\n")
     elif isinstance(final_answer, AgentImage):
-        yield gr.ChatMessage(
-            role="assistant",
-            content={"path": final_answer.to_string(), "mime_type": "image/png"},
-        )
+        yield image_message(final_answer.to_string())
     elif isinstance(final_answer, AgentAudio):
         yield gr.ChatMessage(
             role="assistant",
             content={"path": final_answer.to_string(), "mime_type": "audio/wav"},
         )
     else:
-        yield gr.ChatMessage(role="assistant", content=f"**Final answer:** {str(final_answer)}")
+        yield gr.ChatMessage(role="assistant", content=f"**Final answer:** {strip_handles(str(final_answer))}")
+
+
+class ChatView:
+    """
+    The part of a conversation that is sent to the browser.
+
+    Gradio re-sends a streaming output on every yield, as a diff against the
+    previous value, so the cost of a yield depends on how much of the list
+    changed. The view shows at most `window` messages and, once the history
+    outgrows it, drops older messages half a window at a time: between jumps,
+    earlier messages keep their positions and each yield only carries the new
+    or changed messages. Yields that would change nothing are skipped.
+    """
+
+    def __init__(self, history: list, window: int = HISTORY_WINDOW):
+        self.history = history
+        self.window = window
+        self.last = None
+
+    def start(self) -> int:
+        """Index of the first visible message: moves in steps of half a window."""
+        overflow = len(self.history) - self.window
+        if not self.window or overflow <= 0:
+            return 0
+        step = max(1, self.window // 2)
+        return -(-overflow // step) * step
+
+    def update(self) -> Optional[list]:
+        """The visible messages, or None if they are the same as in the previous update."""
+        import gradio as gr
+
+        start = self.start()
+        signature = (start, len(self.history), id(self.history[-1]) if self.history else None)
+        if signature == self.last:
+            return None
+        self.last = signature
+
+        visible = self.history[start:]
+        if start:
+            visible.insert(0, gr.ChatMessage(role="assistant", content=f"_{start} earlier messages are not shown._"))
+        return visible
+
+    def history_index(self, visible_index: int) -> Optional[int]:
+        """Position in the history of the message at `visible_index` in the chat, None for the hidden-messages note."""
+        start = self.start()
+        index = start + visible_index - (1 if start else 0)
+        return index if start <= index < len(self.history) else None
 
 
 class GradioUI:
     """A one-line interface to launch your agent in Gradio"""
 
-    def __init__(self, agent: MultiStepAgent, file_upload_folder: str | None = None):
+    def __init__(
+        self,
+        agent: MultiStepAgent,
+        file_upload_folder: str | None = None,
+        history_window: int = HISTORY_WINDOW,
+        session_store: Optional[SessionStore] = None,
+    ):
         if not _is_package_available("gradio"):
             raise ModuleNotFoundError(
                 "Please install 'gradio' extra to use the GradioUI: `pip install 'smolagents[gradio]'`"
             )
         self.agent = agent
         self.file_upload_folder = file_upload_folder
+        self.history_window = history_window
+        self.session_store = session_store or get_session_store()
         if self.file_upload_folder is not None:
             if not os.path.exists(file_upload_folder):
                 os.mkdir(file_upload_folder)
 
-    def interact_with_agent(self, prompt, messages):
+    def interact_with_agent(self, prompt, history, observations, session_id=None):
         import gradio as gr
 
-        messages.append(gr.ChatMessage(role="user", content=prompt))
-        yield messages
-        for msg in stream_to_gradio(self.agent, task=prompt, reset_agent_memory=False):
-            messages.append(msg)
-            yield messages
-        yield messages
+        if session_id:
+            # The agent is shared by all sessions: it continues from this session's saved memory
+            saved = self.session_store.load(session_id)
+            self.agent.memory.steps = list(saved.steps) if saved else []
+
+        # The full conversation stays server-side in `history`; the chat only gets the visible window
+        view = ChatView(history, self.history_window)
+        history.append(gr.ChatMessage(role="user", content=prompt))
+        try:
+            yield view.update()
+            for msg in stream_to_gradio(self.agent, task=prompt, reset_agent_memory=False, observations=observations):
+                history.append(msg)
+                visible = view.update()
+                if visible is not None:
+                    yield visible
+        finally:
+            # Saved even when the run fails or the user leaves, so a reconnect resumes from here
+            if session_id:
+                self.save_session(session_id, history, observations)
+
+    def save_session(self, session_id, history, observations):
+        self.session_store.save(
+            session_id,
+            Session([message_dict(message) for message in history], list(self.agent.memory.steps), dict(observations.entries)),
+        )
+
+    def restore_session(self, session_id):
+        """
+        The session of a (re)connecting browser: its id, history, observations and visible chat.
+
+        A browser without a session gets a new id; one whose session was evicted starts an empty chat.
+        """
+        import gradio as gr
+
+        session_id = session_id or uuid.uuid4().hex
+        saved = self.session_store.load(session_id)
+        history = [gr.ChatMessage(**message) for message in saved.history] if saved else []
+        # Earlier images come back as thumbnails, so a reconnect stays light; selecting one shows it in full
+        for index, message in enumerate(history):
+            if image_path(message):
+                history[index] = image_message(image_path(message), thumbnail=True)
+        observations = ObservationStore()
+        if saved:
+            observations.entries.update(saved.observations)
+        return session_id, history, observations, ChatView(history, self.history_window).update()
+
+    def toggle_observation(self, history, observations, evt):
+        """Expand a shortened observation or image thumbnail the user selected, or collapse it back."""
+        view = ChatView(history, self.history_window)
+        selected = evt.index[0] if isinstance(evt.index, (list, tuple)) else evt.index
+        index = view.history_index(selected)
+        message = history[index] if index is not None else None
+        path = image_path(message) if message is not None else None
+        if path:
+            expanded = expanded_image(path)
+            history[index] = image_message(expanded) if expanded else image_message(path, thumbnail=True)
+            return view.update()
+        metadata = getattr(message, "metadata", None) or {}
+        content = observations.get(metadata["id"]) if "id" in metadata else None
+        # Anything else (or an observation evicted from the store) leaves the chat as it is
+        if content is not None:
+            label = metadata["title"].split(" · ")[0]
+            history[index] = observation_message(content, label, metadata["id"], expanded=message.content != content)
+        return view.update()
 
     def upload_file(
         self,
@@ -202,8 +426,8 @@ class GradioUI:
 
         # Sanitize file name
         original_name = os.path.basename(file.name)
-        sanitized_name = re.sub(
-            r"[^\w\-.]", "_", original_name
+        sanitized_name = UNSAFE_FILENAME_PATTERN.sub(
+            "_", original_name
         )  # Replace any non-alphanumeric, non-dash, or non-dot characters with underscores
 
         type_to_ext = {}
@@ -239,6 +463,14 @@ class GradioUI:
         with gr.Blocks(fill_height=True) as demo:
             stored_messages = gr.State([])
             file_uploads_log = gr.State([])
+            # Every message of the session, of which the chatbot shows the latest window
+            chat_history = gr.State([])
+            # Full text of the observations the chat only shows a preview of
+            observations = gr.State(ObservationStore())
+            # Kept in the browser's local storage, so a reload or a reconnect after a restart resumes the chat.
+            # Gradio versions without BrowserState keep the chat in memory only.
+            browser_state = getattr(gr, "BrowserState", None)
+            session_id = browser_state(None, storage_key="journi_session") if browser_state else gr.State(None)
             chatbot = gr.Chatbot(
                 label="Journi - Your AI Travel Companion",
                 type="messages",
@@ -263,7 +495,21 @@ class GradioUI:
                 self.log_user_message,
                 [text_input, file_uploads_log],
                 [stored_messages, text_input],
-            ).then(self.interact_with_agent, [stored_messages, chatbot], [chatbot])
+            ).then(
+                self.interact_with_agent,
+                [stored_messages, chat_history, observations, session_id],
+                [chatbot],
+                # One run at a time: sessions take turns with the shared agent's memory
+                concurrency_limit=1,
+            )
+
+            def toggle_observation(history, observations, evt: gr.SelectData):
+                return self.toggle_observation(history, observations, evt)
+
+            chatbot.select(toggle_observation, [chat_history, observations], [chatbot])
+
+            if browser_state:
+                demo.load(self.restore_session, [session_id], [session_id, chat_history, observations, chatbot])
 
         demo.launch(debug=True, share=True, **kwargs)
 
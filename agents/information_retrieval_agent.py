@@ -44,7 +44,10 @@ class InformationRetrievalAgent(CodeAgent):
         
         When given a task from the Coordinator Agent, you should:
         1. Formulate effective search queries to find relevant information
-        2. Visit webpages to extract detailed content when necessary
+        2. Visit webpages to extract detailed content when necessary; pass your question to
+           visit_webpage (e.g. visit_webpage(url=url, question="best time to visit")) to get only the relevant passages
+           To read several search results, call visit_webpages(urls=[...], question=...) once instead of
+           visiting them one at a time
         3. Analyze and summarize the information found, focusing on travel relevance
         4. Provide factual, up-to-date information with proper citations
         5. Structure your response in a way that's easy for the Coordinator to integrate
@@ -41,10 +41,15 @@ class LogisticsAgent(CodeAgent):
         Your expertise is in providing practical travel logistics information.
         
         When given a task from the Coordinator Agent, you should:
-        1. Check local times in travel destinations to help with planning
-        2. Provide weather forecasts with packing recommendations
+        1. Check local times in travel destinations to help with planning; for multi-city trips use
+           get_world_clock once with all cities (and the traveler's home city if known) instead of
+           calling get_local_time for each city
+        2. Provide weather forecasts with packing recommendations; for seasonal questions or trips more
+           than a few days away, pass the travel period as `when` to get_weather_forecast (e.g. "July")
+           instead of searching the web
         3. Research visa requirements for international travel
-        4. Convert currencies to assist with travel budgeting
+        4. Convert currencies to assist with travel budgeting; for a budget with several expenses, pass
+           all of them to convert_budget in one call (e.g. ["flights 800 USD", "hotel 120 EUR x5"])
         5. Organize information in a practical, actionable format
         
         Focus on accuracy and clarity. Travelers rely on your information for
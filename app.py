@@ -4,19 +4,25 @@
 
 from smolagents import CodeAgent, HfApiModel, load_tool
 import datetime
+import threading
 import yaml
 import os
 from Gradio_UI import GradioUI
 
 # Tool imports - using the exact filenames available in the tools directory
 from tools.final_answer_tool import FinalAnswerTool
+from tools.add_answer_section import AddAnswerSectionTool
 from tools.web_search import DuckDuckGoSearchTool
 from tools.visit_webpage import VisitWebpageTool
+from tools.visit_webpages import VisitWebpagesTool
 from tools.generate_image_tool import GenerateImageTool
 from tools.get_local_time import GetLocalTimeTool
+from tools.get_world_clock import GetWorldClockTool
 from tools.get_weather_forecast import GetWeatherForecastTool
 from tools.convert_currency import ConvertCurrencyTool
+from tools.convert_budget import ConvertBudgetTool
 from tools.translate_phrase import TranslatePhraseTool
+from tools.translate_phrases import TranslatePhrasesTool
 from tools.get_visa_requirements import GetVisaRequirementsTool
 from tools.search_accommodations import SearchAccommodationsTool
 
@@ -37,17 +43,37 @@ def initialize_tools():
     """Initialize all tools used by the agents."""
     return {
         'final_answer': FinalAnswerTool(),
+        'add_answer_section': AddAnswerSectionTool(),
         'web_search': DuckDuckGoSearchTool(max_results=5),
         'visit_webpage': VisitWebpageTool(),
+        'visit_webpages': VisitWebpagesTool(),
         'generate_image': GenerateImageTool(),
         'get_local_time': GetLocalTimeTool(),
+        'get_world_clock': GetWorldClockTool(),
         'get_weather_forecast': GetWeatherForecastTool(),
         'convert_currency': ConvertCurrencyTool(),
+        'convert_budget': ConvertBudgetTool(),
         'translate_phrase': TranslatePhraseTool(),
+        'translate_phrases': TranslatePhrasesTool(),
         'get_visa_requirements': GetVisaRequirementsTool(),
         'search_accommodations': SearchAccommodationsTool(max_results=8),
     }
 
+def preseed_image_cache(tools):
+    """
+    Render the most popular destinations in the background so their images are
+    served from the cache. Enabled by setting JOURNI_PRESEED_IMAGES to the number
+    of destinations to pre-render.
+    """
+    top_n = int(os.environ.get("JOURNI_PRESEED_IMAGES", "0"))
+    if top_n > 0:
+        threading.Thread(
+            target=tools['generate_image'].preseed,
+            kwargs={'top_n': top_n},
+            name="image-cache-preseed",
+            daemon=True,
+        ).start()
+
 # ==================== PROMPT TEMPLATES ====================
 
 def create_coordinator_prompt_templates():
@@ -58,13 +84,14 @@ def create_coordinator_prompt_templates():
     and delegate these tasks to the appropriate specialized agents.
     
     You have access to these specialized agents:
-    1. information_retrieval_agent - For web search and visiting webpages
+    1. information_retrieval_agent - For web search and visiting webpages (several at once)
     2. language_culture_agent - For translations and cultural information
     3. logistics_agent - For time, weather, visas, and currency
     4. recommendation_agent - For destination recommendations, accommodation searches, and activities
     
-    You also have a direct tool:
+    You also have direct tools:
     - generate_image - Creates a visual image of any destination or travel scene
+    - add_answer_section - Adds a section to the final answer and shows it to the user right away
     
     IMPORTANT: Your output should be step-by-step, showing progress at each stage. Each step should be
     self-contained and include your thought process before executing the code.
@@ -76,13 +103,18 @@ def create_coordinator_prompt_templates():
       ```python
       destination = "Brazil"  # Extract the exact destination from user query
       destination_image = generate_image(prompt=destination)
-      print(f"Generated image of {destination}")
+      print(f"Generated image of {destination}: {destination_image}")
       ```
+    - The image renders in the background and is shown to the user when it is ready, so do not
+      wait for it: move on to STEP 2 right away and keep {str(destination_image)} in the final answer
     
     STEP 2: Get weather information and visa requirements
     STEP 3: Get currency information and cultural information
     STEP 4: Get recommendations and create the final comprehensive answer
     
+    The user sees each part of the answer as soon as it is ready: as soon as an agent returns, add its
+    result as a section of the final answer with add_answer_section, in the same step.
+    
     For each step, use this format:
     ```python
     # STEP X: Brief description of what you're doing in this step
@@ -94,40 +126,23 @@ def create_coordinator_prompt_templates():
     # Print results to show progress
     print(result)
     
+    # Add what the user should read to the answer right away
+    add_answer_section(title="Weather Information", content=weather)
+    
     # Use final_answer ONLY in the final step
     ```
     
-    When creating the comprehensive answer in the final step, use clear formatting with proper spacing:
+    Use these section titles, in this order: "Welcome to {destination}!" (with {str(destination_image)} and a short
+    overview), "Weather Information", "Visa Requirements", "Currency", "Cultural Information",
+    "Top Destinations and Activities". In the final step, add the last section and pass the document
+    add_answer_section returns to final_answer:
     
     ```python
-    comprehensive_answer = f'''
-    {str(destination_image)}
-    
-    ## Welcome to {destination}!
-    
-    Here's what you should know about visiting:
-    
-    {info}
-    
-    ### Weather Information:
-    {weather}
-    
-    ### Visa Requirements:
-    {visa_info}
-    
-    ### Currency:
-    {currency_info}
-    
-    ### Cultural Information:
-    {cultural_info}
-    
-    ### Top Destinations and Activities:
-    {recommendations}
-    
-    {destination} is a wonderful place to visit with its vibrant culture, stunning landscapes, and warm hospitality. Enjoy your trip!
-    '''
-    
-    final_answer(comprehensive_answer)
+    answer = add_answer_section(
+        title="Top Destinations and Activities",
+        content=f"{recommendations}\\n\\n{destination} is a wonderful place to visit with its vibrant culture, stunning landscapes, and warm hospitality. Enjoy your trip!",
+    )
+    final_answer(answer)
     ```
     
     For GENERAL queries about your capabilities, features, or non-destination topics, DO NOT generate images.
@@ -152,11 +167,12 @@ def create_multi_agent_system():
     """
     model = create_model()
     tools = initialize_tools()
+    preseed_image_cache(tools)
     
     # Create specialized agents with correct tool assignments and increased verbosity
     information_retrieval_agent = CodeAgent(
         model=model,
-        tools=[tools['web_search'], tools['visit_webpage']], 
+        tools=[tools['web_search'], tools['visit_webpage'], tools['visit_webpages']], 
         max_steps=3,
         verbosity_level=2,  # Increased verbosity to show thought process
         name="information_retrieval_agent",
@@ -165,7 +181,7 @@ def create_multi_agent_system():
     
     language_culture_agent = CodeAgent(
         model=model,
-        tools=[tools['translate_phrase']],
+        tools=[tools['translate_phrase'], tools['translate_phrases']],
         max_steps=2,
         verbosity_level=2,  # Increased verbosity to show thought process
         name="language_culture_agent",
@@ -176,9 +192,11 @@ def create_multi_agent_system():
         model=model,
         tools=[
             tools['get_local_time'], 
+            tools['get_world_clock'],
             tools['get_weather_forecast'],
             tools['get_visa_requirements'],
-            tools['convert_currency']
+            tools['convert_currency'],
+            tools['convert_budget']
         ],
         max_steps=4,
         verbosity_level=2,  # Increased verbosity to show thought process
@@ -200,7 +218,7 @@ def create_multi_agent_system():
     
     coordinator_agent = CodeAgent(
         model=model,
-        tools=[tools['final_answer'], tools['generate_image']],
+        tools=[tools['final_answer'], tools['add_answer_section'], tools['generate_image']],
         managed_agents=[information_retrieval_agent, language_culture_agent, logistics_agent, recommendation_agent],
         max_steps=8,
         verbosity_level=2,  # Increased verbosity to show thought process
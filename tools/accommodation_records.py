@@ -0,0 +1,127 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import re
+from tools.gazetteer import normalize_place
+
+# Accommodation types, most specific first: a "capsule hotel" is not just a hotel
+KINDS = [
+    ("capsule hotel", ["capsule"]),
+    ("ryokan", ["ryokan", "onsen inn"]),
+    ("hostel", ["hostel", "hostels", "backpackers", "dorm", "dorms"]),
+    ("guesthouse", ["guesthouse", "guesthouses", "guest house", "homestay", "b b", "bed and breakfast", "pension", "riad"]),
+    ("apartment", ["apartment", "apartments", "aparthotel", "flat", "condo", "vacation rental", "holiday rental", "airbnb"]),
+    ("villa", ["villa", "villas", "bungalow", "bungalows"]),
+    ("resort", ["resort", "resorts"]),
+    ("hotel", ["hotel", "hotels", "motel"]),
+]
+
+# Words that place a listing, or a requested budget, in a price tier
+TIERS = [
+    ("luxury", ["luxury", "luxurious", "5 star", "five star", "upscale", "high end", "premium", "deluxe", "palace", "splurge"]),
+    ("budget", ["budget", "cheap", "cheapest", "affordable", "low cost", "inexpensive", "backpacker", "backpackers", "economy"]),
+    ("mid-range", ["mid range", "midrange", "mid", "moderate", "3 star", "three star", "4 star", "four star", "boutique", "good value"]),
+]
+
+# Nightly prices in $/€/£: under 60 is budget, under 200 mid-range, luxury above
+PRICE_PATTERN = re.compile(r"(?:US\$|\$|€|£)\s?(\d{1,3}(?:,\d{3})*|\d+)(?:\.\d+)?|(\d{1,3}(?:,\d{3})*|\d+)(?:\.\d+)?\s?(?:USD|EUR|GBP)\b")
+PRICE_TIERS = [(60, "budget"), (200, "mid-range"), (float("inf"), "luxury")]
+
+# "in Shinjuku", "near the Old Town", "located in Alfama": capitalized words after a place preposition
+AREA_PATTERN = re.compile(
+    r"\b(?:in|near|at|located in|heart of|steps from|close to|district of|neighbou?rhood of)\s+(?:the\s+)?"
+    r"((?:[A-Z][\w'’-]*)(?:[ -](?:de |da |do |del |la |le )?[A-Z][\w'’-]*){0,3})"
+)
+# Capitalized words that are never an area
+NOT_AREAS = frozenset("the a our your all city center centre downtown hotel hotels book booking best top free great one".split())
+
+# Site names and boilerplate around page titles: "Hotel X - Booking.com", "THE 10 BEST ... (Updated 2025)"
+TITLE_NOISE = re.compile(r"\s*(?:[|–—-]\s*(?:Booking\.com|Tripadvisor|Expedia|Hotels\.com|Agoda|Hostelworld|Airbnb|Kayak|Trivago)\b.*|\((?:Updated )?\d{4}[^)]*\))\s*$", re.IGNORECASE)
+
+
+class Accommodation(NamedTuple):
+    name: str
+    url: str
+    # "budget", "mid-range" or "luxury" when the listing says so
+    tier: Optional[str]
+    # One of the KINDS names
+    kind: Optional[str]
+    area: Optional[str]
+    snippet: str
+
+
+def _find(text: str, table) -> Optional[str]:
+    padded = f" {text} "
+    for value, words in table:
+        if any(f" {word} " in padded for word in words):
+            return value
+    return None
+
+
+def resolve_kind(text: Optional[str]) -> Optional[str]:
+    """'hostels' -> 'hostel', 'B&B' -> 'guesthouse'; None if not a known type."""
+    return _find(normalize_place(text), KINDS) if text else None
+
+
+def resolve_tier(text: Optional[str]) -> Optional[str]:
+    """'cheap' -> 'budget', '5-star' -> 'luxury'; None if not a known budget."""
+    return _find(normalize_place(text), TIERS) if text else None
+
+
+def infer_tier(text: str, kind: Optional[str]) -> Optional[str]:
+    price = PRICE_PATTERN.search(text)
+    if price:
+        amount = float((price.group(1) or price.group(2)).replace(",", ""))
+        return next(tier for limit, tier in PRICE_TIERS if amount < limit)
+    tier = resolve_tier(text)
+    if tier is None and kind in ("hostel", "capsule hotel"):
+        return "budget"
+    return tier
+
+
+def infer_area(text: str, destination: str) -> Optional[str]:
+    destination = normalize_place(destination)
+    for match in AREA_PATTERN.finditer(text):
+        area = match.group(1).strip(" -")
+        key = normalize_place(area)
+        if key and key != destination and key.split()[0] not in NOT_AREAS and not destination.startswith(key):
+            return area
+    return None
+
+
+def parse_result(result: Dict[str, str], destination: str) -> Optional[Accommodation]:
+    """A structured record for one search result, or None if it has no link."""
+    url = result.get("href") or ""
+    if not url:
+        return None
+    title = TITLE_NOISE.sub("", result.get("title") or "").strip() or "Unnamed Accommodation"
+    snippet = (result.get("body") or "").strip()
+    text = f"{title}. {snippet}"
+    # The title names the property; the snippet only decides when the title doesn't
+    kind = resolve_kind(title) or resolve_kind(snippet)
+    return Accommodation(title, url, infer_tier(text, kind), kind, infer_area(text, destination), snippet)
+
+
+def parse_results(results: Iterable[Dict[str, str]], destination: str) -> List[Accommodation]:
+    """Records for search results, one per URL, in result order."""
+    records: Dict[str, Accommodation] = {}
+    for result in results:
+        record = parse_result(result, destination)
+        if record is not None and record.url not in records:
+            records[record.url] = record
+    return list(records.values())
+
+
+def filter_records(records: List[Accommodation], budget: Optional[str] = None, style: Optional[str] = None, location: Optional[str] = None) -> List[Accommodation]:
+    """The records matching every given filter; a filter that names nothing known matches by text."""
+    tier, kind = resolve_tier(budget), resolve_kind(style)
+    area = normalize_place(location) if location else None
+    matched = []
+    for record in records:
+        text = normalize_place(f"{record.name} {record.snippet}")
+        if budget and (record.tier != tier if tier else normalize_place(budget) not in text):
+            continue
+        if style and (record.kind != kind if kind else normalize_place(style) not in text):
+            continue
+        if area and area not in normalize_place(record.area or "") and f" {area} " not in f" {text} ":
+            continue
+        matched.append(record)
+    return matched
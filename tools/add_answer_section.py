@@ -0,0 +1,23 @@
+from typing import Any
+from smolagents.tools import Tool
+from tools.answer_builder import AnswerSection, current_answer_builder
+
+class AddAnswerSectionTool(Tool):
+    name = "add_answer_section"
+    description = "Adds one section (e.g. weather, visas, currency, culture, recommendations) to the final answer and shows it to the user immediately. Call it as soon as each agent returns, then pass the returned document to final_answer. Returns the answer assembled so far."
+    inputs = {
+        'title': {'type': 'string', 'description': 'Section heading (e.g., "Weather Information", "Visa Requirements")'},
+        'content': {'type': 'string', 'description': 'The section text in markdown'}
+    }
+    output_type = "string"
+
+    def forward(self, title: str, content: Any) -> str:
+        try:
+            builder = current_answer_builder()
+            if builder is None:
+                # Not running under the chat UI: nothing streams, the section is the whole document
+                return AnswerSection(title, str(content)).render()
+            builder.add(title, content)
+            return builder.document()
+        except Exception as e:
+            return f"Error adding answer section: {str(e)}"
@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+from typing import List, NamedTuple, Optional
+import contextvars
+import threading
+
+
+class AnswerSection(NamedTuple):
+    title: str
+    content: str
+
+    def render(self) -> str:
+        return f"### {self.title}\n{self.content.strip()}"
+
+
+class AnswerBuilder:
+    """
+    The final answer of one run, assembled section by section.
+
+    The coordinator adds a section (weather, visas, culture...) as soon as the
+    sub-agent behind it returns, and the UI streams each new section to the chat
+    right away instead of waiting for the whole answer. Adding a section with a
+    title already used replaces it.
+    """
+
+    def __init__(self):
+        self.sections: List[AnswerSection] = []
+        self.lock = threading.Lock()
+        # Sections already handed to the UI by `take_new()`
+        self.sent = 0
+        self.revised = False
+
+    def add(self, title: str, content: str) -> AnswerSection:
+        section = AnswerSection(title.strip().lstrip("#").strip(), str(content))
+        with self.lock:
+            for i, existing in enumerate(self.sections):
+                if existing.title.lower() == section.title.lower():
+                    self.sections[i] = section
+                    # A section the user has already seen changed: the final answer shows it again
+                    self.revised = self.revised or i < self.sent
+                    break
+            else:
+                self.sections.append(section)
+        return section
+
+    def take_new(self) -> List[AnswerSection]:
+        """Sections added since the last call, in order."""
+        with self.lock:
+            new = self.sections[self.sent:]
+            self.sent = len(self.sections)
+        return new
+
+    def document(self) -> str:
+        with self.lock:
+            return "\n\n".join(section.render() for section in self.sections)
+
+    def streamed(self) -> List[str]:
+        """Rendered sections the user has already seen unchanged."""
+        with self.lock:
+            return [] if self.revised else [section.render() for section in self.sections[:self.sent]]
+
+
+# The builder of the run executing on this thread/context, set by the UI around each agent step
+_current: contextvars.ContextVar = contextvars.ContextVar("journi_answer_builder", default=None)
+
+
+def current_answer_builder() -> Optional[AnswerBuilder]:
+    return _current.get()
+
+
+@contextmanager
+def bind_answer_builder(builder: AnswerBuilder):
+    """Make `builder` the current run's answer builder for the duration of the block."""
+    token = _current.set(builder)
+    try:
+        yield builder
+    finally:
+        _current.reset(token)
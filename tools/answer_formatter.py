@@ -0,0 +1,171 @@
+"""
+Fast parsing of final answers and agent step output.
+
+    python -m tools.answer_formatter [--sizes 10 100 1000]
+
+runs a microbenchmark of both over answers of increasing size (in KB).
+"""
+from typing import List, NamedTuple, Optional, Tuple
+import argparse
+import re
+import time
+
+IMAGE_PATH_PATTERN = re.compile(r"/tmp/gradio/[^\s\]]+\.(?:png|jpg|jpeg|webp)")
+# ![Visual preview of Destination](path), including one whose path is missing
+PREVIEW_PATTERN = re.compile(r"!\[Visual preview of ([^\]]+)\]\([^)]*\)")
+WELCOME_PATTERN = re.compile(r"Welcome to ([^!]+)!")
+# Matched against the lowercased answer: a case-insensitive alternation is several times slower
+TIP_PATTERN = re.compile(r"tip|recommend|bring|pack|don't forget|suggestion")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+# The code block of a CodeAgent step: "Code:\n```py\n...\n```<end_code>"
+CODE_PATTERN = re.compile(r"\s*```(?:python|py)?\s*(.*?)(?:```|<end_code>)", re.DOTALL)
+
+
+class ParsedAnswer(NamedTuple):
+    # First generated image in the answer, if any
+    image_path: Optional[str]
+    # From "![Visual preview of X](...)", else from "Welcome to X!"
+    destination: Optional[str]
+    # Text with the image path and previews removed
+    body: str
+    # Blocks of the original text separated by a blank line
+    paragraphs: List[str]
+    # Lines mentioning tips, recommendations or things to bring
+    tips: List[str]
+    # Whether the answer already has the summary/details headings
+    formatted: bool
+
+
+def tip_lines(answer: str) -> List[str]:
+    """Lines mentioning tips, recommendations or things to bring, found with one search per tip line."""
+    lowered = answer.lower()
+    if len(lowered) != len(answer):
+        # A few characters change length when lowercased, so offsets would not line up
+        return [line for line in answer.split("\n") if TIP_PATTERN.search(line.lower())]
+
+    lines, position = [], 0
+    while True:
+        match = TIP_PATTERN.search(lowered, position)
+        if match is None:
+            return lines
+        start = answer.rfind("\n", 0, match.start()) + 1
+        end = answer.find("\n", match.end())
+        end = len(answer) if end == -1 else end
+        lines.append(answer[start:end])
+        position = end + 1
+
+
+def parse_answer(answer: str) -> ParsedAnswer:
+    """
+    Extract everything FinalAnswerTool needs from `answer`.
+
+    Every pattern is precompiled, and the rare ones (images, previews, welcome
+    line) only run when a literal substring check finds their prefix, so the
+    cost is a few C-speed scans of the text whatever its size.
+    """
+    image_path = preview_of = welcome_to = None
+    body = answer
+
+    if "/tmp/gradio/" in answer:
+        path = IMAGE_PATH_PATTERN.search(answer)
+        if path:
+            image_path = path.group(0)
+            body = body.replace(image_path, "")
+    if "![Visual preview of" in body:
+        preview = PREVIEW_PATTERN.search(body)
+        if preview:
+            preview_of = preview.group(1)
+            body = PREVIEW_PATTERN.sub("", body)
+    if "Welcome to " in answer:
+        welcome = WELCOME_PATTERN.search(answer)
+        if welcome:
+            welcome_to = welcome.group(1).strip()
+    if image_path:
+        body = BLANK_LINES_PATTERN.sub("\n\n", body)
+
+    return ParsedAnswer(
+        image_path,
+        preview_of or welcome_to,
+        body.strip(),
+        answer.split("\n\n"),
+        tip_lines(answer),
+        "Travel summary" in answer or "Detailed travel information" in answer,
+    )
+
+
+def format_summary(parsed: ParsedAnswer) -> str:
+    """The summary / details / tips layout for a plain-text answer."""
+    formatted_answer = "### Travel summary (short version):\n"
+    if parsed.paragraphs:
+        formatted_answer += parsed.paragraphs[0] + "\n\n"
+
+    formatted_answer += "### Detailed travel information:\n"
+    if len(parsed.paragraphs) > 1:
+        formatted_answer += "\n".join(parsed.paragraphs[1:]) + "\n\n"
+
+    formatted_answer += "### Practical tips and recommendations:\n"
+    if parsed.tips:
+        formatted_answer += "\n".join(parsed.tips)
+    else:
+        formatted_answer += "Safe travels! Remember to check local regulations and customs before your trip."
+    return formatted_answer
+
+
+def parse_model_output(model_output: str) -> Tuple[str, str]:
+    """(thought, code) of a CodeAgent step: the text after 'Thought:' and the code block after 'Code:'."""
+    thought = code = ""
+    code_at = model_output.find("Code:")
+    thought_at = model_output.find("Thought:")
+    if thought_at != -1:
+        end = model_output.find("Code:", thought_at)
+        end = len(model_output) if end == -1 else end
+        thought = model_output[thought_at + len("Thought:"):end].strip()
+    if code_at != -1:
+        match = CODE_PATTERN.match(model_output, code_at + len("Code:"))
+        if match:
+            code = match.group(1).strip()
+    return thought, code
+
+
+def _sample_answer(size_kb: int) -> str:
+    section = (
+        "### Weather Information:\n"
+        "Expect warm days around 28°C with short afternoon showers. Pack a light rain jacket.\n\n"
+        "### Cultural Information:\n"
+        "Greet people with a smile; tipping is appreciated but not expected. We recommend learning a few phrases.\n\n"
+        "### Top Destinations and Activities:\n"
+        "- The old town and its markets\n- A day trip to the coast\n- Sunset from the hills\n\n"
+    )
+    head = "![Visual preview of Lisbon](/tmp/gradio/abc123/image.png)\n\n## Welcome to Lisbon!\n\n"
+    return head + section * max(1, size_kb * 1024 // len(section))
+
+
+def _sample_step(size_kb: int) -> str:
+    filler = "I will look at the weather, the visas and the local currency before answering. "
+    return f"Thought: {filler * max(1, size_kb * 1024 // len(filler))}\nCode:\n```py\nweather = logistics_agent(task='weather')\nprint(weather)\n```<end_code>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time answer and step parsing over inputs of increasing size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Input sizes in KB")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>8}  {'parse_answer':>14}  {'per KB':>9}  {'parse_model_output':>19}  {'per KB':>9}")
+    for size in args.sizes:
+        answer, step = _sample_answer(size), _sample_step(size)
+        timings = []
+        for function, text in ((lambda a: format_summary(parse_answer(a)), answer), (parse_model_output, step)):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                function(text)
+            timings.append((time.perf_counter() - started) / args.repeat)
+        (answer_time, step_time) = timings
+        print(
+            f"{size:>6}KB  {answer_time * 1000:>12.2f}ms  {answer_time * 1e6 / size:>7.1f}µs"
+            f"  {step_time * 1000:>17.2f}ms  {step_time * 1e6 / size:>7.1f}µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
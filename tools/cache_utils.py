@@ -0,0 +1,14 @@
+import os
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Return (and create) a directory under Journi's cache root.
+
+    The root defaults to ~/.cache/journi and can be moved with the
+    JOURNI_CACHE_DIR environment variable, e.g. to a persistent volume.
+    """
+    root = os.environ.get("JOURNI_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "journi")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
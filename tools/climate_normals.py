@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Tuple
+import calendar
+import datetime
+import os
+import re
+import threading
+import numpy as np
+from tools.gazetteer import ALIASES, get_gazetteer, normalize_place
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "climate_normals.tsv")
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+MONTH_PATTERN = re.compile(
+    r"\b(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b"
+)
+DATE_PATTERN = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+
+# Places further than this from every station have no climate data
+MAX_STATION_DISTANCE_KM = 300
+
+
+def parse_travel_period(when: str, today: Optional[datetime.date] = None) -> Optional[np.ndarray]:
+    """
+    Turn 'July', 'Dec to Feb', '2025-07-01 to 2025-07-14' or '2025-07-04' into
+    the number of trip days falling in each calendar month (an array of 12).
+    """
+    text = when.lower()
+
+    dates = DATE_PATTERN.findall(text)
+    if dates:
+        start = np.datetime64(dates[0])
+        end = np.datetime64(dates[-1])
+        if end < start:
+            start, end = end, start
+        days = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+        months = days.astype("datetime64[M]").astype(int) % 12
+        return np.bincount(months, minlength=12).astype(float)
+
+    names = [match.group(1)[:3] for match in MONTH_PATTERN.finditer(text)]
+    if not names:
+        return None
+    indices = [[m[:3] for m in MONTHS].index(name) for name in names]
+    first, last = indices[0], indices[-1]
+    # "Nov to Feb" wraps around the end of the year
+    span = [(first + i) % 12 for i in range((last - first) % 12 + 1)]
+
+    year = (today or datetime.date.today()).year
+    days_in_month = np.array([calendar.monthrange(year, m)[1] for m in range(1, 13)], dtype=float)
+    weights = np.zeros(12)
+    weights[span] = days_in_month[span]
+    return weights
+
+
+class ClimateNormals:
+    """
+    Bundled monthly climate normals for popular destinations.
+
+    Stations are stored as arrays (stations x 12 months) so that trip periods
+    are aggregated with a single weighted dot product per variable.
+    """
+
+    def __init__(self, path: str = DATA_PATH):
+        names, countries, coordinates, highs, lows, precipitation = [], [], [], [], [], []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                # A regenerated file also names the GHCN-Daily station each row comes from
+                name, country, latitude, longitude, high, low, rain = line.rstrip("\n").split("\t")[:7]
+                names.append(name)
+                countries.append(country)
+                coordinates.append((float(latitude), float(longitude)))
+                highs.append([float(v) for v in high.split()])
+                lows.append([float(v) for v in low.split()])
+                precipitation.append([float(v) for v in rain.split()])
+
+        self.names = names
+        self.countries = countries
+        self.coordinates = np.radians(np.array(coordinates))
+        self.highs = np.array(highs)
+        self.lows = np.array(lows)
+        self.precipitation = np.array(precipitation)
+        self.by_name: Dict[str, int] = {normalize_place(name): i for i, name in enumerate(names)}
+        # First listed station of a country stands in for the whole country
+        self.by_country: Dict[str, int] = {}
+        for i, country in enumerate(countries):
+            self.by_country.setdefault(country, i)
+
+    def _nearest(self, latitude: float, longitude: float) -> Optional[int]:
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        station_lat, station_lon = self.coordinates[:, 0], self.coordinates[:, 1]
+        # Haversine distance to every station at once
+        a = np.sin((station_lat - lat) / 2) ** 2 + np.cos(lat) * np.cos(station_lat) * np.sin((station_lon - lon) / 2) ** 2
+        distances = 2 * 6371 * np.arcsin(np.sqrt(a))
+        index = int(np.argmin(distances))
+        return index if distances[index] <= MAX_STATION_DISTANCE_KM else None
+
+    def find_station(self, location: str) -> Optional[int]:
+        key = normalize_place(location)
+        for name in (key, ALIASES.get(key)):
+            if name in self.by_name:
+                return self.by_name[name]
+
+        place = get_gazetteer().lookup(location)
+        if place is None:
+            return None
+        if place.latitude is None:
+            return self.by_country.get(place.country)
+        return self._nearest(place.latitude, place.longitude)
+
+    def summarize(self, station: int, month_weights: np.ndarray) -> Dict[str, float]:
+        """Day-weighted average high/low and monthly rainfall over the trip period."""
+        weights = month_weights / month_weights.sum()
+        return {
+            "high": float(weights @ self.highs[station]),
+            "low": float(weights @ self.lows[station]),
+            "precipitation": float(weights @ self.precipitation[station]),
+        }
+
+    def monthly(self, station: int, month_weights: np.ndarray) -> List[Tuple[str, float, float, float]]:
+        """(month name, high, low, precipitation) for every month of the trip period."""
+        months = list(np.nonzero(month_weights)[0])
+        # Periods such as Dec-Feb wrap around the year: start listing after the gap
+        if 0 < len(months) < 12 and months[0] == 0 and months[-1] == 11:
+            gap = next(i for i in range(1, len(months)) if months[i] != months[i - 1] + 1)
+            months = months[gap:] + months[:gap]
+        return [
+            (MONTHS[m].capitalize(), float(self.highs[station, m]), float(self.lows[station, m]), float(self.precipitation[station, m]))
+            for m in months
+        ]
+
+
+_normals = None
+_normals_lock = threading.Lock()
+
+
+def get_climate_normals() -> ClimateNormals:
+    """Process-wide climate dataset, loaded on first use."""
+    global _normals
+    if _normals is None:
+        with _normals_lock:
+            if _normals is None:
+                _normals = ClimateNormals()
+    return _normals
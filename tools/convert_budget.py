@@ -0,0 +1,181 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+from smolagents.tools import Tool
+import os
+import re
+import numpy as np
+from tools.exchange_rates import ExchangeRateService, get_exchange_rate_service, get_fallback_matrix
+
+# Symbols travellers type instead of codes ("$" is taken to mean US dollars)
+CURRENCY_SYMBOLS = {
+    "$": "USD", "US$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR", "₩": "KRW", "฿": "THB",
+    "₫": "VND", "₱": "PHP", "₺": "TRY", "₪": "ILS", "₦": "NGN", "R$": "BRL", "A$": "AUD", "AU$": "AUD",
+    "C$": "CAD", "CA$": "CAD", "NZ$": "NZD", "HK$": "HKD", "S$": "SGD", "MX$": "MXN",
+}
+
+SYMBOL = r"[A-Z]{0,2}\$|[€£¥₹₩฿₫₱₺₪₦]"
+# An amount with the currency before or after it: "800 USD", "$800", "€120/night", "50,000 JPY", "50k JPY".
+# A code before the amount must be upper case, so "Top 10" is not 10 Tongan paʻanga
+MONEY_PATTERN = re.compile(
+    rf"(?:(?P<pre_symbol>{SYMBOL})|\b(?P<pre_code>[A-Z]{{3}}))?\s*"
+    r"(?P<amount>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)(?P<thousands>k\b)?\s*"
+    rf"(?:(?P<post_symbol>{SYMBOL})|(?P<post_code>[A-Za-z]{{3}})\b)?"
+)
+UNITS = r"nights?|days?|weeks?|people|persons?|pax|adults?|children|kids|tickets?|rooms?|passes"
+# "x5", "× 5 nights", "*5" or "5x"
+MULTIPLIER_PATTERN = re.compile(
+    rf"(?<![a-z])[x×*]\s*(\d+(?:\.\d+)?)(?:\s*(?:{UNITS})\b)?|\b(\d+(?:\.\d+)?)\s*[x×](?![a-z])", re.IGNORECASE
+)
+# "5 nights", "2 people", "3 tickets", but not a product named by its length: "7 day JR pass", "3-day metro card"
+UNIT_PATTERN = re.compile(rf"\b(\d+)\s*(?:{UNITS})\b(?!\s*(?!(?:at|for|each|and|with|x|×)\b)[^\W\d_])", re.IGNORECASE)
+# "/night", "per person": describes the quantity, not the item
+PER_UNIT_PATTERN = re.compile(r"/\s*\w+|\bper\s+\w+", re.IGNORECASE)
+# Words left dangling once the amount is removed: "5 nights at", "tickets for"
+DANGLING_PATTERN = re.compile(r"^(?:at|for|each)\b\s*|\s*\b(?:at|for|each)$", re.IGNORECASE)
+
+
+class Expense(NamedTuple):
+    item: str
+    amount: float
+    currency: str
+    quantity: float = 1
+
+
+def resolve_currency(text: Optional[str], codes) -> Optional[str]:
+    """'usd', 'USD' or '$' -> 'USD'; None if it is not a known currency."""
+    if not text:
+        return None
+    text = text.strip()
+    if text in CURRENCY_SYMBOLS:
+        return CURRENCY_SYMBOLS[text]
+    code = text.upper()
+    return code if code in codes else None
+
+
+def _item_name(text: str) -> str:
+    item = " ".join(text.split()).strip(" ,:;-–()")
+    return DANGLING_PATTERN.sub("", item).strip(" ,:;-–()")
+
+
+def parse_expense(line: str, codes) -> Optional[Expense]:
+    """Parse 'hotel 120 EUR/night x5' into Expense('Hotel', 120.0, 'EUR', 5.0)."""
+    for match in MONEY_PATTERN.finditer(line):
+        pre = "pre_symbol" if match.group("pre_symbol") else "pre_code"
+        post = "post_symbol" if match.group("post_symbol") else "post_code"
+        # Only the side naming a currency belongs to the amount: "tuk tuk 300 THB", "$45 per night".
+        # The trailing one wins: in "GBP 10 EUR" the code before the amount is part of the item
+        start, end = match.start("amount"), match.end("thousands") if match.group("thousands") else match.end("amount")
+        currency = resolve_currency(match.group(post), codes)
+        if currency:
+            end = match.end(post)
+        else:
+            currency = resolve_currency(match.group(pre), codes)
+            if currency:
+                start = match.start(pre)
+        if currency:
+            break
+    else:
+        return None
+
+    amount = float(match.group("amount").replace(",", ""))
+    if match.group("thousands"):
+        amount *= 1000
+    rest = f"{line[:start]} {line[end:]}"
+
+    # Quantities multiply: "2 rooms x 3 nights" is 6. Only the quantity spans are removed from the item
+    quantity = 1.0
+    item = rest
+    while True:
+        multiplier = MULTIPLIER_PATTERN.search(item) or UNIT_PATTERN.search(item)
+        if not multiplier:
+            break
+        quantity *= float(next(group for group in multiplier.groups() if group))
+        item = item[:multiplier.start()] + " " + item[multiplier.end():]
+
+    # A line that is all quantity ("5 nights at 120 EUR") is named by its own words
+    item = _item_name(PER_UNIT_PATTERN.sub(" ", item)) or _item_name(rest)
+    return Expense(item[:1].upper() + item[1:], amount, currency, quantity)
+
+
+class ConvertBudgetTool(Tool):
+    name = "convert_budget"
+    description = "Converts a whole travel budget with expenses in mixed currencies into one currency in a single call, with per-line amounts and the total. Use this instead of calling convert_currency for each expense."
+    inputs = {
+        'expenses': {'type': 'array', 'description': 'Expense lines, either strings such as "flights 800 USD", "hotel 120 EUR/night x5", "JR pass 50,000 JPY", or objects with "item", "amount", "currency" and optional "quantity".'},
+        'target_currency': {'type': 'string', 'description': 'Currency code to express the budget in (e.g., GBP, USD)'}
+    }
+    output_type = "string"
+
+    def __init__(self, api_key=None):
+        super().__init__()
+        self.api_key = api_key or os.environ.get("EXCHANGE_RATE_API_KEY")
+        # Same rate tables as convert_currency: live when available, stored rates otherwise
+        self.rate_service = ExchangeRateService(api_key) if api_key else get_exchange_rate_service()
+        self.fallback_matrix = get_fallback_matrix()
+
+    def _expense_from_dict(self, entry: Dict[str, Any], codes) -> Optional[Expense]:
+        currency = resolve_currency(str(entry.get("currency", "")), codes)
+        amount = entry.get("amount", entry.get("cost", entry.get("price")))
+        if currency is None or amount is None:
+            return None
+        item = entry.get("item") or entry.get("description") or entry.get("name") or ""
+        return Expense(str(item), float(str(amount).replace(",", "")), currency, float(entry.get("quantity") or 1))
+
+    def forward(self, expenses: List[Union[str, Dict[str, Any]]], target_currency: str) -> str:
+        try:
+            live_matrix = self.rate_service.matrix()
+            matrices = [m for m in (live_matrix, self.fallback_matrix) if m is not None]
+            codes = matrices[0].index
+
+            target = resolve_currency(target_currency, codes)
+            if target is None:
+                return f"Sorry, {target_currency} is not a currency code I know."
+
+            if isinstance(expenses, str):
+                # One string with several expenses: split on new lines, semicolons and ", " between items
+                expenses = re.split(r"[\n;]|,\s+(?=\D)", expenses)
+
+            parsed: List[Expense] = []
+            skipped = []
+            for entry in expenses:
+                expense = self._expense_from_dict(entry, codes) if isinstance(entry, dict) else parse_expense(str(entry), codes)
+                if expense is None:
+                    if str(entry).strip():
+                        skipped.append(str(entry))
+                    continue
+                parsed.append(expense._replace(item=expense.item or f"Item {len(parsed) + 1}"))
+
+            if not parsed:
+                return "I couldn't find any amounts with a currency in those expenses. Use lines like 'hotel 120 EUR x5'."
+
+            # One vectorized conversion for every line; lines the live table can't price use the stored rates
+            subtotals = np.array([expense.amount * expense.quantity for expense in parsed])
+            currencies = [expense.currency for expense in parsed]
+            converted = np.full(len(parsed), np.nan)
+            sources = []
+            for matrix in matrices:
+                missing = np.isnan(converted)
+                if not missing.any():
+                    break
+                converted[missing] = matrix.convert_many(subtotals[missing], [c for c, m in zip(currencies, missing) if m], target)
+                if (missing & ~np.isnan(converted)).any():
+                    sources.append(matrix.source)
+
+            lines = [f"💰 Budget in {target}:\n"]
+            for expense, subtotal, amount in zip(parsed, subtotals, converted):
+                line = f"• {expense.item}: {expense.amount:,.2f} {expense.currency}"
+                if expense.quantity != 1:
+                    line += f" × {expense.quantity:g} = {subtotal:,.2f} {expense.currency}"
+                if np.isnan(amount):
+                    line += f" (no exchange rate to {target}, not included in the total)"
+                elif expense.currency != target:
+                    line += f" → {amount:,.2f} {target}"
+                lines.append(line)
+
+            lines.append(f"\nTotal: {np.nansum(converted):,.2f} {target}")
+            if skipped:
+                lines.append("Not included (no amount with a currency found): " + "; ".join(skipped))
+            lines.append("\n" + "\n".join(f"({source})" for source in sources))
+            return "\n".join(lines)
+
+        except Exception as e:
+            return f"Error converting budget: {str(e)}"
@@ -0,0 +1,118 @@
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+import os
+import threading
+import numpy as np
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "currencies.tsv")
+
+
+class Currency(NamedTuple):
+    code: str
+    numeric: str
+    name: str
+    # ISO-3166 alpha-2 codes of the countries using it
+    countries: Tuple[str, ...]
+
+
+_currencies = None
+_currencies_lock = threading.Lock()
+
+
+def get_currencies() -> Dict[str, Currency]:
+    """The bundled ISO-4217 currency list, keyed by code."""
+    global _currencies
+    if _currencies is None:
+        with _currencies_lock:
+            if _currencies is None:
+                currencies = {}
+                with open(DATA_PATH, encoding="utf-8") as f:
+                    for line in f:
+                        if line.startswith("#") or not line.strip():
+                            continue
+                        code, numeric, name, countries = line.rstrip("\n").split("\t")
+                        currencies[code] = Currency(code, numeric, name, tuple(filter(None, countries.split(","))))
+                _currencies = currencies
+    return _currencies
+
+
+class CrossRateMatrix:
+    """
+    Dense matrix of exchange rates between every pair of currencies.
+
+    `matrix[i, j]` is the number of units of currency j per 1 unit of currency i,
+    derived from a single table of rates against a reference currency. Codes are
+    mapped to rows once, so a lookup is a dict access and an array index, and
+    conversions of many amounts are a single vectorized gather. Pairs involving
+    a currency without a known rate are NaN.
+    """
+
+    def __init__(self, reference_rates: Dict[str, float], source: str = "", codes: Optional[Iterable[str]] = None):
+        # Every ISO-4217 currency gets a row, plus any extra code the rate table lists
+        self.codes: List[str] = sorted(set(codes if codes is not None else get_currencies()) | set(reference_rates))
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        # Free text shown with converted amounts, e.g. where and when the rates were published
+        self.source = source
+
+        rates = np.full(len(self.codes), np.nan)
+        for code, rate in reference_rates.items():
+            if rate and rate > 0:
+                rates[self.index[code]] = rate
+        # units of j per unit of i = (j per reference) / (i per reference)
+        self.matrix = rates[np.newaxis, :] / rates[:, np.newaxis]
+
+    @classmethod
+    def from_pairs(cls, pairs: Dict[str, Dict[str, float]], pivot: str = "USD", source: str = "") -> "CrossRateMatrix":
+        """
+        Build from a sparse {from: {to: rate}} table by walking outwards from `pivot`.
+
+        Each currency's rate against the pivot comes from the shortest chain of
+        known pairs (used in either direction), so any two currencies connected
+        through the table can be converted.
+        """
+        edges: Dict[str, List[Tuple[str, float]]] = {}
+        for from_currency, targets in pairs.items():
+            for to_currency, rate in targets.items():
+                if rate and rate > 0:
+                    edges.setdefault(from_currency, []).append((to_currency, rate))
+                    edges.setdefault(to_currency, []).append((from_currency, 1 / rate))
+
+        reference_rates = {pivot: 1.0}
+        queue = deque([pivot])
+        while queue:
+            currency = queue.popleft()
+            for neighbour, rate in edges.get(currency, []):
+                if neighbour not in reference_rates:
+                    reference_rates[neighbour] = reference_rates[currency] * rate
+                    queue.append(neighbour)
+        return cls(reference_rates, source)
+
+    def __contains__(self, code: str) -> bool:
+        i = self.index.get(code)
+        return i is not None and not np.isnan(self.matrix[i, i])
+
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Units of `to_currency` per 1 `from_currency`, or None if either rate is unknown."""
+        i, j = self.index.get(from_currency), self.index.get(to_currency)
+        if i is None or j is None or np.isnan(self.matrix[i, j]):
+            return None
+        return float(self.matrix[i, j])
+
+    def _rows(self, codes: Union[str, Sequence[str]], size: int) -> Tuple[np.ndarray, np.ndarray]:
+        codes = [codes] * size if isinstance(codes, str) else list(codes)
+        rows = np.fromiter((self.index.get(code, -1) for code in codes), dtype=np.intp, count=len(codes))
+        return np.maximum(rows, 0), rows < 0
+
+    def convert_many(self, amounts: Sequence[float], from_currencies: Union[str, Sequence[str]], to_currencies: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        Convert arrays of amounts in one call.
+
+        Currencies are either one code for every amount or one code per amount.
+        Amounts in (or to) an unknown currency come back as NaN.
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        from_rows, from_unknown = self._rows(from_currencies, amounts.size)
+        to_rows, to_unknown = self._rows(to_currencies, amounts.size)
+        converted = amounts.ravel() * self.matrix[from_rows, to_rows]
+        converted[from_unknown | to_unknown] = np.nan
+        return converted.reshape(amounts.shape)
@@ -0,0 +1,146 @@
+"""
+Regenerate climate_normals.tsv: monthly 1991-2020 normals for each destination.
+
+The values are computed from NOAA's Global Historical Climatology Network daily
+dataset (GHCN-Daily, https://www.ncei.noaa.gov/products/land-based-station/global-historical-climatology-network-daily,
+public domain; Menne et al. 2012, doi:10.7289/V5D21VHZ). The destinations are
+the names and coordinates already listed in climate_normals.tsv. Each one is
+matched to the nearest GHCN-Daily station within MAX_DISTANCE_KM that reports
+daily highs, lows and precipitation over the period. Its mean daily high, mean
+daily low and mean monthly precipitation are then averaged over the years
+with enough observations. Destinations without such a station are left out.
+The station used is recorded in the last column, so each row can be checked.
+
+Usage: python tools/data/build_climate_normals.py
+"""
+import csv
+import gzip
+import io
+import math
+import os
+import sys
+import urllib.request
+from collections import defaultdict
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+GHCN_URL = "https://www.ncei.noaa.gov/pub/data/ghcn/daily"
+HEADER = (
+    "# Generated by build_climate_normals.py from NOAA GHCN-Daily "
+    "(https://www.ncei.noaa.gov/products/land-based-station/global-historical-climatology-network-daily, public domain)\n"
+    "# Monthly climate normals (1991-2020 averages), Jan..Dec\n"
+    "# name\tcountry\tlatitude\tlongitude\tmean daily high (C)\tmean daily low (C)\tprecipitation (mm/month)\tGHCN-Daily station\n"
+)
+
+FIRST_YEAR, LAST_YEAR = 1991, 2020
+ELEMENTS = ("TMAX", "TMIN", "PRCP")
+# A station further than this from a destination does not describe its climate
+MAX_DISTANCE_KM = 40
+# A month of one year counts when it has at least this many valid daily values...
+MIN_DAYS = {"TMAX": 20, "TMIN": 20, "PRCP": 25}
+# ...and a normal needs at least this many such years
+MIN_YEARS = 10
+DAYS_IN_MONTH = [31, 28.25, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+
+def fetch(path: str) -> bytes:
+    with urllib.request.urlopen(f"{GHCN_URL}/{path}", timeout=120) as response:
+        return response.read()
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def read_destinations():
+    with open(os.path.join(DATA_DIR, "climate_normals.tsv"), encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            name, country, latitude, longitude = line.rstrip("\n").split("\t")[:4]
+            yield name, country, float(latitude), float(longitude)
+
+
+def read_candidates():
+    """Stations (id, latitude, longitude) reporting every element over the whole period."""
+    covered = defaultdict(set)
+    for line in fetch("ghcnd-inventory.txt").decode("ascii").splitlines():
+        station, element, first, last = line[0:11], line[31:35], int(line[36:40]), int(line[41:45])
+        if element in ELEMENTS and first <= FIRST_YEAR and last >= LAST_YEAR:
+            covered[station].add(element)
+
+    stations = []
+    for line in fetch("ghcnd-stations.txt").decode("ascii").splitlines():
+        station = line[0:11]
+        if covered.get(station) == set(ELEMENTS):
+            stations.append((station, float(line[12:20]), float(line[21:30])))
+    return stations
+
+
+def station_normals(station: str):
+    """Monthly (highs, lows, precipitation) of a station, or None if some month has too few years."""
+    # (element, month) -> year -> [sum, days]
+    totals = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))
+    text = gzip.decompress(fetch(f"by_station/{station}.csv.gz")).decode("ascii")
+    for row in csv.reader(io.StringIO(text)):
+        _, date, element, value, _, quality = row[:6]
+        if not date.isdigit():
+            continue
+        year, month = int(date[:4]), int(date[4:6])
+        if element in ELEMENTS and FIRST_YEAR <= year <= LAST_YEAR and not quality.strip():
+            entry = totals[element, month][year]
+            # Values are in tenths of a degree or of a millimetre
+            entry[0] += int(value) / 10
+            entry[1] += 1
+
+    normals = {}
+    for element in ELEMENTS:
+        monthly = []
+        for month in range(1, 13):
+            years = [(total, days) for total, days in totals[element, month].values() if days >= MIN_DAYS[element]]
+            if len(years) < MIN_YEARS:
+                return None
+            if element == "PRCP":
+                # A month's total, scaled up for the odd missing day
+                monthly.append(sum(total / days * DAYS_IN_MONTH[month - 1] for total, days in years) / len(years))
+            else:
+                monthly.append(sum(total / days for total, days in years) / len(years))
+        normals[element] = monthly
+    return normals["TMAX"], normals["TMIN"], normals["PRCP"]
+
+
+def format_values(values, digits: int) -> str:
+    return " ".join(f"{value:.{digits}f}" for value in values)
+
+
+def main():
+    candidates = read_candidates()
+    rows, missing = [], []
+    for name, country, latitude, longitude in read_destinations():
+        distances = ((distance_km(latitude, longitude, lat, lon), station) for station, lat, lon in candidates)
+        nearby = sorted((distance, station) for distance, station in distances if distance <= MAX_DISTANCE_KM)
+        # The nearest station with enough observations in every month
+        for _, station in nearby:
+            normals = station_normals(station)
+            if normals is not None:
+                break
+        else:
+            missing.append(name)
+            continue
+        highs, lows, precipitation = normals
+        rows.append("\t".join([
+            name, country, f"{latitude:.2f}", f"{longitude:.2f}",
+            format_values(highs, 1), format_values(lows, 1), format_values(precipitation, 0), station,
+        ]))
+
+    with open(os.path.join(DATA_DIR, "climate_normals.tsv"), "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        f.write("\n".join(rows) + "\n")
+    print(f"{len(rows)} destinations")
+    if missing:
+        print("No GHCN-Daily station with enough data for: " + ", ".join(missing), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Regenerate currencies.tsv: the ISO-4217 currency list and the countries using each currency.
+
+Currency codes and names come from `pycountry` (ISO 4217). The country to
+currency mapping comes from GeoNames, as packaged by `geonamescache`
+(https://www.geonames.org/, CC BY 4.0).
+
+Usage: pip install pycountry geonamescache && python tools/data/build_currencies.py
+"""
+import os
+
+import geonamescache
+import pycountry
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+HEADER = "# Generated by build_currencies.py from ISO 4217 (pycountry) and GeoNames (https://www.geonames.org/, CC BY 4.0)\n"
+
+# Precious metals, SDRs and testing codes are not money travellers exchange
+EXCLUDED = {"XAG", "XAU", "XBA", "XBB", "XBC", "XBD", "XDR", "XPD", "XPT", "XSU", "XTS", "XUA", "XXX"}
+
+
+def main():
+    countries = {}
+    for country in geonamescache.GeonamesCache().get_countries().values():
+        if country["currencycode"]:
+            countries.setdefault(country["currencycode"], []).append(country["iso"])
+
+    with open(os.path.join(DATA_DIR, "currencies.tsv"), "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        f.write("# code\tnumeric\tname\tcountries\n")
+        for currency in sorted(pycountry.currencies, key=lambda c: c.alpha_3):
+            if currency.alpha_3 in EXCLUDED:
+                continue
+            users = ",".join(sorted(countries.get(currency.alpha_3, [])))
+            f.write(f"{currency.alpha_3}\t{currency.numeric}\t{currency.name}\t{users}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Regenerate cities.tsv and countries.tsv from GeoNames data.
+
+The city list is GeoNames' cities15000 (every place with at least 15,000
+inhabitants), as packaged by `geonamescache`. GeoNames data is licensed under
+CC BY 4.0 (https://www.geonames.org/).
+
+Usage: pip install geonamescache && python tools/data/build_gazetteer.py
+"""
+import os
+
+import geonamescache
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+HEADER = "# Generated by build_gazetteer.py from GeoNames (https://www.geonames.org/, CC BY 4.0)\n"
+
+
+def clean(value) -> str:
+    return str(value).replace("\t", " ").replace("\n", " ").strip()
+
+
+def main():
+    cache = geonamescache.GeonamesCache()
+    cities = sorted(cache.get_cities().values(), key=lambda city: -int(city["population"] or 0))
+
+    with open(os.path.join(DATA_DIR, "cities.tsv"), "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        f.write("# name\tcountry\ttimezone\tpopulation\tlatitude\tlongitude\n")
+        for city in cities:
+            if not city["timezone"]:
+                continue
+            f.write("\t".join([
+                clean(city["name"]),
+                city["countrycode"],
+                city["timezone"],
+                str(city["population"]),
+                f"{float(city['latitude']):.2f}",
+                f"{float(city['longitude']):.2f}",
+            ]) + "\n")
+
+    # Countries resolve to the timezone of their capital (or of their largest city)
+    timezone_by_city = {}
+    for city in cities:
+        timezone_by_city.setdefault((city["countrycode"], city["name"].casefold()), city["timezone"])
+    largest_by_country = {}
+    for city in cities:
+        largest_by_country.setdefault(city["countrycode"], city["timezone"])
+
+    with open(os.path.join(DATA_DIR, "countries.tsv"), "w", encoding="utf-8") as f:
+        f.write(HEADER)
+        f.write("# iso2\tiso3\tname\tcapital\ttimezone\n")
+        for country in sorted(cache.get_countries().values(), key=lambda c: c["iso"]):
+            iso2 = country["iso"]
+            timezone = (
+                timezone_by_city.get((iso2, clean(country["capital"]).casefold()))
+                or largest_by_country.get(iso2)
+                or ""
+            )
+            f.write("\t".join([iso2, country["iso3"], clean(country["name"]), clean(country["capital"]), timezone]) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Compile the visa-requirement matrix: visa_matrix.u8 and visa_index.json.
+
+visa_matrix.u8 holds two uint8 planes of shape (countries, countries), indexed
+[passport, destination] by the row order of `codes` in visa_index.json:
+
+    plane 0: requirement category (see CATEGORIES; 0 = unknown)
+    plane 1: index into `durations` (maximum stay in days; 0 = not specified)
+
+visa_index.json also holds the alias index (country names, ISO-3166 alpha-2 and
+alpha-3 codes, demonyms and common nicknames) used to resolve free-text input.
+
+The matrix is compiled from the tidy ISO-2 CSV of the passport-index dataset
+(https://github.com/ilyankou/passport-index-dataset, MIT licence), which lists
+every passport/destination pair. It is downloaded unless a local copy is given:
+
+    python tools/data/build_visa_matrix.py [--csv passport-index-tidy-iso2.csv]
+
+Pairs the dataset leaves out fall back to the entry policies and regimes below,
+which only cover the passports they name. Without network access, `--offline`
+compiles the matrix from those alone; visa_index.json records which of the two
+the matrix was built from, and pairs left unknown are answered by a web search.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import unicodedata
+import urllib.request
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_URL = "https://raw.githubusercontent.com/ilyankou/passport-index-dataset/master/passport-index-tidy-iso2.csv"
+
+CATEGORIES = ["unknown", "citizen", "freedom of movement", "visa free", "eta", "visa on arrival", "e-visa", "visa required", "no admission"]
+CATEGORY = {name: i for i, name in enumerate(CATEGORIES)}
+
+EU = "AT BE BG HR CY CZ DK EE FI FR DE GR HU IE IT LV LT LU MT NL PL PT RO SK SI ES SE".split()
+# EU freedom of movement extends to the EEA and Switzerland
+FREE_MOVEMENT = EU + "IS LI NO CH".split()
+SCHENGEN = "AT BE BG HR CZ DK EE FI FR DE GR HU IS IT LV LI LT LU MT NL NO PL PT RO SK SI ES SE CH".split()
+# Regulation (EU) 2018/1806, Annex II: visa free for 90 days in any 180; everyone else needs a Schengen visa
+SCHENGEN_VISA_FREE = (
+    "AD AE AG AL AR AU BA BB BN BR BS CA CL CO CR DM FM GB GD GE GT HK HN IL JP KI KN KR LC MC MD ME MH MK MO MU MX "
+    "MY NI NR NZ PA PE PW PY RS SB SC SG SM SV TL TO TT TV TW UA US UY VA VC VE WS XK"
+).split()
+# US Visa Waiver Program: ESTA, 90 days; everyone else needs a US visa
+US_VISA_WAIVER = (
+    "AD AT AU BE BN CH CL CZ DE DK EE ES FI FR GB GR HR HU IE IL IS IT JP KR LI LT LU LV MC MT NL NO NZ PL PT QA RO "
+    "SE SG SI SK SM TW"
+).split()
+# UK Electronic Travel Authorisation: visitors who don't need a visa, up to 6 months
+UK_ETA = FREE_MOVEMENT + (
+    "AD AG AR AU BB BH BN BR BS BW BZ CA CL CR FM GD GT HK IL JP KI KN KR KW LC MC MH MO MU MV MX MY NR NZ OM PA "
+    "PE PG PW PY QA SA SB SC SG SM TO TV TW US UY VA VC WS AE"
+).split()
+# Canada eTA (visa-exempt air travellers), up to 6 months
+CANADA_ETA = FREE_MOVEMENT + "AD AU BB BN BS CL GB HK IL JP KR MC NZ PG SB SG SM TW VA WS AE".split()
+# Australia: ETA (subclass 601) or eVisitor (subclass 651), both applied for online
+AUSTRALIA_ETA = FREE_MOVEMENT + "GB AD MC SM VA US CA JP KR SG MY BN HK MO TW".split()
+# Japan's visa exemptions (some require a registered or ICAO passport)
+JAPAN_VISA_FREE = FREE_MOVEMENT + (
+    "GB US CA MX AR CL UY SV GT HN CR DO BS BB SR BR AD MC SM MK RS TR IL AE QA TN LS MU AU NZ KR TW HK MO SG MY"
+).split()
+JAPAN_15_DAYS = "TH ID BN".split()
+# China's unilateral visa-free entry for tourism and business, 30 days
+CHINA_VISA_FREE = (
+    "FR DE IT ES NL CH IE HU AT BE LU PL PT GR CY SI SK NO FI DK IS AD MC LI MT EE LV HR BG RO ME MK "
+    "JP KR AU NZ BR AR CL PE UY SA OM KW BH"
+).split()
+MEXICO_VISA_FREE = FREE_MOVEMENT + "US CA GB JP AU NZ KR SG AR CL CO UY PY PE CR PA IL".split()
+SOUTH_AFRICA_VISA_FREE = "US GB CA AU JP NZ".split()
+BRAZIL_VISA_FREE = FREE_MOVEMENT + "GB JP NZ".split()
+BRAZIL_E_VISA = "US CA AU".split()
+
+# Blocs whose members' citizens travel freely between each other
+FREE_MOVEMENT_BLOCS = [
+    FREE_MOVEMENT,
+    "GB IE".split(),  # Common Travel Area
+    "AU NZ".split(),  # Trans-Tasman Travel Arrangement
+    "BH KW OM QA SA AE".split(),  # Gulf Cooperation Council
+    "IN NP".split(), "IN BT".split(),
+]
+ASEAN = "BN KH ID LA MY MM PH SG TH VN".split()
+# Passports exempt from a visa for short stays almost everywhere that exempts anyone
+WESTERN = FREE_MOVEMENT + "GB US CA AU NZ JP KR SG AD MC SM VA".split()
+LATIN_AMERICA = "AR BO BR CL CO CR EC SV GT HN MX NI PA PY PE UY DO".split()
+CARIBBEAN = "AG BS BB BZ DM GD GY JM KN LC VC SR TT".split()
+GCC = "BH KW OM QA SA AE".split()
+BALKANS = "AL BA ME MK RS XK".split()
+FORMER_USSR = "AM AZ BY GE KZ KG MD RU TJ TM UA UZ".split()
+PACIFIC = "FJ KI MH FM NR PW PG WS SB TO TV VU".split()
+
+# Entry policy of every other destination, as rules applied in order: (category, maximum
+# stay in days or 0, passports). The regimes above refine them. Only passports named here
+# are covered: every other pair stays unknown, and is answered from the dataset or the web.
+POLICIES = {
+    # Asia
+    "BN": [("visa free", 90, WESTERN + GCC)],
+    "BT": [("visa free", 0, "BD MV".split())],
+    "CN": [("visa free", 30, "SG MY BN TH".split())],
+    "HK": [("visa free", 90, WESTERN + LATIN_AMERICA + "IL TR ZA".split()), ("eta", 14, ["IN"]),
+           ("visa required", 0, "AF BD CU IQ IR KP LY NG NP PK PS SO SY YE".split())],
+    "ID": [("visa on arrival", 30, WESTERN + GCC + "CN IN RU TR ZA MX BR AR CL PE CO EC TW HK MO UA BY KZ UZ TN EG DZ MA MV FJ PG SR PA TL".split()),
+           ("visa free", 30, ASEAN)],
+    "IN": [("e-visa", 30, WESTERN), ("visa on arrival", 60, "JP KR AE".split()), ("visa required", 0, ["PK"])],
+    "IQ": [("visa on arrival", 60, WESTERN + "CN RU MY".split())],
+    "IR": [("visa required", 0, "US GB CA".split())],
+    "KG": [("visa free", 60, WESTERN + GCC + FORMER_USSR + "IL TR MY".split())],
+    "KR": [("eta", 90, WESTERN + LATIN_AMERICA + GCC + "MY TH BN IL TR".split()),
+           ("visa free", 90, "US GB JP AU CA NZ DE FR IT ES NL BE AT DK FI SE NO PL PT IE CH SG HK MO TW".split())],
+    "KW": [("e-visa", 90, WESTERN + "MY TR HK".split())],
+    "KZ": [("visa free", 30, WESTERN + LATIN_AMERICA + GCC + "MY TH ID PH VN TR IL".split()),
+           ("visa free", 90, "AM AZ BY GE KG MD RU TJ UA UZ".split())],
+    "KH": [("visa on arrival", 30, WESTERN + ASEAN)],
+    "LA": [("visa free", 15, "JP KR CH LU RU".split())],
+    "LB": [("visa on arrival", 30, WESTERN + GCC + LATIN_AMERICA)],
+    "LK": [("eta", 30, WESTERN)],
+    "MN": [("visa free", 30, WESTERN + FORMER_USSR)],
+    "MO": [("visa free", 90, WESTERN), ("visa required", 0, "AF BD IQ KP NG NP PK LK".split())],
+    "MV": [("visa on arrival", 30, WESTERN)],
+    "MY": [("visa free", 90, WESTERN + GCC + "AR BR CL MX PE UY TR TN MA EG JO LB ZA HK MO TW KZ UZ KG".split()),
+           ("visa free", 30, "CN IN RU".split())],
+    "NP": [("visa required", 0, "AF CM GH IQ LR NG PS SO SZ SY ZW".split())],
+    "OM": [("visa free", 14, WESTERN + LATIN_AMERICA + "RU TR MY".split())],
+    "PH": [("visa free", 14, ["IN"]), ("visa required", 0, "CN IR IQ SY YE AF LY SO SD NG PK".split())],
+    "QA": [("visa free", 30, WESTERN + LATIN_AMERICA + "MY TH HK TR RU UA".split()), ("visa free", 90, FREE_MOVEMENT)],
+    "SA": [("e-visa", 90, WESTERN + "CN HK MO MY BN KZ AZ GE RU TR UA AL ME ZA SC MU".split())],
+    "BH": [("visa on arrival", 14, WESTERN)],
+    "AE": [("visa on arrival", 30, "US GB CA AU NZ JP SG MY BN HK MO CN IE AD MC SM VA KZ RU".split()),
+           ("visa on arrival", 90, FREE_MOVEMENT + "AR BR CL CO UY PY PE HN SV SC SB KR".split())],
+    "SG": [("visa free", 90, WESTERN),
+           ("visa required", 0, "AF AM AZ BD BY EG GE IN IR IQ JO KZ KG LB LY MD MA NG PK PS SO SD SS SY TJ TM UZ YE".split())],
+    "TH": [("visa free", 60, WESTERN + GCC + "AR BR CL CO EC MX PE PA UY IN HK MO TW IL TR ZA UA KZ UZ MV MU".split()), ("visa free", 30, ["CN"])],
+    "TW": [("visa free", 90, WESTERN + "AR BR CL CO EC MX PE PA UY DO GT HN SV NI IL".split()),
+           ("visa free", 14, "TH PH BN".split()), ("e-visa", 30, "IN ID VN MM LA KH".split())],
+    "UZ": [("visa free", 30, WESTERN + "IL TR MY ID TH VN AR BR CL".split()), ("visa free", 60, FORMER_USSR)],
+    "VN": [("e-visa", 90, WESTERN), ("visa free", 45, "GB DE FR IT ES DK SE NO FI JP KR RU BY PL CZ CH".split())],
+    # Caucasus, Turkey and the Middle East
+    "AM": [("visa free", 180, WESTERN + FORMER_USSR + "AR BR CL MX UY AE IR".split())],
+    "AZ": [("visa free", 90, "RU BY GE KZ KG MD TJ UA UZ TR".split())],
+    "GE": [("visa free", 365, WESTERN + LATIN_AMERICA + GCC + CARIBBEAN + FORMER_USSR + BALKANS + "IL TR ZA BW HK TW MY".split())],
+    "IL": [("eta", 90, WESTERN + "AR BR CL CO CR EC SV GT HN MX PA PY PE UY DO UA GE MD ZA HK MO".split())],
+    "TR": [("visa free", 90, [code for code in FREE_MOVEMENT if code != "CY"] + "GB US CA JP KR NZ AD MC SM VA AR BR CL CO EC PE UY PY BO CR SV GT HN NI PA IL UA GE AZ KZ KG UZ MD TN MA SG MY HK MO".split() + BALKANS),
+           ("visa free", 60, ["RU"])],
+    # Africa
+    "AO": [("visa free", 30, WESTERN + LATIN_AMERICA + "CN IN RU ZA NA BW MZ ZM ZW".split())],
+    "BW": [("visa free", 90, WESTERN + "ZA NA ZM ZW MZ LS SZ MW".split())],
+    "CV": [("eta", 30, WESTERN)],
+    "EG": [("e-visa", 30, "CN IN ZA BR AR MX".split()),
+           ("visa on arrival", 30, WESTERN + GCC + "RU UA BY GE AM AZ KZ".split())],
+    "GM": [("visa free", 90, WESTERN)],
+    "GQ": [("visa free", 90, ["US"])],
+    "KE": [("eta", 90, WESTERN)],
+    "LS": [("visa free", 90, WESTERN + "ZA BW NA".split())],
+    "MA": [("visa free", 90, WESTERN + GCC + "AR BR CL MX PE VE TN DZ TR RU IL HK MO PH ID".split()), ("e-visa", 30, ["IN"])],
+    "MW": [("visa free", 30, WESTERN)], "MZ": [("visa free", 30, WESTERN)],
+    "NA": [("visa on arrival", 90, WESTERN), ("visa free", 90, "ZA BW ZM ZW AO MZ".split())],
+    "SN": [("visa free", 90, WESTERN + "BR AR MA TN".split())],
+    "ST": [("visa free", 15, WESTERN)],
+    "SZ": [("visa free", 30, WESTERN + "ZA BW LS NA MZ".split())],
+    "TN": [("visa free", 90, WESTERN + GCC + "AR BR CL MX PE MA DZ LY TR RU".split())],
+    "ZA": [("visa free", 90, WESTERN + "AR BR CL UY PY PE EC IL BW NA ZW MZ".split())],
+    "ZM": [("visa free", 90, WESTERN)],
+    # Americas
+    "AR": [("visa free", 90, WESTERN + LATIN_AMERICA + CARIBBEAN + "IL TR RU UA HK MO MY".split())],
+    "BO": [("visa free", 90, [code for code in WESTERN if code != "US"] + LATIN_AMERICA)],
+    "BS": [("visa free", 90, WESTERN + LATIN_AMERICA + CARIBBEAN)],
+    "BZ": [("visa free", 30, WESTERN + CARIBBEAN + "MX CR PA GT SV HN".split())],
+    "CL": [("visa free", 90, WESTERN + LATIN_AMERICA + CARIBBEAN + "IL TR RU UA MY".split())],
+    "CO": [("visa free", 90, WESTERN + LATIN_AMERICA + CARIBBEAN + "IL TR RU UA PH ID MY".split())],
+    "CR": [("visa free", 180, WESTERN + "AR BR CL MX PA PY UY IL".split())],
+    "CU": [("visa required", 0, ["US"])],
+    "DO": [("visa free", 30, WESTERN + LATIN_AMERICA + "IL RU".split())],
+    "EC": [("visa required", 0, "AF AO BD CM CN CU ER ET GH IN IR IQ KE NP NG PK SN SO LK SY VN YE".split())],
+    "GT": [("visa free", 90, WESTERN + LATIN_AMERICA + "IL".split())],
+    "GY": [("visa free", 90, WESTERN + CARIBBEAN)],
+    "HN": [("visa free", 90, WESTERN + LATIN_AMERICA + "IL".split())],
+    "NI": [("visa on arrival", 90, WESTERN + LATIN_AMERICA)],
+    "PA": [("visa free", 180, WESTERN + LATIN_AMERICA + "IL".split())],
+    "PE": [("visa free", 183, WESTERN + LATIN_AMERICA + CARIBBEAN + "RU IL TR PH ID MY TH".split())],
+    "PY": [("visa free", 90, WESTERN + LATIN_AMERICA + "IL".split())],
+    "SV": [("visa free", 90, WESTERN + LATIN_AMERICA + "IL".split())],
+    "UY": [("visa free", 90, WESTERN + LATIN_AMERICA + "IL".split())],
+    "VE": [("visa free", 90, [code for code in WESTERN if code not in ("US", "CA")] + LATIN_AMERICA)],
+    **{code: [("visa free", 90, WESTERN + CARIBBEAN)] for code in "AG BB DM GD JM KN LC TT VC".split()},
+    # Europe outside the regimes
+    "BY": [("visa free", 30, FREE_MOVEMENT + "GB US".split()), ("freedom of movement", 0, ["RU"])],
+    "CY": [("visa free", 90, SCHENGEN_VISA_FREE)],
+    "IE": [("visa free", 90, SCHENGEN_VISA_FREE)],
+    "RU": [("e-visa", 16, FREE_MOVEMENT + "JP CN IN TR".split()),
+           ("visa free", 90, "AM AZ BY KZ KG MD TJ UZ UA AR BR CL CO EC PE UY VE IL".split())],
+    **{code: [("visa free", 90, WESTERN + BALKANS + "IL TR UA MD GE".split())] for code in BALKANS + ["MD", "UA"]},
+    # Oceania
+    "FJ": [("visa free", 120, WESTERN + PACIFIC + "AR BR CL MX PE IL TR".split())],
+    "KI": [("visa free", 30, WESTERN + PACIFIC)],
+    "MH": [("visa free", 90, WESTERN + PACIFIC)],
+    "NZ": [("eta", 90, FREE_MOVEMENT + "GB US CA JP KR SG MY BN HK MO TW AD MC SM VA AR BR CL UY MX IL".split() + GCC)],
+    "VU": [("visa free", 30, WESTERN + PACIFIC)],
+}
+
+# Territories that follow the policy of the country they belong to, or one shared by a group
+OVERSEAS_FRANCE = [("visa free", 90, SCHENGEN_VISA_FREE), ("freedom of movement", 0, FREE_MOVEMENT)]
+DANISH_REALM = [("visa free", 90, SCHENGEN_VISA_FREE), ("freedom of movement", 0, "DK IS NO FI SE".split())]
+BRITISH_OVERSEAS = [("visa free", 90, WESTERN + CARIBBEAN)]
+DUTCH_CARIBBEAN = [("visa free", 90, WESTERN + LATIN_AMERICA + CARIBBEAN)]
+TERRITORIES = {
+    **{code: "US" for code in "PR VI GU MP AS UM".split()},
+    **{code: "GB" for code in "GG JE IM".split()},
+    **{code: "AU" for code in "CC CX NF".split()},
+    "AX": "FI", "TK": "NZ",
+    # Reached through (or part of) the Schengen area or Israel, with no border control of their own
+    "MC": "FR", "AD": "FR", "SM": "IT", "VA": "IT", "PS": "IL",
+}
+GROUP_POLICIES = {
+    **{code: OVERSEAS_FRANCE for code in "GP MQ GF RE YT PF NC PM BL MF WF".split()},
+    **{code: DANISH_REALM for code in "GL FO".split()},
+    **{code: BRITISH_OVERSEAS for code in "AI BM FK GI KY MS SH TC VG".split()},
+    **{code: DUTCH_CARIBBEAN for code in "AW CW SX BQ".split()},
+}
+
+# Blocs whose members' citizens need no visa for short stays in each other
+VISA_FREE_BLOCS = [
+    ASEAN,
+    "BJ BF CV CI GM GH GN GW LR ML NE NG SN SL TG".split(),  # ECOWAS
+    "AR BR PY UY BO CL CO EC PE".split(),  # Mercosur and associated states
+    "GT SV HN NI".split(),  # Central America-4
+    "KE TZ UG RW BI SS".split(),  # East African Community
+]
+
+# Nationality adjectives and nicknames not derivable from country names, comma-separated
+DEMONYMS = {
+    "AD": "andorran", "AE": "emirati, emirates, uae", "AF": "afghan", "AG": "antiguan", "AL": "albanian",
+    "AM": "armenian", "AO": "angolan", "AR": "argentine, argentinian", "AT": "austrian",
+    "AU": "australian, aussie, aus", "AZ": "azerbaijani, azeri", "BA": "bosnian, bosnia", "BB": "barbadian, bajan",
+    "BD": "bangladeshi", "BE": "belgian", "BF": "burkinabe", "BG": "bulgarian", "BH": "bahraini", "BI": "burundian",
+    "BJ": "beninese", "BN": "bruneian", "BO": "bolivian", "BR": "brazilian", "BS": "bahamian", "BT": "bhutanese",
+    "BW": "botswanan, motswana, batswana", "BY": "belarusian", "BZ": "belizean", "CA": "canadian, can",
+    "CD": "congo kinshasa, congolese, drc, dr congo", "CF": "central african", "CG": "congo brazzaville, congo", "CH": "swiss",
+    "CI": "cote d ivoire, ivorian", "CL": "chilean", "CM": "cameroonian", "CN": "chinese, prc", "CO": "colombian",
+    "CR": "costa rican", "CU": "cuban", "CV": "cape verdean, cape verde", "CY": "cypriot",
+    "CZ": "czech republic, czech", "DE": "german", "DJ": "djiboutian", "DK": "danish, dane",
+    "DM": "dominica", "DO": "dominican, dominican republic", "DZ": "algerian", "EC": "ecuadorian", "EE": "estonian",
+    "EG": "egyptian", "ER": "eritrean", "ES": "spanish, spaniard", "ET": "ethiopian", "FI": "finnish, finn",
+    "FJ": "fijian", "FM": "micronesian", "FR": "french", "GA": "gabonese",
+    "GB": "great britain, northern ireland, british, briton, uk, britain, english, scottish, welsh, england, scotland, wales",
+    "GD": "grenadian", "GE": "georgian", "GH": "ghanaian", "GM": "gambian", "GN": "guinean", "GQ": "equatoguinean",
+    "GR": "greek", "GT": "guatemalan", "GW": "bissau guinean", "GY": "guyanese", "HK": "hong konger, hongkonger",
+    "HN": "honduran", "HR": "croatian, croat", "HT": "haitian", "HU": "hungarian", "ID": "indonesian", "IE": "irish",
+    "IL": "israeli", "IN": "indian", "IQ": "iraqi", "IR": "iranian", "IS": "icelandic, icelander", "IT": "italian",
+    "JM": "jamaican", "JO": "jordanian", "JP": "japanese", "KE": "kenyan", "KG": "kyrgyz, kyrgyzstani",
+    "KH": "cambodian, khmer", "KI": "i kiribati", "KM": "comorian", "KN": "kittitian, nevisian", "KP": "north korean",
+    "KR": "south korean, republic of korea, korean, korea", "KW": "kuwaiti", "KZ": "kazakh, kazakhstani",
+    "LA": "lao, laotian", "LB": "lebanese", "LC": "saint lucian", "LI": "liechtensteiner", "LK": "sri lankan",
+    "LR": "liberian", "LS": "basotho, mosotho", "LT": "lithuanian", "LU": "luxembourgish, luxembourger",
+    "LV": "latvian", "LY": "libyan", "MA": "moroccan", "MC": "monegasque", "MD": "moldovan", "ME": "montenegrin",
+    "MG": "malagasy", "MH": "marshallese", "MK": "north macedonian, macedonian, macedonia", "ML": "malian",
+    "MM": "burmese, myanma, burma", "MN": "mongolian", "MO": "macanese", "MR": "mauritanian", "MT": "maltese",
+    "MU": "mauritian", "MV": "maldivian", "MW": "malawian", "MX": "mexican", "MY": "malaysian", "MZ": "mozambican",
+    "NA": "namibian", "NE": "nigerien", "NG": "nigerian", "NI": "nicaraguan", "NL": "dutch, holland, netherlands",
+    "NO": "norwegian", "NP": "nepali, nepalese", "NR": "nauruan", "NZ": "new zealander, kiwi, nz", "OM": "omani",
+    "PA": "panamanian", "PE": "peruvian", "PG": "papua new guinean", "PH": "filipino, filipina, philippine",
+    "PK": "pakistani", "PL": "polish, pole", "PS": "palestinian, palestine", "PT": "portuguese", "PW": "palauan",
+    "PY": "paraguayan", "QA": "qatari", "RO": "romanian", "RS": "serbian, serb", "RU": "russian federation, russian",
+    "RW": "rwandan", "SA": "saudi arabian, saudi", "SB": "solomon islander", "SC": "seychellois", "SD": "sudanese",
+    "SE": "swedish, swede", "SG": "singaporean", "SI": "slovenian, slovene", "SK": "slovak, slovakian",
+    "SL": "sierra leonean", "SM": "sammarinese", "SN": "senegalese", "SO": "somali", "SR": "surinamese",
+    "SS": "south sudanese", "ST": "santomean", "SV": "salvadoran, salvadorean", "SY": "syrian",
+    "SZ": "swazi, swaziland", "TD": "chadian", "TG": "togolese", "TH": "thai", "TJ": "tajik, tajikistani",
+    "TL": "timorese, east timorese, east timor", "TM": "turkmen", "TN": "tunisian", "TO": "tongan",
+    "TR": "turkish, turk, turkiye", "TT": "trinidadian, tobagonian, trinbagonian", "TV": "tuvaluan", "TW": "taiwanese",
+    "TZ": "tanzanian", "UA": "ukrainian", "UG": "ugandan", "US": "united states of america, american, us, usa, america",
+    "UY": "uruguayan", "UZ": "uzbek, uzbekistani", "VA": "holy see, vatican", "VC": "vincentian", "VE": "venezuelan",
+    "VN": "viet nam, vietnamese", "VU": "ni vanuatu, vanuatuan", "WS": "samoan", "XK": "kosovar, kosovan",
+    "YE": "yemeni", "ZA": "south african", "ZM": "zambian", "ZW": "zimbabwean",
+}
+
+
+
+def normalize(text: str) -> str:
+    # Same normalization as tools.gazetteer.normalize_place
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", folded).split())
+
+
+def read_countries():
+    with open(os.path.join(DATA_DIR, "countries.tsv"), encoding="utf-8") as f:
+        rows = [line.rstrip("\n").split("\t") for line in f if not line.startswith("#") and line.strip()]
+    return [(iso2, iso3, name) for iso2, iso3, name, _, _ in rows]
+
+
+def build_aliases(countries):
+    aliases = {}
+    for iso2, iso3, name in countries:
+        for alias in (name, name[4:] if name.startswith("The ") else "", iso2, iso3):
+            if alias:
+                aliases.setdefault(normalize(alias), iso2)
+    for iso2, demonyms in DEMONYMS.items():
+        for alias in demonyms.split(","):
+            aliases[normalize(alias)] = iso2
+    return aliases
+
+
+class Matrix:
+    def __init__(self, codes):
+        self.index = {code: i for i, code in enumerate(codes)}
+        size = len(codes)
+        self.categories = bytearray(size * size)
+        self.durations = bytearray(size * size)
+        self.duration_values = [0]
+
+    def set(self, passport: str, destination: str, category: str, days: int = 0):
+        if passport not in self.index or destination not in self.index:
+            return
+        if days not in self.duration_values:
+            self.duration_values.append(days)
+        cell = self.index[passport] * len(self.index) + self.index[destination]
+        self.categories[cell] = CATEGORY[category]
+        self.durations[cell] = self.duration_values.index(days)
+
+    def destination(self, destination: str, passports, category: str, days: int = 0):
+        for passport in passports:
+            self.set(passport, destination, category, days)
+
+    def copy_destination(self, source: str, destination: str):
+        """Give `destination` the requirements of `source` for every passport."""
+        size = len(self.index)
+        source, destination = self.index[source], self.index[destination]
+        for row in range(0, size * size, size):
+            self.categories[row + destination] = self.categories[row + source]
+            self.durations[row + destination] = self.durations[row + source]
+
+
+def apply_policies(matrix: Matrix):
+    """The requirements of the passports each destination's policy names, before the regimes refine them."""
+    for destination, rules in {**POLICIES, **GROUP_POLICIES}.items():
+        for category, days, passports in rules:
+            matrix.destination(destination, passports, category, days)
+
+
+def apply_regimes(matrix: Matrix, codes):
+    everyone = [code for code in codes if code not in FREE_MOVEMENT]
+
+    for destination in SCHENGEN:
+        matrix.destination(destination, everyone, "visa required")
+        matrix.destination(destination, SCHENGEN_VISA_FREE, "visa free", 90)
+
+    matrix.destination("US", everyone, "visa required")
+    matrix.destination("US", US_VISA_WAIVER, "eta", 90)
+    matrix.destination("US", ["CA", "BM"], "visa free", 180)
+    matrix.destination("GB", UK_ETA, "eta", 180)
+    matrix.destination("CA", CANADA_ETA, "eta", 180)
+    matrix.destination("CA", ["US"], "visa free", 180)
+    matrix.destination("AU", AUSTRALIA_ETA, "eta", 90)
+    matrix.destination("JP", JAPAN_VISA_FREE, "visa free", 90)
+    matrix.destination("JP", JAPAN_15_DAYS, "visa free", 15)
+    matrix.destination("CN", ["US", "GB", "CA"], "visa required")
+    matrix.destination("CN", CHINA_VISA_FREE, "visa free", 30)
+    matrix.destination("MX", MEXICO_VISA_FREE, "visa free", 180)
+    matrix.destination("ZA", SOUTH_AFRICA_VISA_FREE, "visa free", 90)
+    matrix.destination("BR", BRAZIL_VISA_FREE, "visa free", 90)
+    matrix.destination("BR", BRAZIL_E_VISA, "e-visa")
+
+    for bloc in VISA_FREE_BLOCS:
+        for passport in bloc:
+            matrix.destination(passport, bloc, "visa free")
+    for bloc in FREE_MOVEMENT_BLOCS:
+        for passport in bloc:
+            matrix.destination(passport, bloc, "freedom of movement")
+    for code in codes:
+        matrix.set(code, code, "citizen")
+    for territory, country in TERRITORIES.items():
+        matrix.copy_destination(country, territory)
+
+
+def read_dataset(path: str = None) -> str:
+    """The passport-index tidy CSV, from `path` or downloaded."""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    with urllib.request.urlopen(DATASET_URL, timeout=60) as response:
+        return response.read().decode("utf-8")
+
+
+def apply_csv(matrix: Matrix, text: str) -> int:
+    """Overlay a passport-index tidy CSV (Passport, Destination, Requirement); returns the rows applied."""
+    rows = 0
+    for row in csv.DictReader(io.StringIO(text)):
+        rows += 1
+        requirement = row["Requirement"].strip().lower()
+        passport, destination = row["Passport"].strip().upper(), row["Destination"].strip().upper()
+        if requirement.lstrip("-").isdigit():
+            days = int(requirement)
+            if days < 0:
+                matrix.set(passport, destination, "citizen")
+            else:
+                matrix.set(passport, destination, "visa free", min(days, 365))
+        elif requirement in CATEGORY:
+            matrix.set(passport, destination, requirement)
+        elif requirement in ("covid ban", "no admission"):
+            matrix.set(passport, destination, "no admission")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--csv", help="Local copy of passport-index-tidy-iso2.csv (downloaded otherwise)")
+    parser.add_argument("--offline", action="store_true", help="Compile from the built-in policies and regimes only")
+    args = parser.parse_args()
+
+    countries = read_countries()
+    codes = [iso2 for iso2, _, _ in countries]
+    matrix = Matrix(codes)
+    apply_policies(matrix)
+    apply_regimes(matrix, codes)
+    if not args.offline:
+        try:
+            text = read_dataset(args.csv)
+        except OSError as e:
+            sys.exit(f"Could not read the passport-index dataset ({e}); use --csv or --offline")
+        print(f"{apply_csv(matrix, text)} pairs from the passport-index dataset")
+    if len(matrix.duration_values) > 255:
+        sys.exit("Too many distinct durations for a uint8 plane")
+
+    with open(os.path.join(DATA_DIR, "visa_matrix.u8"), "wb") as f:
+        f.write(bytes(matrix.categories))
+        f.write(bytes(matrix.durations))
+    with open(os.path.join(DATA_DIR, "visa_index.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "source": "built-in policies" if args.offline else "passport-index dataset",
+            "codes": codes,
+            "names": {iso2: name for iso2, _, name in countries},
+            "categories": CATEGORIES,
+            "durations": matrix.duration_values,
+            "aliases": dict(sorted(build_aliases(countries).items())),
+        }, f, ensure_ascii=False, separators=(",", ":"))
+
+    known = sum(1 for value in matrix.categories if value)
+    print(f"{len(codes)} countries, {known} known passport/destination pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+from typing import Dict, NamedTuple, Optional, Tuple
+import os
+import threading
+import time
+import requests
+from tools.currency_matrix import CrossRateMatrix
+from tools.persistent_cache import PersistentCache
+
+EXCHANGE_RATE_API_URL = "https://v6.exchangerate-api.com/v6"
+
+# Seconds a rate table is considered fresh; the provider publishes new rates daily
+DEFAULT_TTL = float(os.environ.get("JOURNI_EXCHANGE_RATE_TTL", str(6 * 3600)))
+
+# Once a table is this far into its TTL, the next lookup refreshes it in the background
+REFRESH_AHEAD = 0.8
+
+# Common exchange rates (as of early 2025), the last resort when no live table is available
+STORED_RATES = {
+    "USD": {"EUR": 0.92, "GBP": 0.79, "JPY": 149.50, "CAD": 1.35, "AUD": 1.52, "CNY": 7.20, "INR": 83.20, "MXN": 17.05},
+    "EUR": {"USD": 1.09, "GBP": 0.86, "JPY": 163.00, "CAD": 1.47, "AUD": 1.66, "CNY": 7.85, "INR": 90.70, "MXN": 18.60},
+    "GBP": {"USD": 1.27, "EUR": 1.16, "JPY": 189.30, "CAD": 1.71, "AUD": 1.92, "CNY": 9.10, "INR": 105.30, "MXN": 21.60},
+    "JPY": {"USD": 0.0067, "EUR": 0.0061, "GBP": 0.0053, "CAD": 0.0090, "AUD": 0.0102, "CNY": 0.0482, "INR": 0.5565, "MXN": 0.1141},
+    "CAD": {"USD": 0.74, "EUR": 0.68, "GBP": 0.58, "JPY": 110.70, "AUD": 1.13, "CNY": 5.33, "INR": 61.60, "MXN": 12.60},
+    "AUD": {"USD": 0.66, "EUR": 0.60, "GBP": 0.52, "JPY": 98.40, "CAD": 0.89, "CNY": 4.73, "INR": 54.70, "MXN": 11.20},
+    "CNY": {"USD": 0.14, "EUR": 0.13, "GBP": 0.11, "JPY": 20.80, "CAD": 0.19, "AUD": 0.21, "INR": 11.60, "MXN": 2.37},
+    "INR": {"USD": 0.012, "EUR": 0.011, "GBP": 0.0095, "JPY": 1.80, "CAD": 0.016, "AUD": 0.018, "CNY": 0.086, "MXN": 0.205},
+    "MXN": {"USD": 0.059, "EUR": 0.054, "GBP": 0.046, "JPY": 8.77, "CAD": 0.079, "AUD": 0.089, "CNY": 0.422, "INR": 4.88}
+}
+
+
+class RateSnapshot(NamedTuple):
+    base: str
+    # currency code -> units of that currency per 1 unit of `base`
+    rates: Dict[str, float]
+    fetched_at: float
+    # Provider's own publication time, for display
+    updated: str = ""
+
+
+class ExchangeRateService:
+    """
+    Full exchange-rate tables fetched from ExchangeRate-API with `/latest/{base}`.
+
+    One table answers conversions between every pair of currencies it lists,
+    so a single request per base serves all conversions locally. Tables are
+    kept in memory and on disk. A table nearing the end of its TTL is refreshed
+    in the background, and an expired one is still used if a refresh fails.
+    Conversions read a cross-rate matrix built once per table.
+    """
+
+    # Every conversion is triangulated through this base's table
+    reference_base = "USD"
+
+    def __init__(self, api_key: Optional[str] = None, ttl: Optional[float] = None, timeout: float = 10, cache: Optional[PersistentCache] = None):
+        self.api_key = api_key
+        self.ttl = ttl or DEFAULT_TTL
+        self.timeout = timeout
+        # Entries never expire on disk: a stale table beats no table when the API is down
+        self.cache = cache or PersistentCache("exchange_rates")
+        self.snapshots: Dict[str, RateSnapshot] = {}
+        self.lock = threading.Lock()
+        # One fetch at a time per base; concurrent callers wait for it and reuse the result
+        self.fetch_locks: Dict[str, threading.Lock] = {}
+        self.refreshing = set()
+        # Cross-rate matrix of the reference table, rebuilt when the table changes
+        self.matrices: Dict[str, Tuple[RateSnapshot, CrossRateMatrix]] = {}
+
+    def _fetch(self, base: str) -> Optional[RateSnapshot]:
+        response = requests.get(f"{EXCHANGE_RATE_API_URL}/{self.api_key}/latest/{base}", timeout=self.timeout)
+        data = response.json()
+        if data.get("result") != "success":
+            return None
+
+        snapshot = RateSnapshot(base, data["conversion_rates"], time.time(), data.get("time_last_update_utc", ""))
+        with self.lock:
+            self.snapshots[base] = snapshot
+        self.cache.set(base, snapshot._asdict())
+        return snapshot
+
+    def _stored(self, base: str) -> Optional[RateSnapshot]:
+        with self.lock:
+            snapshot = self.snapshots.get(base)
+        if snapshot is None:
+            cached = self.cache.get(base)
+            if cached:
+                snapshot = RateSnapshot(**cached)
+                with self.lock:
+                    self.snapshots.setdefault(base, snapshot)
+        return snapshot
+
+    def _refresh(self, base: str) -> Optional[RateSnapshot]:
+        with self.lock:
+            fetch_lock = self.fetch_locks.setdefault(base, threading.Lock())
+        with fetch_lock:
+            # Another thread may have refreshed the table while we waited
+            snapshot = self._stored(base)
+            if snapshot is not None and time.time() - snapshot.fetched_at < self.ttl * REFRESH_AHEAD:
+                return snapshot
+            try:
+                return self._fetch(base)
+            except Exception:
+                return None
+
+    def _refresh_in_background(self, base: str):
+        with self.lock:
+            if base in self.refreshing:
+                return
+            self.refreshing.add(base)
+
+        def refresh():
+            try:
+                self._refresh(base)
+            finally:
+                with self.lock:
+                    self.refreshing.discard(base)
+
+        threading.Thread(target=refresh, name=f"exchange-rates-{base}", daemon=True).start()
+
+    def snapshot(self, base: Optional[str] = None) -> Optional[RateSnapshot]:
+        """The rate table for `base`, fetching it only when missing or expired."""
+        base = (base or self.reference_base).upper()
+        if not self.api_key:
+            return self._stored(base)
+
+        snapshot = self._stored(base)
+        age = time.time() - snapshot.fetched_at if snapshot else None
+        if snapshot is not None and age < self.ttl:
+            if age > self.ttl * REFRESH_AHEAD:
+                self._refresh_in_background(base)
+            return snapshot
+
+        # Missing or expired: fetch now, falling back to the expired table on failure
+        return self._refresh(base) or snapshot
+
+    def matrix(self, base: Optional[str] = None) -> Optional[CrossRateMatrix]:
+        """Cross rates between every pair of currencies in the current table for `base`."""
+        snapshot = self.snapshot(base)
+        if snapshot is None:
+            return None
+        with self.lock:
+            built = self.matrices.get(snapshot.base)
+            if built is None or built[0] is not snapshot:
+                updated = f", updated {snapshot.updated}" if snapshot.updated else ""
+                built = (snapshot, CrossRateMatrix(snapshot.rates, f"Data from ExchangeRate-API{updated}"))
+                self.matrices[snapshot.base] = built
+        return built[1]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_exchange_rate_service() -> ExchangeRateService:
+    """Process-wide rate service using EXCHANGE_RATE_API_KEY, shared by the currency tools."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ExchangeRateService(os.environ.get("EXCHANGE_RATE_API_KEY"))
+        return _service
+
+
+_fallback_matrix = None
+
+
+def get_fallback_matrix() -> CrossRateMatrix:
+    """Cross rates between the stored currencies, triangulated through USD."""
+    global _fallback_matrix
+    with _service_lock:
+        if _fallback_matrix is None:
+            _fallback_matrix = CrossRateMatrix.from_pairs(
+                STORED_RATES, source="Note: Rates are approximations for planning purposes only"
+            )
+        return _fallback_matrix
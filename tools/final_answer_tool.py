@@ -1,7 +1,8 @@
 from typing import Any, Optional
 from smolagents.tools import Tool
 from smolagents.agent_types import AgentImage
-import re
+from tools.answer_builder import current_answer_builder
+from tools.answer_formatter import format_summary, parse_answer
 
 class FinalAnswerTool(Tool):
     name = "final_answer"
@@ -12,6 +13,10 @@ class FinalAnswerTool(Tool):
     def __init__(self):
         super().__init__()
 
+    def _built_from_sections(self, answer: str) -> bool:
+        builder = current_answer_builder()
+        return builder is not None and bool(builder.sections) and builder.document() in answer
+
     def forward(self, answer: Any) -> Any:
         # Direct handling for AgentImage objects
         if isinstance(answer, AgentImage):
@@ -28,74 +33,23 @@ class FinalAnswerTool(Tool):
         
         # Check if answer contains both image path and destination information
         if isinstance(answer, str):
-            # Look for image paths in the text
-            image_path_match = re.search(r'(/tmp/gradio/[^\s\]]+\.(?:png|jpg|jpeg|webp))', answer)
-            
-            if image_path_match:
-                image_path = image_path_match.group(1)
-                
-                # Try to extract destination from the text
-                # First look for markdown format: ![Visual preview of Destination](path)
-                destination_match = re.search(r'!\[Visual preview of ([^\]]+)\]', answer)
-                if destination_match:
-                    destination = destination_match.group(1)
-                # Then look for "Welcome to Destination!" format
-                elif "Welcome to " in answer:
-                    welcome_match = re.search(r'Welcome to ([^!]+)!', answer)
-                    if welcome_match:
-                        destination = welcome_match.group(1).strip()
-                else:
-                    # Default if no destination found
-                    destination = "this destination"
-                
-                # Create image with caption
-                image = AgentImage(image_path)
-                caption = f"✨ Visual preview of {destination} ✨"
-                
-                # Replace the image path/markdown with the proper image display
-                modified_answer = answer.replace(image_path_match.group(0), "")
-                # Also remove any markdown image syntax
-                modified_answer = re.sub(r'!\[Visual preview of [^\]]+\]\([^)]+\)', "", modified_answer)
-                
-                # Remove multiple newlines
-                modified_answer = re.sub(r'\n{3,}', '\n\n', modified_answer)
-                
-                return f"{caption}\n\n{image.to_string()}\n\n{modified_answer.strip()}"
-            
+            # One scan finds the image, the destination, the paragraphs and the tips
+            parsed = parse_answer(answer)
+
+            if parsed.image_path:
+                # Create image with caption; the image path/markdown is replaced by the image itself
+                image = AgentImage(parsed.image_path)
+                caption = f"✨ Visual preview of {parsed.destination or 'this destination'} ✨"
+                return f"{caption}\n\n{image.to_string()}\n\n{parsed.body}"
+
             # Handle direct image paths
             elif answer.startswith('/tmp/gradio/') or answer.endswith(('.png', '.jpg', '.jpeg', '.webp')):
-                # Just create a generic caption for direct image paths
-                image = AgentImage(answer)
-                return image
-            
-            # Format text answers for better readability (keep existing behavior)
-            elif "Travel summary" not in answer and "Detailed travel information" not in answer:
-                # Your existing text formatting code
-                sections = answer.split("\n\n")
-                formatted_answer = "### Travel summary (short version):\n"
-                
-                if len(sections) > 0:
-                    formatted_answer += sections[0] + "\n\n"
-                
-                formatted_answer += "### Detailed travel information:\n"
-                if len(sections) > 1:
-                    formatted_answer += "\n".join(sections[1:]) + "\n\n"
-                
-                formatted_answer += "### Practical tips and recommendations:\n"
-                # Look for tips keywords in the answer
-                tip_keywords = ["tip", "recommend", "bring", "pack", "don't forget", "suggestion"]
-                tip_lines = []
-                
-                for line in answer.split("\n"):
-                    if any(keyword in line.lower() for keyword in tip_keywords):
-                        tip_lines.append(line)
-                
-                if tip_lines:
-                    formatted_answer += "\n".join(tip_lines)
-                else:
-                    formatted_answer += "Safe travels! Remember to check local regulations and customs before your trip."
-                
-                return formatted_answer
-        
+                return AgentImage(answer)
+
+            # Format text answers for better readability;
+            # answers assembled with add_answer_section are already structured
+            elif not parsed.formatted and not self._built_from_sections(answer):
+                return format_summary(parsed)
+
         # Return the original answer for other types
         return answer
\ No newline at end of file
@@ -0,0 +1,251 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import argparse
+import os
+import re
+import threading
+import unicodedata
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Common nicknames, former names and regions travellers ask about, mapped to
+# a name that is in the index
+ALIASES = {
+    "nyc": "new york city", "new york": "new york city", "manhattan": "new york city", "brooklyn": "new york city",
+    "la": "los angeles", "sf": "san francisco", "san fran": "san francisco", "vegas": "las vegas",
+    "dc": "washington", "washington dc": "washington", "washington d c": "washington",
+    "philly": "philadelphia", "nola": "new orleans",
+    "bombay": "mumbai", "calcutta": "kolkata", "madras": "chennai", "bangalore": "bengaluru", "delhi": "new delhi",
+    "peking": "beijing", "canton": "guangzhou", "saigon": "ho chi minh city", "hcmc": "ho chi minh city",
+    "rangoon": "yangon", "kiev": "kyiv", "mecca": "makkah", "den haag": "the hague",
+    "rio": "rio de janeiro", "cdmx": "mexico city", "ciudad de mexico": "mexico city",
+    "bali": "denpasar", "phuket": "phuket", "maldives": "male",
+    "hawaii": "honolulu", "maui": "kahului", "alaska": "anchorage",
+    "england": "london", "scotland": "edinburgh", "wales": "cardiff", "northern ireland": "belfast",
+    "uk": "united kingdom", "great britain": "united kingdom", "britain": "united kingdom",
+    "us": "united states", "usa": "united states", "america": "united states", "united states of america": "united states",
+    "uae": "united arab emirates", "holland": "netherlands",
+    "south korea": "south korea", "korea": "south korea", "czech republic": "czechia",
+    "turkiye": "turkey", "cote d ivoire": "ivory coast", "burma": "myanmar",
+    "tahiti": "papeete", "bora bora": "papeete", "santorini": "athens", "mykonos": "athens", "crete": "irakleion", "heraklion": "irakleion",
+    "tenerife": "santa cruz de tenerife", "sicily": "palermo", "tuscany": "florence", "provence": "marseille", "patagonia": "punta arenas",
+    "zanzibar": "zanzibar", "serengeti": "arusha", "galapagos": "pacific galapagos",
+    "swiss alps": "zurich", "lapland": "rovaniemi", "machu picchu": "cusco", "cuzco": "cusco",
+}
+
+# "Paris, Texas": US states are accepted as a country hint
+US_STATES = frozenset([
+    "alabama", "alaska", "arizona", "arkansas", "california", "colorado", "connecticut", "delaware",
+    "florida", "georgia", "hawaii", "idaho", "illinois", "indiana", "iowa", "kansas", "kentucky",
+    "louisiana", "maine", "maryland", "massachusetts", "michigan", "minnesota", "mississippi",
+    "missouri", "montana", "nebraska", "nevada", "new hampshire", "new jersey", "new mexico",
+    "new york", "north carolina", "north dakota", "ohio", "oklahoma", "oregon", "pennsylvania",
+    "rhode island", "south carolina", "south dakota", "tennessee", "texas", "utah", "vermont",
+    "virginia", "washington", "west virginia", "wisconsin", "wyoming",
+])
+
+# Words that never identify a place on their own
+STOPWORDS = frozenset("a an and at for from go going i in is it me my of on the time to trip visit what whats where".split())
+
+# Words after which a free-form query names its destination: "beaches in Thailand"
+PLACE_PREPOSITIONS = frozenset("in to visit visiting from at near around".split())
+
+# Towns smaller than this only match inside a sentence when the sentence clearly names them
+# (after a preposition or at its end), so "best beaches in Thailand" is not Best, NL
+MIN_SCAN_POPULATION = 100000
+
+
+class Place(NamedTuple):
+    name: str
+    country: str
+    timezone: str
+    population: int
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+def normalize_place(text: str) -> str:
+    """Case-fold, strip accents and punctuation: 'São Paulo, BR' -> 'sao paulo br'."""
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", folded).split())
+
+
+class Gazetteer:
+    """
+    Offline place-name to IANA timezone index.
+
+    Built from the bundled GeoNames city list (every place with 15,000+
+    inhabitants), the bundled country list and pytz's zone names. Every name
+    is stored under its normalized form, so a lookup is a dict access.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        # normalized name -> places sharing that name, most populous first
+        self.places: Dict[str, List[Place]] = {}
+        # ISO-3166 alpha-2 code -> country place
+        self.countries: Dict[str, Place] = {}
+        self._load_countries(os.path.join(data_dir, "countries.tsv"))
+        self._load_cities(os.path.join(data_dir, "cities.tsv"))
+        self._load_zones()
+
+    @staticmethod
+    def _rows(path: str):
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                yield line.rstrip("\n").split("\t")
+
+    def _add(self, key: str, place: Place):
+        key = normalize_place(key)
+        if key:
+            self.places.setdefault(key, []).append(place)
+
+    def _load_countries(self, path: str):
+        for iso2, iso3, name, capital, timezone in self._rows(path):
+            if not timezone:
+                continue
+            country = Place(name, iso2, timezone, 0)
+            self.countries[iso2] = country
+            self._add(name, country)
+            # "The Netherlands" is asked for as "Netherlands"
+            if name.startswith("The "):
+                self._add(name[len("The "):], country)
+
+    def _load_cities(self, path: str):
+        # Rows are sorted by population, so the biggest namesake comes first
+        for name, country, timezone, population, latitude, longitude in self._rows(path):
+            self._add(name, Place(name, country, timezone, int(population), float(latitude), float(longitude)))
+
+    def _load_zones(self):
+        try:
+            import pytz
+        except ImportError:
+            return
+
+        # Countries missing from the bundled list use pytz's first zone for them
+        for iso2, zones in pytz.country_timezones.items():
+            if iso2 not in self.countries and zones:
+                country = Place(pytz.country_names.get(iso2, iso2), iso2, zones[0], 0)
+                self.countries[iso2] = country
+                self._add(country.name, country)
+
+        # Zone names themselves: 'Europe/Rome', and 'Rome' if no city already has that name
+        for zone in pytz.all_timezones:
+            place = Place(zone, "", zone, 0)
+            self._add(zone, place)
+            city = normalize_place(zone.rsplit("/", 1)[-1].replace("_", " "))
+            if city and city not in self.places:
+                self._add(city, place)
+
+    def _country_code(self, hint: str) -> Optional[str]:
+        if hint in US_STATES:
+            return "US"
+        hint = ALIASES.get(hint, hint)
+        if len(hint) == 2 and hint.upper() in self.countries:
+            return hint.upper()
+        for place in self.places.get(hint, []):
+            if place.population == 0 and place.country and self.countries.get(place.country) is place:
+                return place.country
+        return None
+
+    def _best(self, key: str, country: Optional[str] = None) -> Optional[Place]:
+        candidates = self.places.get(ALIASES.get(key, key))
+        if not candidates:
+            return None
+        if country:
+            for place in candidates:
+                if place.country == country:
+                    return place
+        return candidates[0]
+
+    def lookup(self, query: str) -> Optional[Place]:
+        """Resolve a free-form destination ('Kyoto', 'Paris, France', 'a week in Lisbon') to a place."""
+        normalized = normalize_place(query)
+        if not normalized:
+            return None
+
+        place = self._best(normalized)
+        if place:
+            return place
+
+        # "City, Country" or "City, State": use the rest as a country hint
+        parts = [normalize_place(part) for part in query.split(",") if normalize_place(part)]
+        if len(parts) > 1:
+            country = self._country_code(parts[-1])
+            place = self._best(parts[0], country)
+            if place and (not country or place.country == country):
+                return place
+            # A town too small for the index: the country's timezone is the best guess
+            if country:
+                return self.countries[country]
+
+        # Run of words that names a place, e.g. "weekend in new york". One named after "in",
+        # "to"... wins, then a well-known place, then a small town ending the query; longest first
+        tokens = normalized.split()
+        found = []
+        for size in range(min(len(tokens), 5), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                candidate = tokens[start:start + size]
+                if size == 1 and (candidate[0] in STOPWORDS or len(candidate[0]) < 3):
+                    continue
+                key = " ".join(candidate)
+                place = self._best(key)
+                if place is None:
+                    continue
+                # Countries and timezone names have no population; aliases are places by definition
+                if start > 0 and tokens[start - 1] in PLACE_PREPOSITIONS:
+                    rank = 0
+                elif place.population == 0 or place.population >= MIN_SCAN_POPULATION or key in ALIASES:
+                    rank = 1
+                elif start + size == len(tokens):
+                    rank = 2
+                else:
+                    continue
+                found.append((rank, -size, start, place))
+        return min(found, key=lambda f: f[:3])[3] if found else None
+
+    def unresolved_aliases(self) -> List[str]:
+        """Aliases whose target is not in the index (and so resolve to nothing)."""
+        return [alias for alias, target in ALIASES.items() if not self.places.get(target)]
+
+    def timezone(self, query: str) -> Optional[Tuple[str, str]]:
+        """Return (matched name, IANA timezone) for a destination, or None."""
+        place = self.lookup(query)
+        return (place.name, place.timezone) if place else None
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer, loaded from disk on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve destinations with the bundled gazetteer, or check its aliases.")
+    parser.add_argument("queries", nargs="*", help="Destinations to resolve; without any, every alias is checked")
+    args = parser.parse_args()
+
+    gazetteer = get_gazetteer()
+    for query in args.queries:
+        print(f"{query!r}: {gazetteer.lookup(query)}")
+    if not args.queries:
+        unresolved = gazetteer.unresolved_aliases()
+        for alias in unresolved:
+            print(f"alias {alias!r} -> {ALIASES[alias]!r} is not in the index")
+        print(f"{len(ALIASES) - len(unresolved)}/{len(ALIASES)} aliases resolve")
+        raise SystemExit(1 if unresolved else 0)
+
+
+if __name__ == "__main__":
+    main()
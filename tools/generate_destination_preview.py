@@ -1,7 +1,7 @@
 from typing import Any, Optional
 from smolagents.tools import Tool
 from smolagents.agent_types import AgentImage
-from smolagents import Tool as BaseSmolTool  # Using a different name to avoid conflict
+from tools.image_service import get_image_service
 
 class GenerateDestinationPreviewTool(Tool):
     name = "generate_destination_preview"
@@ -11,12 +11,8 @@ class GenerateDestinationPreviewTool(Tool):
 
     def __init__(self):
         super().__init__()
-        # Initialize image generation tool from the Space
-        self.image_generator = BaseSmolTool.from_space(
-            "black-forest-labs/FLUX.1-schnell",
-            name="image_generator",
-            description="Generate an image from a text prompt."
-        )
+        # Shared FLUX client: connects lazily and collapses identical in-flight prompts
+        self.image_generator = get_image_service()
     
     def forward(self, destination: str) -> Any:
         # Create a detailed prompt for the image generator
@@ -1,31 +1,64 @@
-from typing import Any
+from typing import Any, Iterable, Optional
 from smolagents.tools import Tool
 from smolagents.agent_types import AgentImage
-from smolagents import Tool as SmolTool  # Different name to avoid conflict
+from tools.image_cache import ImageCache, TOP_DESTINATIONS, image_source_path
+from tools.image_jobs import get_image_jobs
+from tools.image_service import get_image_service
+import os
 
 class GenerateImageTool(Tool):
     name = "generate_image"
-    description = "Generates an image of a travel destination or scene."
+    description = "Generates an image of a travel destination or scene. The image is rendered in the background: the tool returns a short image handle right away, which you should print and include in your final answer where the image belongs."
     inputs = {'prompt': {'type': 'string', 'description': 'Description of the image to generate, such as a destination name.'}}
     output_type = "image"
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ImageCache] = None, background: Optional[bool] = None):
         super().__init__()
-        # Initialize the image generator from Space
-        self.image_generator = SmolTool.from_space(
-            "black-forest-labs/FLUX.1-schnell",
-            name="image_generator",
-            description="Generate an image from a text prompt."
-        )
-    
+        # Shared FLUX client: connects lazily and collapses identical in-flight prompts
+        self.image_generator = get_image_service()
+        # Popular destinations are served from disk instead of being re-rendered
+        self.cache = cache or ImageCache()
+        # Render in the background and return a handle instead of blocking the agent
+        if background is None:
+            background = os.environ.get("JOURNI_BACKGROUND_IMAGES", "1") != "0"
+        self.background = background
+
+    # A more detailed prompt with specific landmarks if available; images are cached per destination and template
+    prompt_template = "A beautiful, photorealistic travel photo of {destination}, showing iconic landmarks and distinctive scenery, high-quality professional travel photography"
+
+    @classmethod
+    def build_prompt(cls, destination: str) -> str:
+        return cls.prompt_template.format(destination=destination)
+
+    def preseed(self, destinations: Optional[Iterable[str]] = None, top_n: int = 10) -> int:
+        """Render the top-N destinations ahead of time so they are served from the cache."""
+        destinations = list(destinations or TOP_DESTINATIONS)[:top_n]
+        return self.cache.preseed(destinations, self.prompt_template, self.image_generator)
+
+    def _render(self, destination: str, enhanced_prompt: str) -> Optional[str]:
+        image = self.image_generator(enhanced_prompt)
+        return self.cache.put(destination, self.prompt_template, image) or image_source_path(image)
+
     def forward(self, prompt: str) -> Any:
-        # Create a more detailed prompt with specific landmarks if available
         destination = prompt.strip()
-        enhanced_prompt = f"A beautiful, photorealistic travel photo of {destination}, showing iconic landmarks and distinctive scenery, high-quality professional travel photography"
-        
+        enhanced_prompt = self.build_prompt(destination)
+
         try:
+            cached_path = self.cache.get(destination, self.prompt_template)
+
+            if self.background:
+                # The chat UI picks the image up by its handle once it is ready
+                jobs = get_image_jobs()
+                if cached_path:
+                    job = jobs.completed(destination, cached_path)
+                else:
+                    job = jobs.submit(destination, lambda: self._render(destination, enhanced_prompt))
+                return job.handle
+
+            if cached_path:
+                return AgentImage(cached_path)
+
             # Generate the image
-            image_path = self.image_generator(enhanced_prompt)
-            return AgentImage(image_path)  # Return as AgentImage directly
+            return AgentImage(self._render(destination, enhanced_prompt))  # Return as AgentImage directly
         except Exception as e:
-            return f"Error generating image: {str(e)}"
\ No newline at end of file
+            return f"Error generating image: {str(e)}"
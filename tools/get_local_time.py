@@ -2,6 +2,16 @@ from typing import Any, Optional
 from smolagents.tools import Tool
 import datetime
 import pytz
+from tools.gazetteer import get_gazetteer
+
+
+def format_utc_offset(local_time: datetime.datetime) -> str:
+    """Format a datetime's UTC offset as 'UTC+9' or 'UTC+5:30'."""
+    minutes = int(local_time.utcoffset().total_seconds() // 60)
+    sign = "+" if minutes >= 0 else "-"
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"UTC{sign}{hours}" + (f":{minutes:02d}" if minutes else "")
+
 
 class GetLocalTimeTool(Tool):
     name = "get_local_time"
@@ -18,65 +28,20 @@ class GetLocalTimeTool(Tool):
                 "You must install package `pytz` to run this tool: for instance run `pip install pytz`."
             ) from e
         
-        # Map of common tourist destinations to their timezones
-        self.destination_timezones = {
-            "london": "Europe/London",
-            "paris": "Europe/Paris",
-            "rome": "Europe/Rome",
-            "madrid": "Europe/Madrid",
-            "berlin": "Europe/Berlin",
-            "amsterdam": "Europe/Amsterdam",
-            "athens": "Europe/Athens",
-            "istanbul": "Europe/Istanbul",
-            "dubai": "Asia/Dubai",
-            "new delhi": "Asia/Kolkata",
-            "mumbai": "Asia/Kolkata",
-            "bangkok": "Asia/Bangkok",
-            "singapore": "Asia/Singapore",
-            "tokyo": "Asia/Tokyo",
-            "seoul": "Asia/Seoul",
-            "beijing": "Asia/Shanghai",
-            "shanghai": "Asia/Shanghai",
-            "hong kong": "Asia/Hong_Kong",
-            "sydney": "Australia/Sydney",
-            "melbourne": "Australia/Melbourne",
-            "auckland": "Pacific/Auckland",
-            "fiji": "Pacific/Fiji",
-            "honolulu": "Pacific/Honolulu",
-            "anchorage": "America/Anchorage",
-            "los angeles": "America/Los_Angeles",
-            "san francisco": "America/Los_Angeles",
-            "las vegas": "America/Los_Angeles",
-            "denver": "America/Denver",
-            "chicago": "America/Chicago",
-            "houston": "America/Chicago",
-            "new york": "America/New_York",
-            "miami": "America/New_York",
-            "toronto": "America/Toronto",
-            "mexico city": "America/Mexico_City",
-            "rio de janeiro": "America/Sao_Paulo",
-            "sao paulo": "America/Sao_Paulo",
-            "buenos aires": "America/Argentina/Buenos_Aires",
-            "cairo": "Africa/Cairo",
-            "cape town": "Africa/Johannesburg",
-            "johannesburg": "Africa/Johannesburg",
-            "nairobi": "Africa/Nairobi"
-        }
+        # Offline city/country -> IANA timezone index, loaded on first use
+        self.gazetteer = None
 
     def forward(self, destination: str) -> str:
         try:
-            # Normalize the destination name
-            normalized_dest = destination.lower().strip()
-            
-            # Find the closest matching timezone
-            timezone = None
-            for city, tz in self.destination_timezones.items():
-                if city in normalized_dest or normalized_dest in city:
-                    timezone = tz
-                    break
+            if self.gazetteer is None:
+                self.gazetteer = get_gazetteer()
+
+            # Resolve the destination locally (names are accent- and case-insensitive)
+            place = self.gazetteer.lookup(destination)
+            timezone = place.timezone if place else None
             
             if not timezone:
-                # If we don't have a direct match, try to find it through pytz
+                # Not in the offline index: fall back to a web search for a rough UTC offset
                 try:
                     # Try web search for timezone if available
                     import importlib
@@ -103,10 +68,7 @@ class GetLocalTimeTool(Tool):
             
             # Format the result
             formatted_time = local_time.strftime("%I:%M %p on %A, %B %d, %Y")
-            time_diff = local_time.utcoffset().total_seconds() / 3600
-            sign = "+" if time_diff >= 0 else ""
-            
-            return f"The current local time in {destination} is {formatted_time} (UTC{sign}{int(time_diff)})"
+            return f"The current local time in {destination} is {formatted_time} ({format_utc_offset(local_time)})"
         
         except Exception as e:
             return f"Error getting local time for {destination}: {str(e)}"
@@ -1,7 +1,38 @@
 from typing import Any, Optional
 from smolagents.tools import Tool
 import os
+import re
 import requests
+from tools.gazetteer import normalize_place
+from tools.passage_ranker import BM25Index
+from tools.persistent_cache import PersistentCache
+from tools.visa_matrix import VisaRequirement, get_visa_matrix
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+# Terms that mark a sentence as actually stating an entry requirement
+VISA_TERMS = "visa required free exempt entry days stay evisa e-visa online arrival eta esta authorization passport"
+
+
+def best_snippets(results, query: str, top_k: int = 2) -> Optional[str]:
+    """The sentences across all search results that best answer `query`, with their sources."""
+    sentences, sources = [], []
+    for result in results:
+        for sentence in SENTENCE_PATTERN.split(result.get("body") or ""):
+            if len(sentence.split()) >= 4:
+                sentences.append(sentence.strip())
+                sources.append(result.get("href"))
+    if not sentences:
+        return None
+
+    ranked = BM25Index(sentences).top_k(f"{query} {VISA_TERMS}", top_k)
+    if not ranked:
+        return None
+    # Keep the page order of the chosen sentences so they read naturally
+    chosen = sorted(index for index, _ in ranked)
+    snippet = " ".join(sentences[index] for index in chosen)
+    links = list(dict.fromkeys(sources[index] for index in chosen if sources[index]))
+    return snippet + ("\n\nSources: " + ", ".join(links) if links else "")
+
 
 class GetVisaRequirementsTool(Tool):
     name = "get_visa_requirements"
@@ -12,119 +43,31 @@ class GetVisaRequirementsTool(Tool):
     }
     output_type = "string"
 
+    # Web answers are kept for 30 days; searches that found nothing are retried after a day
+    answer_ttl = 30 * 24 * 3600
+    miss_ttl = 24 * 3600
+
     def __init__(self, api_key=None):
         super().__init__()
         # You can set an API key for a real visa API service
         self.api_key = api_key or os.environ.get("VISA_API_KEY")
         
-        # Map of common country names to their normalized forms
-        self.country_mapping = {
-            "us": "united states", "usa": "united states", "united states of america": "united states",
-            "uk": "united kingdom", "britain": "united kingdom", "great britain": "united kingdom",
-            "uae": "united arab emirates", "emirates": "united arab emirates",
-            "china": "china", "prc": "china",
-            "japan": "japan", 
-            "korea": "south korea", "south korea": "south korea", "republic of korea": "south korea",
-            "india": "india",
-            "germany": "germany",
-            "france": "france",
-            "italy": "italy",
-            "spain": "spain",
-            "mexico": "mexico",
-            "brazil": "brazil",
-            "australia": "australia", "aus": "australia",
-            "new zealand": "new zealand", "nz": "new zealand",
-            "canada": "canada", "can": "canada",
-            "russia": "russia", "russian federation": "russia",
-            "south africa": "south africa", "sa": "south africa",
-            "thailand": "thailand",
-            "vietnam": "vietnam",
-            "indonesia": "indonesia",
-            "malaysia": "malaysia",
-            "philippines": "philippines", "ph": "philippines",
-            "singapore": "singapore", "sg": "singapore",
-            "egypt": "egypt",
-            "turkey": "turkey", "türkiye": "turkey"
-        }
-        
-        # Sample visa requirement data for frequently traveled routes
-        self.visa_data = {
-            "united states": {
-                "european union": "No visa required for stays up to 90 days in the Schengen Area",
-                "united kingdom": "No visa required for stays up to 6 months",
-                "japan": "No visa required for stays up to 90 days",
-                "australia": "Electronic Travel Authority (ETA) required",
-                "china": "Visa required, must apply in advance",
-                "india": "e-Visa available, apply online before travel",
-                "brazil": "No visa required for stays up to 90 days",
-                "mexico": "No visa required for stays up to 180 days",
-                "south africa": "No visa required for stays up to 90 days",
-                "thailand": "No visa required for stays up to 30 days",
-                "canada": "No visa required for US citizens"
-            },
-            "united kingdom": {
-                "european union": "No visa required for stays up to 90 days in the Schengen Area",
-                "united states": "ESTA required for entry",
-                "japan": "No visa required for stays up to 90 days",
-                "australia": "eVisitor visa required",
-                "china": "Visa required, must apply in advance",
-                "india": "e-Visa available, apply online before travel",
-                "brazil": "No visa required for stays up to 90 days",
-                "mexico": "No visa required for stays up to 180 days",
-                "south africa": "No visa required for stays up to 90 days",
-                "thailand": "No visa required for stays up to 30 days",
-                "canada": "eTA required for British citizens"
-            },
-            "canada": {
-                "european union": "No visa required for stays up to 90 days in the Schengen Area",
-                "united states": "No visa required for Canadian citizens",
-                "japan": "No visa required for stays up to 90 days",
-                "australia": "eVisitor visa required",
-                "china": "Visa required, must apply in advance",
-                "india": "e-Visa available, apply online before travel",
-                "brazil": "No visa required for stays up to 90 days",
-                "mexico": "No visa required for stays up to 180 days",
-                "south africa": "No visa required for stays up to 90 days",
-                "thailand": "No visa required for stays up to 30 days",
-                "united kingdom": "No visa required for stays up to 6 months"
-            },
-            "japan": {
-                "european union": "No visa required for stays up to 90 days in the Schengen Area",
-                "united states": "ESTA required for entry",
-                "australia": "eVisitor visa required",
-                "china": "Visa required, must apply in advance",
-                "india": "e-Visa available, apply online before travel",
-                "brazil": "Visa required for Japanese citizens",
-                "mexico": "No visa required for stays up to 180 days",
-                "south africa": "No visa required for stays up to 90 days",
-                "thailand": "No visa required for stays up to 30 days",
-                "united kingdom": "No visa required for stays up to 6 months",
-                "canada": "eTA required for Japanese citizens"
-            },
-            "australia": {
-                "european union": "No visa required for stays up to 90 days in the Schengen Area",
-                "united states": "ESTA required for entry",
-                "japan": "No visa required for stays up to 90 days",
-                "china": "Visa required, must apply in advance",
-                "india": "e-Visa available, apply online before travel",
-                "brazil": "Visa required for Australian citizens",
-                "mexico": "No visa required for stays up to 180 days",
-                "south africa": "No visa required for stays up to 90 days",
-                "thailand": "No visa required for stays up to 30 days",
-                "united kingdom": "No visa required for stays up to 6 months",
-                "canada": "eTA required for Australian citizens"
-            }
-        }
+        # Compiled passport x destination matrix, memory-mapped on first use
+        self.visa_matrix = None
+
+        # Web-search answers for pairs the matrix doesn't cover, shared by every user
+        self.answer_cache = PersistentCache("visa_answers", max_entries=20000)
 
     def forward(self, nationality: str, destination: str) -> str:
         try:
-            # Normalize inputs
-            nationality = nationality.lower().strip()
-            destination = destination.lower().strip()
-            
-            # Apply mappings if available
-            nationality = self.country_mapping.get(nationality, nationality)
-            destination = self.country_mapping.get(destination, destination)
+            if self.visa_matrix is None:
+                self.visa_matrix = get_visa_matrix()
+
+            # Resolve names, ISO codes and demonyms ("UK", "German", "Côte d'Ivoire") to ISO codes
+            nationality_code = self.visa_matrix.resolve(nationality)
+            destination_code = self.visa_matrix.resolve(destination)
+            nationality_name = self.visa_matrix.name(nationality_code) if nationality_code else nationality.strip().title()
+            destination_name = self.visa_matrix.name(destination_code) if destination_code else destination.strip().title()
             
             # Try to use a real visa API if the API key is available
             if self.api_key:
@@ -134,52 +77,70 @@ class GetVisaRequirementsTool(Tool):
                     pass
                 except:
                     # Fall back to stored data if API call fails
-                    return self._check_with_stored_data(nationality, destination)
+                    return self._check_with_stored_data(nationality_code, destination_code, nationality_name, destination_name)
             
             # If no API key is available, use the stored data
-            return self._check_with_stored_data(nationality, destination)
+            return self._check_with_stored_data(nationality_code, destination_code, nationality_name, destination_name)
         
         except Exception as e:
             return f"Error retrieving visa information: {str(e)}"
     
-    def _check_with_stored_data(self, nationality: str, destination: str) -> str:
+    def _describe(self, requirement: VisaRequirement, nationality_name: str) -> str:
+        stay = f" for stays up to {requirement.days} days" if requirement.days else ""
+        if requirement.category == "citizen":
+            return f"No visa required: {nationality_name} citizens enter as nationals"
+        if requirement.category == "freedom of movement":
+            return f"No visa required: {nationality_name} citizens have freedom of movement here (live, work and stay without a time limit)"
+        if requirement.category == "visa free":
+            return f"No visa required{stay}" if stay else "No visa required for short tourist stays"
+        if requirement.category == "eta":
+            return f"No visa required{stay}, but an electronic travel authorization (e.g. ESTA, eTA, ETA) must be obtained online before travel"
+        if requirement.category == "visa on arrival":
+            return f"Visa on arrival available{stay}"
+        if requirement.category == "e-visa":
+            return f"e-Visa available{stay}, apply online before travel"
+        if requirement.category == "no admission":
+            return f"Entry is currently not permitted for {nationality_name} citizens"
+        return "Visa required, must apply in advance at an embassy or consulate"
+
+    def _search_web(self, nationality_key: str, destination_key: str, nationality_name: str, destination_name: str) -> Optional[str]:
+        cache_key = f"{nationality_key}|{destination_key}"
+        cached = self.answer_cache.get(cache_key)
+        if cached is not None:
+            return cached["answer"]
+
+        try:
+            import importlib
+            if not importlib.util.find_spec("duckduckgo_search"):
+                return None
+            from tools.web_search import get_ddgs
+            results = get_ddgs().text(f"visa requirements for {nationality_name} citizens traveling to {destination_name}")
+        except Exception:
+            # Search errors are transient: don't remember them as a miss
+            return None
+
+        answer = best_snippets(results or [], f"{nationality_name} citizens {destination_name}")
+        self.answer_cache.set(cache_key, {"answer": answer}, ttl=self.answer_ttl if answer else self.miss_ttl)
+        return answer
+
+    def _check_with_stored_data(self, nationality_code: Optional[str], destination_code: Optional[str], nationality_name: str, destination_name: str) -> str:
         # Skip if same country (generally no visa needed for citizens)
-        if nationality == destination:
-            return f"As a citizen of {nationality.title()}, you generally don't need a visa to visit your own country."
-        
-        # Check if we have data for this nationality
-        if nationality not in self.visa_data:
-            # Try to search web for information if available
-            try:
-                import importlib
-                if importlib.util.find_spec("duckduckgo_search"):
-                    from duckduckgo_search import DDGS
-                    ddgs = DDGS()
-                    results = ddgs.text(f"visa requirements for {nationality} citizens traveling to {destination}")
-                    if results:
-                        return f"Based on web search, for {nationality.title()} citizens traveling to {destination.title()}: {results[0]['body']}\n\n(Note: Always verify visa requirements with the official embassy or consulate before travel.)"
-            except:
-                pass
-                
-            return f"I don't have specific visa information for citizens of {nationality.title()}. Please check with the embassy of {destination.title()} for accurate visa requirements."
+        if nationality_code and nationality_code == destination_code:
+            return f"As a citizen of {nationality_name}, you generally don't need a visa to visit your own country."
         
-        # Check if we have data for this destination
-        if destination not in self.visa_data[nationality]:
-            # Try to search web for information if available
-            try:
-                import importlib
-                if importlib.util.find_spec("duckduckgo_search"):
-                    from duckduckgo_search import DDGS
-                    ddgs = DDGS()
-                    results = ddgs.text(f"visa requirements for {nationality} citizens traveling to {destination}")
-                    if results:
-                        return f"Based on web search, for {nationality.title()} citizens traveling to {destination.title()}: {results[0]['body']}\n\n(Note: Always verify visa requirements with the official embassy or consulate before travel.)"
-            except:
-                pass
-                
-            return f"I don't have specific visa information for {nationality.title()} citizens traveling to {destination.title()}. Please check with the embassy of {destination.title()} for accurate visa requirements."
-        
-        # Get the visa requirements
-        requirements = self.visa_data[nationality][destination]
+        requirement = None
+        if nationality_code and destination_code:
+            requirement = self.visa_matrix.lookup(nationality_code, destination_code)
+
+        if requirement is None:
+            # Pair not covered by the compiled data: try a (cached) web search
+            searched = self._search_web(
+                nationality_code or normalize_place(nationality_name),
+                destination_code or normalize_place(destination_name),
+                nationality_name, destination_name,
+            )
+            if searched:
+                return f"Based on web search, for {nationality_name} citizens traveling to {destination_name}: {searched}\n\n(Note: Always verify visa requirements with the official embassy or consulate before travel.)"
+            return f"I don't have specific visa information for {nationality_name} citizens traveling to {destination_name}. Please check with the embassy of {destination_name} for accurate visa requirements."
         
-        return f"🛂 Visa requirements for {nationality.title()} citizens traveling to {destination.title()}:\n\n{requirements}\n\n(Note: Visa requirements may change. Always verify with the official embassy or consulate before travel.)"
+        return f"🛂 Visa requirements for {nationality_name} citizens traveling to {destination_name}:\n\n{self._describe(requirement, nationality_name)}\n\n(Note: Visa requirements may change. Always verify with the official embassy or consulate before travel.)"
@@ -1,16 +1,35 @@
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
 from smolagents.tools import Tool
 import datetime
 import random
 import os
 import requests
+from tools.climate_normals import DATE_PATTERN, get_climate_normals, parse_travel_period
+from tools.gazetteer import get_gazetteer, normalize_place
+from tools.persistent_cache import PersistentCache
+
+OPENWEATHERMAP_URL = "http://api.openweathermap.org"
+
+# OpenWeatherMap refreshes its 5-day forecast every 3 hours
+FORECAST_UPDATE_HOURS = 3
+
+# The API forecast covers this many days; later trips are answered from climate normals
+FORECAST_HORIZON_DAYS = 5
+
+
+def next_forecast_update(now: Optional[float] = None) -> float:
+    """Timestamp of the next 3-hour UTC boundary, when the provider publishes a new forecast."""
+    period = FORECAST_UPDATE_HOURS * 3600
+    now = datetime.datetime.now(datetime.timezone.utc).timestamp() if now is None else now
+    return (now // period + 1) * period
 
 class GetWeatherForecastTool(Tool):
     name = "get_weather_forecast"
-    description = "Gets the weather forecast for a travel destination."
+    description = "Gets the weather forecast for a travel destination. For trips beyond the next few days, pass `when` to get the typical climate for those months instead."
     inputs = {
         'destination': {'type': 'string', 'description': 'City or location name'},
-        'days': {'type': 'integer', 'description': 'Number of days to forecast (default: 3)', 'nullable': True}
+        'days': {'type': 'integer', 'description': 'Number of days to forecast (default: 3)', 'nullable': True},
+        'when': {'type': 'string', 'description': 'Travel period for seasonal questions, e.g. "July", "Dec to Feb" or "2025-07-01 to 2025-07-14" (optional)', 'nullable': True}
     }
     output_type = "string"
 
@@ -19,22 +38,32 @@ class GetWeatherForecastTool(Tool):
         # You can set an API key for a real weather service like OpenWeatherMap
         self.api_key = api_key or os.environ.get("WEATHER_API_KEY")
         
+        # Destination name -> coordinates, kept forever; forecasts per location until the next provider update
+        self.geocode_cache = PersistentCache("geocode")
+        self.forecast_cache = PersistentCache("forecasts", max_entries=5000)
+        self.timeout = 10
+
         # Weather conditions for demo/fallback
         self.weather_conditions = [
             "Sunny", "Partly Cloudy", "Cloudy", "Light Rain", 
             "Heavy Rain", "Thunderstorms", "Windy", "Foggy", "Snow", "Clear"
         ]
 
-    def forward(self, destination: str, days: int = 3) -> str:
+    def forward(self, destination: str, days: int = 3, when: Optional[str] = None) -> str:
+        days = days or 3
         try:
+            # Trips beyond the forecast horizon, or already past, get typical weather from the bundled climate normals
+            if when and not self._within_forecast_horizon(when):
+                climate_text = self._climate_summary(destination, when)
+                if climate_text:
+                    return climate_text
+
             # Try to use a real weather API if the API key is available
             if self.api_key:
                 try:
-                    url = f"http://api.openweathermap.org/data/2.5/forecast?q={destination}&appid={self.api_key}&units=metric"
-                    response = requests.get(url)
-                    data = response.json()
+                    forecast_items = self._get_forecast(destination)
                     
-                    if response.status_code != 200:
+                    if forecast_items is None:
                         # Fall back to demo method if API call fails
                         return self._generate_demo_forecast(destination, days)
                     
@@ -43,7 +72,7 @@ class GetWeatherForecastTool(Tool):
                     
                     # Group forecasts by day
                     forecasts_by_day = {}
-                    for item in data['list'][:days * 8]:  # API returns data in 3-hour intervals
+                    for item in forecast_items[:days * 8]:  # API returns data in 3-hour intervals
                         date = item['dt_txt'].split(' ')[0]
                         if date not in forecasts_by_day:
                             forecasts_by_day[date] = []
@@ -80,16 +109,127 @@ class GetWeatherForecastTool(Tool):
         except Exception as e:
             return f"Error retrieving weather data for {destination}: {str(e)}"
     
+    def _within_forecast_horizon(self, when: str) -> bool:
+        """True when `when` gives dates that start within the API forecast window, from today on."""
+        dates = DATE_PATTERN.findall(when)
+        if not dates:
+            return False
+        start = min(datetime.date.fromisoformat(d) for d in dates)
+        return 0 <= (start - datetime.date.today()).days < FORECAST_HORIZON_DAYS
+
+    def _climate_summary(self, destination: str, when: str) -> Optional[str]:
+        """Typical weather and packing tips for a travel period, from the offline climate normals."""
+        month_weights = parse_travel_period(when)
+        if month_weights is None:
+            return None
+        normals = get_climate_normals()
+        station = normals.find_station(destination)
+        if station is None:
+            return None
+
+        summary = normals.summarize(station, month_weights)
+        monthly = normals.monthly(station, month_weights)
+        # Monthly rainfall scaled to the number of trip days
+        trip_rain = float(month_weights @ normals.precipitation[station] / 30)
+
+        climate_text = f"🌦️ Typical weather in {destination} ({when}), based on climate normals for {normals.names[station]}:\n\n"
+        for month, high, low, rain in monthly:
+            climate_text += f"• {month}: {low:.0f}°C to {high:.0f}°C, about {rain:.0f} mm of rain in the month\n"
+        climate_text += f"\nOverall: highs around {summary['high']:.0f}°C, lows around {summary['low']:.0f}°C"
+        if len(monthly) > 1 or month_weights.sum() < 28:
+            climate_text += f", roughly {trip_rain:.0f} mm of rain over the period"
+        climate_text += ".\n"
+        climate_text += self._climate_packing_tips(summary)
+        return climate_text
+
+    def _climate_packing_tips(self, summary: dict) -> str:
+        tips = "\n🧳 Packing tips: "
+        if summary["low"] < 5:
+            tips += "Bring a heavy winter coat, gloves, and hat. "
+        elif summary["low"] < 15:
+            tips += "Pack a warm jacket and layers. "
+        elif summary["low"] < 20:
+            tips += "Bring a light jacket for evenings. "
+
+        if summary["high"] > 25:
+            tips += "Pack light, breathable clothing for warm days. "
+
+        # Monthly rainfall: over ~150 mm is a wet season, over ~60 mm expect some showers
+        if summary["precipitation"] > 150:
+            tips += "It's the rainy season: bring rain gear, quick-dry clothes and waterproof footwear. "
+        elif summary["precipitation"] > 60:
+            tips += "Showers are likely, so pack an umbrella. "
+
+        if summary["low"] < 0:
+            tips += "Expect frost or snow: bring waterproof boots and warm socks. "
+
+        if summary["high"] > 22:
+            tips += "Sunscreen and sunglasses are recommended. "
+
+        return tips
+
+    def _geocode(self, destination: str) -> Optional[Tuple[float, float]]:
+        """Resolve a destination to (lat, lon): persistent cache, then the offline gazetteer, then the geocoding API."""
+        key = normalize_place(destination)
+        cached = self.geocode_cache.get(key)
+        if cached:
+            return tuple(cached)
+
+        place = get_gazetteer().lookup(destination)
+        if place is not None and place.latitude is not None:
+            coordinates = (place.latitude, place.longitude)
+        else:
+            response = requests.get(
+                f"{OPENWEATHERMAP_URL}/geo/1.0/direct",
+                params={"q": destination, "limit": 1, "appid": self.api_key},
+                timeout=self.timeout,
+            )
+            results = response.json() if response.status_code == 200 else None
+            if not results:
+                return None
+            coordinates = (round(results[0]["lat"], 2), round(results[0]["lon"], 2))
+
+        self.geocode_cache.set(key, coordinates)
+        return coordinates
+
+    def _get_forecast(self, destination: str) -> Optional[List[dict]]:
+        """3-hourly forecast items for a destination, served from cache until the provider's next update."""
+        coordinates = self._geocode(destination)
+        if coordinates is None:
+            return None
+
+        key = f"{coordinates[0]:.2f},{coordinates[1]:.2f}"
+        cached = self.forecast_cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = requests.get(
+            f"{OPENWEATHERMAP_URL}/data/2.5/forecast",
+            params={"lat": coordinates[0], "lon": coordinates[1], "appid": self.api_key, "units": "metric"},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            return None
+
+        # Only keep the fields the formatter uses
+        items = [
+            {"dt_txt": item["dt_txt"], "main": {"temp": item["main"]["temp"]}, "weather": [{"main": item["weather"][0]["main"]}]}
+            for item in response.json()["list"]
+        ]
+        self.forecast_cache.set(key, items, expires_at=next_forecast_update())
+        return items
+
     def _generate_demo_forecast(self, destination: str, days: int) -> str:
         # Create a deterministic but seemingly random forecast based on destination name
+        # A private generator: reseeding the global `random` module would race with other sessions
         seed = sum(ord(c) for c in destination)
-        random.seed(seed)
+        rng = random.Random(seed)
         
         # Generate forecast data
         forecast_text = f"🌦️ Weather forecast for {destination}:\n\n"
         
         today = datetime.datetime.now()
-        temp_base = random.randint(10, 25)  # Base temperature varies by destination
+        temp_base = rng.randint(10, 25)  # Base temperature varies by destination
         
         for i in range(days):
             day = today + datetime.timedelta(days=i)
@@ -97,10 +237,10 @@ class GetWeatherForecastTool(Tool):
             date = day.strftime("%b %d")
             
             # "Random" but deterministic weather for the demo
-            condition = self.weather_conditions[random.randint(0, len(self.weather_conditions)-1)]
-            temp_high = temp_base + random.randint(0, 10)  # Celsius
-            temp_low = temp_high - random.randint(5, 15)
-            precipitation = random.randint(0, 100) if "Rain" in condition or "Snow" in condition or "Thunder" in condition else 0
+            condition = self.weather_conditions[rng.randint(0, len(self.weather_conditions)-1)]
+            temp_high = temp_base + rng.randint(0, 10)  # Celsius
+            temp_low = temp_high - rng.randint(5, 15)
+            precipitation = rng.randint(0, 100) if "Rain" in condition or "Snow" in condition or "Thunder" in condition else 0
             
             forecast_text += f"• {day_name}, {date}: {condition}, {temp_low}°C to {temp_high}°C"
             if precipitation > 0:
@@ -109,7 +249,7 @@ class GetWeatherForecastTool(Tool):
         
         # Add packing recommendations
         cold_days = sum(1 for i in range(days) if temp_base + 5 < 15)
-        rainy_days = sum(1 for i in range(days) if "Rain" in self.weather_conditions[random.randint(0, len(self.weather_conditions)-1)])
+        rainy_days = sum(1 for i in range(days) if "Rain" in self.weather_conditions[rng.randint(0, len(self.weather_conditions)-1)])
         hot_days = sum(1 for i in range(days) if temp_base + 5 > 25)
         
         forecast_text += "\n🧳 Packing tips: "
@@ -0,0 +1,97 @@
+from typing import Any, List, Optional, Tuple
+from smolagents.tools import Tool
+import datetime
+import pytz
+from tools.gazetteer import get_gazetteer
+from tools.get_local_time import format_utc_offset
+
+class GetWorldClockTool(Tool):
+    name = "get_world_clock"
+    description = "Gets the current local time and UTC offset for several destinations in one call. Optionally compares them with the traveler's home city and lists the hours when both are awake (good for calls home)."
+    inputs = {
+        'destinations': {'type': 'array', 'description': 'List of city or location names (e.g., ["Tokyo", "Bangkok", "Sydney"]).'},
+        'home': {'type': 'string', 'description': "The traveler's home city, to compute time differences and overlapping waking hours (optional).", 'nullable': True}
+    }
+    output_type = "string"
+
+    # Hours considered "awake" in every zone, local time
+    waking_start = 8
+    waking_end = 22
+
+    def __init__(self):
+        super().__init__()
+        # Offline city/country -> IANA timezone index, loaded on first use
+        self.gazetteer = None
+
+    def _resolve(self, destination: str) -> Optional[pytz.BaseTzInfo]:
+        place = self.gazetteer.lookup(destination)
+        return pytz.timezone(place.timezone) if place else None
+
+    def _waking_window(self, tz: pytz.BaseTzInfo, day: datetime.date) -> Tuple[datetime.datetime, datetime.datetime]:
+        start = tz.localize(datetime.datetime.combine(day, datetime.time(self.waking_start)))
+        end = tz.localize(datetime.datetime.combine(day, datetime.time(self.waking_end)))
+        return start.astimezone(pytz.utc), end.astimezone(pytz.utc)
+
+    def _overlap(self, home_tz: pytz.BaseTzInfo, dest_tz: pytz.BaseTzInfo, now: datetime.datetime) -> List[str]:
+        """Windows of today's home waking hours that fall in the destination's waking hours."""
+        home_day = now.astimezone(home_tz).date()
+        home_start, home_end = self._waking_window(home_tz, home_day)
+
+        windows = []
+        dest_day = now.astimezone(dest_tz).date()
+        for offset in (-1, 0, 1):
+            dest_start, dest_end = self._waking_window(dest_tz, dest_day + datetime.timedelta(days=offset))
+            start, end = max(home_start, dest_start), min(home_end, dest_end)
+            if start < end:
+                windows.append(
+                    f"{start.astimezone(home_tz):%H:%M}-{end.astimezone(home_tz):%H:%M} at home"
+                    f" = {start.astimezone(dest_tz):%H:%M}-{end.astimezone(dest_tz):%H:%M} there"
+                )
+        return windows
+
+    def forward(self, destinations: List[str], home: Optional[str] = None) -> str:
+        try:
+            if self.gazetteer is None:
+                self.gazetteer = get_gazetteer()
+            if isinstance(destinations, str):
+                destinations = [d for d in destinations.split(",")]
+            destinations = [d.strip() for d in destinations if d and d.strip()]
+            if not destinations:
+                return "Please provide at least one destination."
+
+            now = datetime.datetime.now(pytz.utc)
+            home_tz = self._resolve(home) if home else None
+
+            lines = ["🕒 World clock:\n"]
+            if home and home_tz is None:
+                lines.append(f"(I couldn't find a timezone for your home, {home}, so no overlap is computed.)\n")
+            elif home_tz is not None:
+                home_time = now.astimezone(home_tz)
+                lines.append(f"• Home ({home}): {home_time:%I:%M %p on %A, %B %d} ({format_utc_offset(home_time)})")
+
+            for destination in destinations:
+                dest_tz = self._resolve(destination)
+                if dest_tz is None:
+                    lines.append(f"• {destination}: timezone not found, please try a major city nearby")
+                    continue
+
+                local_time = now.astimezone(dest_tz)
+                line = f"• {destination}: {local_time:%I:%M %p on %A, %B %d} ({format_utc_offset(local_time)})"
+
+                if home_tz is not None:
+                    diff = (local_time.utcoffset() - now.astimezone(home_tz).utcoffset()).total_seconds() / 3600
+                    if diff:
+                        line += f", {abs(diff):g}h {'ahead of' if diff > 0 else 'behind'} home"
+                    else:
+                        line += ", same time as home"
+                    windows = self._overlap(home_tz, dest_tz, now)
+                    line += "\n   Both awake ({}:00-{}:00): {}".format(
+                        self.waking_start, self.waking_end,
+                        "; ".join(windows) if windows else "no overlap, plan calls early morning or late evening"
+                    )
+                lines.append(line)
+
+            return "\n".join(lines)
+
+        except Exception as e:
+            return f"Error getting world clock: {str(e)}"
@@ -0,0 +1,139 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import unicodedata
+from tools.cache_utils import get_cache_dir
+
+# Most requested destinations, used to pre-seed the cache
+TOP_DESTINATIONS = [
+    "Paris", "Tokyo", "Bali", "London", "New York", "Rome", "Barcelona", "Dubai",
+    "Bangkok", "Istanbul", "Kyoto", "Santorini", "Amsterdam", "Sydney", "Lisbon",
+    "Prague", "Venice", "Singapore", "Hawaii", "Iceland", "Maldives", "Cancun",
+    "Machu Picchu", "Cape Town", "Marrakech", "Vienna", "Seoul", "Rio de Janeiro",
+    "Swiss Alps", "Vancouver",
+]
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif")
+
+
+def normalize_destination(destination: str) -> str:
+    """Case-fold, strip accents and collapse whitespace so 'Bali ' and 'bali' share an entry."""
+    folded = unicodedata.normalize("NFKD", destination.casefold())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(folded.split())
+
+
+def image_source_path(image: Any) -> Optional[str]:
+    """Return a file path for the output of an image generator (path, AgentImage or PIL image)."""
+    if hasattr(image, "to_string"):
+        return image.to_string()
+    if isinstance(image, str):
+        return image
+    if hasattr(image, "save"):
+        handle, path = tempfile.mkstemp(suffix=".png")
+        os.close(handle)
+        image.save(path)
+        return path
+    return None
+
+
+class ImageCache:
+    """
+    Content-addressed on-disk cache of generated images.
+
+    Entries are keyed on the normalized destination and the prompt template the
+    generator's prompt is rendered from, so 'Bali' and 'bali' share an entry and a
+    change to the template naturally misses the cache.
+    The least recently used files are evicted once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or get_cache_dir("images")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes or int(os.environ.get("JOURNI_IMAGE_CACHE_MAX_MB", "500")) * 1024 * 1024
+        self.lock = threading.Lock()
+
+        # key -> file name, rebuilt from disk so the cache survives restarts
+        self.index: Dict[str, str] = {}
+        for file_name in os.listdir(self.directory):
+            key, ext = os.path.splitext(file_name)
+            if ext.lower() in IMAGE_EXTENSIONS:
+                self.index[key] = file_name
+
+    @staticmethod
+    def key(destination: str, template: str) -> str:
+        return hashlib.sha256(f"{normalize_destination(destination)}\n{template}".encode("utf-8")).hexdigest()
+
+    def get(self, destination: str, template: str) -> Optional[str]:
+        key = self.key(destination, template)
+        with self.lock:
+            file_name = self.index.get(key)
+            if file_name is None:
+                return None
+            path = os.path.join(self.directory, file_name)
+            try:
+                # Touch the file so eviction treats it as recently used
+                os.utime(path, None)
+            except OSError:
+                self.index.pop(key, None)
+                return None
+            return path
+
+    def put(self, destination: str, template: str, image: Any) -> Optional[str]:
+        source = image_source_path(image)
+        if not source or not os.path.exists(source):
+            return None
+
+        key = self.key(destination, template)
+        ext = os.path.splitext(source)[1].lower()
+        file_name = key + (ext if ext in IMAGE_EXTENSIONS else ".png")
+        path = os.path.join(self.directory, file_name)
+
+        # Copy to a temporary name first so readers never see a partial file
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            self.index[key] = file_name
+            self._evict()
+        return path
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for key, file_name in self.index.items():
+            try:
+                stat = os.stat(os.path.join(self.directory, file_name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, key, file_name))
+            total += stat.st_size
+
+        for _, size, key, file_name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except OSError:
+                pass
+            self.index.pop(key, None)
+            total -= size
+
+    def preseed(self, destinations: Iterable[str], template: str, render: Callable[[str], Any]) -> int:
+        """Render and store every destination that is not cached yet. Returns the number rendered."""
+        rendered = 0
+        for destination in destinations:
+            if self.get(destination, template):
+                continue
+            try:
+                if self.put(destination, template, render(template.format(destination=destination))):
+                    rendered += 1
+            except Exception:
+                # Pre-seeding is best effort; the destination is rendered on demand instead
+                continue
+        return rendered
@@ -0,0 +1,110 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import os
+import re
+import threading
+import time
+import uuid
+
+# Handles look like "[journi-image:3f2a9c1b7d4e]" so they survive being printed or
+# pasted into an f-string by the agent, and can be found again in its output.
+HANDLE_PATTERN = re.compile(r"\[journi-image:([0-9a-f]{12})\]")
+
+# Seconds after submission past which an answer ships without its image
+DEFAULT_IMAGE_TIMEOUT = float(os.environ.get("JOURNI_IMAGE_TIMEOUT", "30"))
+
+
+class ImageJob:
+    """A background render of one destination image."""
+
+    def __init__(self, destination: str, future: Future):
+        self.id = uuid.uuid4().hex[:12]
+        self.destination = destination
+        self.future = future
+        self.submitted_at = time.monotonic()
+
+    @property
+    def handle(self) -> str:
+        return f"[journi-image:{self.id}]"
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def path(self) -> Optional[str]:
+        """The rendered image path, or None if the job failed or isn't finished."""
+        if not self.future.done() or self.future.exception() is not None:
+            return None
+        return self.future.result()
+
+    def wait(self, timeout: float) -> Optional[str]:
+        """Wait until `timeout` seconds after submission at most, then return the path if any."""
+        remaining = self.submitted_at + timeout - time.monotonic()
+        if remaining > 0 and not self.future.done():
+            try:
+                self.future.result(timeout=remaining)
+            except Exception:
+                pass
+        return self.path()
+
+
+class ImageJobRegistry:
+    """Runs image renders in the background and looks them up by handle."""
+
+    # Finished jobs are forgotten after this many seconds
+    retention = 3600
+
+    def __init__(self, max_workers: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-jobs")
+        self.jobs: Dict[str, ImageJob] = {}
+        self.lock = threading.Lock()
+
+    def submit(self, destination: str, render: Callable[[], Optional[str]]) -> ImageJob:
+        return self._register(ImageJob(destination, self.executor.submit(render)))
+
+    def completed(self, destination: str, path: str) -> ImageJob:
+        """Register an image that is already available, e.g. from the cache."""
+        future = Future()
+        future.set_result(path)
+        return self._register(ImageJob(destination, future))
+
+    def _register(self, job: ImageJob) -> ImageJob:
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+        return job
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.retention
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done() and job.submitted_at < cutoff]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[ImageJob]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def find(self, text: str) -> List[ImageJob]:
+        """Return the known jobs whose handles appear in `text`, in order of appearance."""
+        jobs = []
+        for job_id in dict.fromkeys(HANDLE_PATTERN.findall(text or "")):
+            job = self.get(job_id)
+            if job is not None:
+                jobs.append(job)
+        return jobs
+
+
+def strip_handles(text: str) -> str:
+    """Remove image handles from text shown to the user."""
+    return HANDLE_PATTERN.sub("", text)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_image_jobs() -> ImageJobRegistry:
+    """Process-wide registry shared by the image tool and the chat UI."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ImageJobRegistry()
+        return _registry
@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from tools.cache_utils import get_cache_dir
+
+# Longest side, in pixels, of the image sent to the chat and of its thumbnail
+DISPLAY_SIZE = int(os.environ.get("JOURNI_IMAGE_DISPLAY_SIZE", "1024"))
+THUMBNAIL_SIZE = 256
+QUALITY = 80
+# Derivatives are small, but old ones are still dropped past this size
+MAX_DERIVED_BYTES = 200 * 1024 * 1024
+# Source files whose content key is remembered, so they are not hashed again
+MAX_KNOWN_SOURCES = 1024
+# Derivatives are named "<content key>-<size>.<ext>"
+DERIVED_NAME_PATTERN = re.compile(r"^([0-9a-f]{32})-(\d+)(\.\w+)$")
+
+_lock = threading.Lock()
+# Content key by (source path, mtime, size)
+_keys: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+# One conversion at a time per derivative; different images are converted in parallel
+_target_locks: Dict[str, threading.Lock] = {}
+_webp_supported = None
+
+
+def _supports_webp() -> bool:
+    global _webp_supported
+    if _webp_supported is None:
+        from PIL import features
+        _webp_supported = bool(features.check("webp"))
+    return _webp_supported
+
+
+def _content_key(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def _save_variant(image, target: str, max_size: int, image_format: str):
+    variant = image.copy()
+    variant.thumbnail((max_size, max_size))
+    if image_format == "JPEG" and variant.mode not in ("RGB", "L"):
+        variant = variant.convert("RGB")
+
+    # Write to a temporary name first so concurrent readers never see a partial file
+    handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+    os.close(handle)
+    variant.save(tmp_path, format=image_format, quality=QUALITY)
+    os.replace(tmp_path, target)
+
+
+def _prune(directory: str):
+    entries = []
+    for file_name in os.listdir(directory):
+        try:
+            stat = os.stat(os.path.join(directory, file_name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, file_name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, file_name in sorted(entries):
+        if total <= MAX_DERIVED_BYTES:
+            break
+        try:
+            os.remove(os.path.join(directory, file_name))
+        except OSError:
+            pass
+        total -= size
+
+
+def _source_key(path: str) -> str:
+    """Content key of an image; a derivative shares the key of the image it was made from."""
+    match = DERIVED_NAME_PATTERN.match(os.path.basename(path))
+    if match and os.path.dirname(os.path.abspath(path)) == get_cache_dir("images", "derived"):
+        return match.group(1)
+
+    stat = os.stat(path)
+    source = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        key = _keys.get(source)
+        if key is not None:
+            _keys.move_to_end(source)
+            return key
+    # Hashing reads the whole file, so it happens outside the lock
+    key = _content_key(path)
+    with _lock:
+        _keys[source] = key
+        while len(_keys) > MAX_KNOWN_SOURCES:
+            _keys.popitem(last=False)
+    return key
+
+
+def _variant(path: str, max_size: int) -> str:
+    """
+    Path of a resized WebP (or JPEG) version of an image, keyed on the image
+    content and reused across requests. Falls back to the original file if
+    Pillow is unavailable or the image can't be processed.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return path
+
+    try:
+        directory = get_cache_dir("images", "derived")
+        image_format, ext = ("WEBP", ".webp") if _supports_webp() else ("JPEG", ".jpg")
+        target = os.path.join(directory, f"{_source_key(path)}-{max_size}{ext}")
+        if os.path.exists(target):
+            return target
+
+        with _lock:
+            target_lock = _target_locks.setdefault(target, threading.Lock())
+        with target_lock:
+            if not os.path.exists(target):
+                with Image.open(path) as image:
+                    image.load()
+                    _save_variant(image, target, max_size, image_format)
+                _prune(directory)
+        with _lock:
+            _target_locks.pop(target, None)
+        return target
+    except Exception:
+        return path
+
+
+def display_image(path: str) -> str:
+    """Path of the compressed version of an image to send to the browser."""
+    return _variant(path, DISPLAY_SIZE)
+
+
+def thumbnail_image(path: str) -> str:
+    """Path of a small version of an image, or of its display version, for images not shown in full."""
+    return _variant(path, THUMBNAIL_SIZE)
+
+
+def expanded_image(path: str) -> Optional[str]:
+    """The display version of a thumbnail made by `thumbnail_image`, or None if `path` is not one (or it was pruned)."""
+    match = DERIVED_NAME_PATTERN.match(os.path.basename(path))
+    if not match or int(match.group(2)) != THUMBNAIL_SIZE:
+        return None
+    display = os.path.join(os.path.dirname(path), f"{match.group(1)}-{DISPLAY_SIZE}{match.group(3)}")
+    return display if os.path.exists(display) else None
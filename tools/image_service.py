@@ -0,0 +1,77 @@
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+import os
+import threading
+from tools.image_cache import image_source_path
+
+FLUX_SPACE_ID = "black-forest-labs/FLUX.1-schnell"
+
+
+class ImageGenerationService:
+    """
+    One connection to the image-generation Space, shared by every image tool.
+
+    The Space client is created lazily on the first render. At most
+    `max_concurrent` renders run at the same time, and concurrent requests
+    for the same prompt share a single render (single-flight).
+    """
+
+    def __init__(self, space_id: str = FLUX_SPACE_ID, max_concurrent: Optional[int] = None):
+        self.space_id = space_id
+        self.max_concurrent = max_concurrent or int(os.environ.get("JOURNI_MAX_CONCURRENT_RENDERS", "2"))
+        self.render_slots = threading.BoundedSemaphore(self.max_concurrent)
+        self.client = None
+        self.client_lock = threading.Lock()
+        self.in_flight: Dict[str, Future] = {}
+        self.in_flight_lock = threading.Lock()
+
+    def _get_client(self):
+        if self.client is None:
+            with self.client_lock:
+                if self.client is None:
+                    from smolagents import Tool as SmolTool
+                    self.client = SmolTool.from_space(
+                        self.space_id,
+                        name="image_generator",
+                        description="Generate an image from a text prompt."
+                    )
+        return self.client
+
+    def render(self, prompt: str) -> Any:
+        """Render `prompt` and return the image file path."""
+        with self.in_flight_lock:
+            future = self.in_flight.get(prompt)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.in_flight[prompt] = future
+
+        # Another caller is already rendering this prompt: wait for its result
+        if not owner:
+            return future.result()
+
+        try:
+            with self.render_slots:
+                image = self._get_client()(prompt)
+            future.set_result(image_source_path(image) or image)
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self.in_flight_lock:
+                self.in_flight.pop(prompt, None)
+        return future.result()
+
+    __call__ = render
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_image_service() -> ImageGenerationService:
+    """Process-wide image-generation service shared by the image tools."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ImageGenerationService()
+        return _service
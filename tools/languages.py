@@ -0,0 +1,69 @@
+from typing import Dict, NamedTuple, Optional
+import os
+import re
+import threading
+from tools.gazetteer import normalize_place
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Words around a language name in free-text input: "the Thai language", "in Brazilian Portuguese"
+FILLER_PATTERN = re.compile(r"\b(?:in|into|to|the|language|lang|spoken|local)\b")
+
+
+class Language(NamedTuple):
+    # ISO 639-1 code
+    code: str
+    name: str
+    endonym: str
+
+
+class LanguageIndex:
+    """
+    Language names to ISO 639-1 codes.
+
+    Every English name, ISO 639-1/639-2/639-3 code, endonym ('Deutsch', '日本語')
+    and common alias ('Mandarin', 'Farsi') from the bundled languages.tsv is
+    stored under its normalized form, so resolving a language is a dict access.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.languages: Dict[str, Language] = {}
+        # normalized name or code -> ISO 639-1 code
+        self.aliases: Dict[str, str] = {}
+        with open(os.path.join(data_dir, "languages.tsv"), encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#") or not line.strip():
+                    continue
+                code, iso639_2, name, endonyms, aliases = line.rstrip("\n").split("\t")
+                endonyms = endonyms.split(",")
+                self.languages[code] = Language(code, name, endonyms[0])
+                for alias in [code, name, *iso639_2.split(","), *endonyms, *aliases.split(",")]:
+                    key = normalize_place(alias)
+                    if key:
+                        self.aliases.setdefault(key, code)
+
+    def resolve(self, language: str) -> Optional[Language]:
+        """The language for a name, code or endonym ('Spanish', 'es', 'español', 'Mandarin'), or None."""
+        key = normalize_place(language)
+        code = self.aliases.get(key)
+        if code is None:
+            key = " ".join(FILLER_PATTERN.sub(" ", key).split())
+            code = self.aliases.get(key)
+        if code is None:
+            # "Spanish (Mexico)", "pt-BR": the first word that names a language
+            code = next((self.aliases[word] for word in key.split() if word in self.aliases), None)
+        return self.languages.get(code) if code else None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_languages() -> LanguageIndex:
+    """Process-wide language index, loaded on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LanguageIndex()
+    return _index
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+from typing import Optional
+import os
+import zlib
+
+# Observations longer than about this many characters are shown as a preview
+PREVIEW_CHARS = int(os.environ.get("JOURNI_OBSERVATION_PREVIEW_CHARS", "600"))
+# Full observations kept per chat session; the oldest can no longer be expanded beyond this
+MAX_OBSERVATIONS = int(os.environ.get("JOURNI_SESSION_OBSERVATIONS", "200"))
+
+
+def preview(text: str, limit: int = PREVIEW_CHARS) -> Optional[str]:
+    """The start of `text`, cut at a line or word boundary, or None if `text` is short enough to show whole."""
+    if len(text) <= limit * 3 // 2:
+        return None
+    cut = text.rfind("\n", 0, limit)
+    if cut < limit // 2:
+        cut = text.rfind(" ", 0, limit)
+    if cut < limit // 2:
+        cut = limit
+    return text[:cut].rstrip() + " …"
+
+
+class ObservationStore:
+    """
+    Full text of the long observations of one chat session, keyed by step id.
+
+    Search results and page dumps run to thousands of characters. The chat
+    only holds a preview of them; the full text stays here, compressed, and is
+    sent to the browser when the user expands the message. Beyond
+    `max_entries` the oldest observations are dropped.
+    """
+
+    def __init__(self, max_entries: int = MAX_OBSERVATIONS):
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.max_entries = max_entries
+
+    def add(self, step_id: str, text: str) -> None:
+        self.entries[step_id] = zlib.compress(text.encode("utf-8"))
+        self.entries.move_to_end(step_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, step_id: str) -> Optional[str]:
+        data = self.entries.get(step_id)
+        return None if data is None else zlib.decompress(data).decode("utf-8")
@@ -0,0 +1,135 @@
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+
+# Markdown headings produced by markdownify ("# Title", "## Section", ...)
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Very common words that carry no signal for ranking passages
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from how i if in is it its me my of on or
+should so than that the their there these this to was what when where which who why will
+with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def split_into_passages(markdown: str, max_chars: int = 1200) -> List[Tuple[str, str]]:
+    """
+    Split a markdown document into (heading, passage) chunks.
+
+    Each chunk keeps the closest preceding heading so a passage can be shown
+    with its context. Long sections are split further on paragraph boundaries
+    so that no chunk is much larger than `max_chars`.
+    """
+    passages = []
+    heading = ""
+    buffer = []
+    buffer_len = 0
+
+    def flush():
+        nonlocal buffer, buffer_len
+        text = "\n\n".join(buffer).strip()
+        if text:
+            passages.append((heading, text))
+        buffer = []
+        buffer_len = 0
+
+    for block in re.split(r"\n\s*\n", markdown):
+        block = block.strip()
+        if not block:
+            continue
+
+        first_line = block.split("\n", 1)[0]
+        heading_match = HEADING_PATTERN.match(first_line)
+        if heading_match:
+            flush()
+            heading = heading_match.group(2)
+            block = block[len(first_line):].strip()
+            if not block:
+                continue
+
+        # Hard-wrap single blocks that are larger than a whole chunk
+        while len(block) > max_chars:
+            cut = block.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            flush()
+            buffer, buffer_len = [block[:cut]], cut
+            flush()
+            block = block[cut:].strip()
+
+        if buffer_len + len(block) > max_chars:
+            flush()
+        buffer.append(block)
+        buffer_len += len(block)
+
+    flush()
+    return passages
+
+
+class BM25Index:
+    """A small in-process Okapi BM25 index over a list of passages."""
+
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_frequencies = [Counter(tokenize(passage)) for passage in passages]
+        self.lengths = [sum(tf.values()) for tf in self.term_frequencies]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        document_frequencies = Counter()
+        for tf in self.term_frequencies:
+            document_frequencies.update(tf.keys())
+
+        total = len(passages)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequencies.items()
+        }
+
+    def score(self, query: str) -> List[float]:
+        """Return the BM25 score of every passage for the query."""
+        query_terms = set(tokenize(query))
+        scores = []
+        for tf, length in zip(self.term_frequencies, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            total = 0.0
+            for term in query_terms:
+                freq = tf.get(term)
+                if freq:
+                    total += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            scores.append(total)
+        return scores
+
+    def top_k(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Indices and scores of the k best passages with a positive score."""
+        ranked = sorted(enumerate(self.score(query)), key=lambda item: item[1], reverse=True)
+        return [(index, score) for index, score in ranked[:k] if score > 0]
+
+
+def rank_passages(markdown: str, question: str, top_k: int = 5, max_chars: int = 1200) -> Optional[str]:
+    """
+    Return the `top_k` passages of a markdown page most relevant to `question`,
+    formatted with their headings, in page order. Returns None if nothing matches.
+    """
+    passages = split_into_passages(markdown, max_chars=max_chars)
+    if not passages:
+        return None
+
+    index = BM25Index([f"{heading}\n{text}" for heading, text in passages])
+    best = index.top_k(question, top_k)
+    if not best:
+        return None
+
+    formatted = []
+    for position, _ in sorted(best):
+        heading, text = passages[position]
+        title = heading or "(untitled section)"
+        formatted.append(f"### {title}\n{text}")
+    return "\n\n---\n\n".join(formatted)
@@ -0,0 +1,78 @@
+from typing import Any, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+from tools.cache_utils import get_cache_dir
+
+
+class PersistentCache:
+    """
+    A small key/value cache stored in SQLite under Journi's cache dir.
+
+    Values are JSON-serialized and survive restarts. Entries can expire after a
+    TTL (per entry or a cache-wide default) and, when `max_entries` is set, the
+    least recently used entries are evicted. Safe to share between threads.
+    """
+
+    # Eviction runs once every this many writes
+    evict_every = 100
+
+    def __init__(self, name: str, default_ttl: Optional[float] = None, max_entries: Optional[int] = None, directory: Optional[str] = None):
+        self.path = os.path.join(directory or get_cache_dir(), f"{name}.sqlite3")
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return default
+            if self.max_entries:
+                self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        now = time.time()
+        if expires_at is None:
+            ttl = self.default_ttl if ttl is None else ttl
+            expires_at = now + ttl if ttl is not None else None
+        payload = json.dumps(value, ensure_ascii=False)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            )
+            self.writes += 1
+            if self.writes % self.evict_every == 0:
+                self._evict(now)
+
+    def delete(self, key: str):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _evict(self, now: float):
+        self.connection.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        if self.max_entries:
+            self.connection.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
@@ -0,0 +1,152 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import json
+import math
+import os
+import threading
+from tools.gazetteer import normalize_place
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Share of a phrase's (IDF-weighted) words an input must contain to match it loosely
+MIN_PARTIAL_SCORE = 0.75
+
+# Share of the input's content words a loose match must account for: 'I don't eat meat'
+# contains all of 'i don't understand' but says something else
+MIN_INPUT_COVERAGE = 2 / 3
+
+# Words that carry no meaning of their own when comparing an input with a phrase
+FUNCTION_WORDS = frozenset(
+    "a an the i me my you your we us it is are am be do does don t s m d can could would will "
+    "please to of for in on at this that there here".split()
+)
+
+# Share of an input's words the matched phrases must cover for the phrasebook to answer it
+# on its own ('where is the nearest pharmacy' only shares 'where is the' with a phrase)
+MIN_COVERAGE = 0.6
+
+
+class PhraseMatch(NamedTuple):
+    # Canonical English phrase, a key of Phrasebook.translations
+    phrase: str
+    # Token span of the input that matched
+    start: int
+    end: int
+    # Share of the wording's (IDF-weighted) words found: 1.0 for an exact match
+    score: float
+
+
+def phrase_tokens(text: str) -> List[str]:
+    """'Where's the bathroom?' -> ['where', 's', 'the', 'bathroom']"""
+    return normalize_place(text).split()
+
+
+class Phrasebook:
+    """
+    Bundled travel phrasebook with an inverted token index.
+
+    Each phrase has several English wordings ('the bill please', 'check
+    please'). Every wording's tokens are indexed, so a lookup only compares the
+    input against wordings that share a word with it. Wordings found verbatim in
+    the input match exactly. A wording whose IDF-weighted words are mostly in
+    the input (MIN_PARTIAL_SCORE) only matches loosely when it also accounts for
+    most of the input's content words, and then stands for the whole input;
+    otherwise it is at best the `closest` phrase. Several phrases can match one
+    input ('hello, how much is this').
+    """
+
+    def __init__(self, path: str = os.path.join(DATA_DIR, "phrasebook.json")):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.languages: List[str] = data["languages"]
+        # phrase -> ISO 639-1 code -> {"text", "pronunciation"}
+        self.translations: Dict[str, Dict[str, Dict[str, str]]] = {}
+        # (phrase, tokens) for every wording
+        self.wordings: List[Tuple[str, Tuple[str, ...]]] = []
+        # token -> indexes into `wordings`
+        self.index: Dict[str, List[int]] = {}
+
+        for entry in data["phrases"]:
+            self.translations[entry["phrase"]] = entry["translations"]
+            for wording in [entry["phrase"], *entry["variants"]]:
+                tokens = tuple(phrase_tokens(wording))
+                if tokens and (entry["phrase"], tokens) not in self.wordings:
+                    self.wordings.append((entry["phrase"], tokens))
+                    for token in set(tokens):
+                        self.index.setdefault(token, []).append(len(self.wordings) - 1)
+
+        # Rare words ('bathroom') say more about which phrase was meant than common ones ('the')
+        self.idf = {token: math.log(1 + len(self.wordings) / len(ids)) for token, ids in self.index.items()}
+
+    def _weight(self, tokens) -> float:
+        return sum(self.idf.get(token, 0.0) for token in tokens)
+
+    def _loose(self, tokens: List[str]):
+        """(phrase, wording, score) for every wording not in `tokens` verbatim but with most of its words there."""
+        for i in set(i for token in set(tokens) for i in self.index.get(token, ())):
+            phrase, wording = self.wordings[i]
+            size = len(wording)
+            if any(tuple(tokens[start:start + size]) == wording for start in range(len(tokens) - size + 1)):
+                continue
+            present = [token for token in wording if token in tokens]
+            score = self._weight(present) / self._weight(wording)
+            if score >= MIN_PARTIAL_SCORE:
+                yield phrase, wording, score
+
+    @staticmethod
+    def _input_coverage(tokens: List[str], wording: Tuple[str, ...]) -> float:
+        """Share of the input's content words that are in `wording`."""
+        content = [token for token in tokens if token not in FUNCTION_WORDS] or tokens
+        return sum(token in wording for token in content) / len(content)
+
+    def match(self, text: str) -> List[PhraseMatch]:
+        """Phrases found in `text`, in the order they appear, without overlaps."""
+        tokens = phrase_tokens(text)
+        candidates = set(i for token in set(tokens) for i in self.index.get(token, ()))
+
+        matches: List[PhraseMatch] = []
+        for i in candidates:
+            phrase, wording = self.wordings[i]
+            size = len(wording)
+            exact = [start for start in range(len(tokens) - size + 1) if tuple(tokens[start:start + size]) == wording]
+            matches.extend(PhraseMatch(phrase, start, start + size, 1.0) for start in exact)
+        # Loose match: the input says the wording in other words ('where is the nearest bathroom')
+        for phrase, wording, score in self._loose(tokens):
+            if self._input_coverage(tokens, wording) >= MIN_INPUT_COVERAGE:
+                matches.append(PhraseMatch(phrase, 0, len(tokens), score))
+
+        # Best first (exact, then longest), keeping only matches that don't overlap an earlier pick
+        matches.sort(key=lambda m: (-m.score, -(m.end - m.start), m.start))
+        chosen: List[PhraseMatch] = []
+        taken = set()
+        for m in matches:
+            span = set(range(m.start, m.end))
+            if span & taken or any(c.phrase == m.phrase for c in chosen):
+                continue
+            chosen.append(m)
+            taken |= span
+        return sorted(chosen, key=lambda m: m.start)
+
+    def closest(self, text: str) -> Optional[str]:
+        """The phrase nearest to `text` when none matches it: only a hint, never its translation."""
+        scored = [(score, self._input_coverage(phrase_tokens(text), wording), phrase) for phrase, wording, score in self._loose(phrase_tokens(text))]
+        return max(scored)[2] if scored else None
+
+    def covers(self, text: str, matches: List[PhraseMatch]) -> bool:
+        """Whether `matches` account for most of `text`, so they translate it with nothing else needed."""
+        size = len(phrase_tokens(text))
+        covered = sum(m.end - m.start for m in matches)
+        return size > 0 and covered / size >= MIN_COVERAGE
+
+
+_phrasebook = None
+_phrasebook_lock = threading.Lock()
+
+
+def get_phrasebook() -> Phrasebook:
+    """Process-wide phrasebook, loaded on first use."""
+    global _phrasebook
+    if _phrasebook is None:
+        with _phrasebook_lock:
+            if _phrasebook is None:
+                _phrasebook = Phrasebook()
+    return _phrasebook
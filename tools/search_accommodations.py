@@ -1,10 +1,24 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 from smolagents.tools import Tool
-from duckduckgo_search import DDGS
+import threading
+from tools.accommodation_records import Accommodation, filter_records, parse_results
+from tools.gazetteer import normalize_place
+from tools.persistent_cache import PersistentCache
+from tools.web_search import get_ddgs
+
+# Searches that together give a broad set of places to stay at a destination; run one after
+# another, so a new destination costs two requests to the search engine
+BROAD_QUERIES = [
+    "hotels resorts {destination}",
+    "hostels guesthouses apartments {destination}",
+]
+
+# A refinement answered from cached records needs at least this many matches, otherwise it searches live
+MIN_LOCAL_MATCHES = 3
 
 class SearchAccommodationsTool(Tool):
     name = "search_accommodations"
-    description = "Searches for available accommodations at a travel destination with customizable filters like budget, style, and location."
+    description = "Searches for available accommodations at a travel destination with customizable filters like budget, style, and location. Places found for a destination are remembered, so narrowing a search (e.g. to budget hostels in one area) is answered instantly."
     inputs = {
         'destination': {'type': 'string', 'description': 'The destination city or region (e.g., "Tokyo", "Bali", "Paris")'},
         'budget': {'type': 'string', 'description': 'Price range (e.g., "budget", "mid-range", "luxury")', 'nullable': True},
@@ -21,32 +35,73 @@ class SearchAccommodationsTool(Tool):
             raise ImportError(
                 "You must install package `duckduckgo_search` to run this tool: for instance run `pip install duckduckgo-search`."
             ) from e
-        self.ddgs = DDGS()
         self.max_results = max_results
 
+        # Structured records per destination, so refinements are filtered locally
+        self.records = PersistentCache("accommodations", default_ttl=24 * 3600, max_entries=2000)
+        self.lock = threading.Lock()
+        # One broad fetch at a time per destination; concurrent callers wait for it and reuse the result.
+        # Only destinations being fetched have a lock
+        self.fetch_locks: Dict[str, threading.Lock] = {}
+
+    def _broad_search(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Results of one broad query, or None if it failed."""
+        try:
+            return get_ddgs().text(query, max_results=self.max_results * 3) or []
+        except Exception:
+            return None
+
+    def _destination_records(self, destination: str) -> List[Accommodation]:
+        key = normalize_place(destination)
+        cached = self.records.get(key)
+        if cached is not None:
+            return [Accommodation(*record) for record in cached]
+
+        with self.lock:
+            fetch_lock = self.fetch_locks.setdefault(key, threading.Lock())
+        try:
+            with fetch_lock:
+                # Another thread may have fetched the destination while we waited
+                cached = self.records.get(key)
+                if cached is not None:
+                    return [Accommodation(*record) for record in cached]
+
+                # A failed query leaves the others' results; the records are only remembered when all succeeded
+                answers = [self._broad_search(query.format(destination=destination)) for query in BROAD_QUERIES]
+                records = parse_results([result for answer in answers if answer for result in answer], destination)
+                if records and all(answer is not None for answer in answers):
+                    self.records.set(key, [list(record) for record in records])
+                return records
+        finally:
+            with self.lock:
+                if self.fetch_locks.get(key) is fetch_lock:
+                    del self.fetch_locks[key]
+
+    def _live_records(self, destination: str, budget: Optional[str], style: Optional[str], location: Optional[str]) -> List[Accommodation]:
+        # Construct a search query based on the parameters
+        query = f"accommodations {destination}"
+        if budget:
+            query += f" {budget} price"
+        if style:
+            query += f" {style}"
+        if location:
+            query += f" in {location}"
+        return parse_results(get_ddgs().text(query, max_results=self.max_results) or [], destination)
+
     def forward(self, destination: str, budget: Optional[str] = None, style: Optional[str] = None, location: Optional[str] = None) -> str:
         try:
-            # Construct a search query based on the parameters
-            query = f"accommodations {destination}"
-            
-            if budget:
-                query += f" {budget} price"
-            
-            if style:
-                query += f" {style}"
-            
-            if location:
-                query += f" in {location}"
-            
-            # Execute the search
-            results = self.ddgs.text(query, max_results=self.max_results)
-            
-            if not results:
+            # Refinements of a destination already searched are answered from its cached records
+            records = filter_records(self._destination_records(destination), budget, style, location)
+            if len(records) < MIN_LOCAL_MATCHES:
+                records = self._live_records(destination, budget, style, location)
+            records = records[:self.max_results]
+
+            if not records:
                 return f"No accommodation results found for {destination}. Try adjusting your search parameters."
-            
+
             # Format the results
             formatted_results = f"🏨 **Accommodation Options in {destination}**\n\n"
-            
+
             # Add search parameters if provided
             search_params = []
             if budget:
@@ -55,23 +110,22 @@ class SearchAccommodationsTool(Tool):
                 search_params.append(f"Type: {style}")
             if location:
                 search_params.append(f"Area: {location}")
-            
+
             if search_params:
                 formatted_results += "Search filters: " + ", ".join(search_params) + "\n\n"
-            
+
             # Format each result
-            for i, result in enumerate(results, 1):
-                title = result.get('title', 'Unnamed Accommodation')
-                url = result.get('href', '#')
-                snippet = result.get('body', 'No description available')
-                
-                formatted_results += f"### {i}. {title}\n"
-                formatted_results += f"{snippet}\n"
-                formatted_results += f"[View Details]({url})\n\n"
-            
+            for i, record in enumerate(records, 1):
+                details = [record.kind.capitalize() if record.kind else None, record.tier, record.area]
+                formatted_results += f"### {i}. {record.name}\n"
+                if any(details):
+                    formatted_results += " · ".join(detail for detail in details if detail) + "\n"
+                formatted_results += f"{record.snippet or 'No description available'}\n"
+                formatted_results += f"[View Details]({record.url})\n\n"
+
             formatted_results += "Note: These are search results. For accurate pricing and availability, check the official websites or booking platforms."
-            
+
             return formatted_results
-            
+
         except Exception as e:
             return f"Error searching for accommodations: {str(e)}"
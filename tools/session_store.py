@@ -0,0 +1,211 @@
+from dataclasses import fields, is_dataclass, replace
+from typing import Any, Dict, List, NamedTuple, Optional
+import io
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from smolagents.memory import TaskStep
+from smolagents.utils import AgentError
+from tools.cache_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Compressed size allowed per session; older turns are dropped to fit
+SESSION_MAX_BYTES = int(os.environ.get("JOURNI_SESSION_MAX_BYTES", str(2 * 1024 * 1024)))
+# Compressed size of all sessions together; the least recently active are evicted beyond it
+STORE_MAX_BYTES = int(os.environ.get("JOURNI_SESSION_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Sessions untouched for this long are deleted
+SESSION_TTL = float(os.environ.get("JOURNI_SESSION_TTL", str(30 * 24 * 3600)))
+
+
+class Session(NamedTuple):
+    # Chat messages as {"role", "content", "metadata"} dicts
+    history: List[Dict[str, Any]]
+    # The coordinator's memory steps, restored before its next run
+    steps: list
+    # Full text of shortened observations, as kept by ObservationStore
+    observations: Dict[str, bytes]
+
+
+def _restore_error(cls, message):
+    error = cls.__new__(cls)
+    Exception.__init__(error, message)
+    error.message = message
+    return error
+
+
+class _StepPickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        # AgentError needs a logger to be constructed, so it is rebuilt from its message
+        if isinstance(obj, AgentError):
+            return _restore_error, (type(obj), obj.message)
+        return NotImplemented
+
+
+def _compact(step):
+    """`step` without the prompt it was generated from, which is rebuilt from memory anyway and is most of its size."""
+    if is_dataclass(step) and any(field.name == "model_input_messages" for field in fields(step)):
+        return replace(step, model_input_messages=None)
+    return step
+
+
+def _pickles(obj) -> bool:
+    try:
+        _StepPickler(io.BytesIO(), protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+        return True
+    except Exception:
+        return False
+
+
+def _picklable_steps(steps: list) -> list:
+    """
+    `steps` with whatever cannot be pickled left out (e.g. an open handle in an
+    action output): first the step's outputs, and only if that is not enough the step.
+    """
+    kept = []
+    for index, step in enumerate(steps):
+        if _pickles(step):
+            kept.append(step)
+            continue
+        names = {field.name for field in fields(step)} if is_dataclass(step) else set()
+        dropped = {}
+        for name in ("action_output", "observations_images"):
+            if name in names:
+                dropped[name] = None
+                if _pickles(replace(step, **dropped)):
+                    logger.warning("Session step %d: left out %s, which cannot be saved", index, " and ".join(dropped))
+                    kept.append(replace(step, **dropped))
+                    break
+        else:
+            logger.warning("Session step %d (%s) cannot be saved and is left out", index, type(step).__name__)
+    return kept
+
+
+def _run_starts(steps: list) -> List[int]:
+    return [i for i, step in enumerate(steps) if isinstance(step, TaskStep)]
+
+
+class SessionStore:
+    """
+    Chat sessions on local disk, so a reconnecting user (or a restarted app)
+    picks up the conversation where it was.
+
+    Each session is one zlib-compressed pickle of its chat history, the
+    coordinator's memory steps and its shortened observations. Restoring the
+    steps lets the agent carry on with full context without running any
+    earlier model call again. A session larger than `session_max_bytes` loses
+    its oldest observations, then its oldest runs, then its oldest messages;
+    beyond `store_max_bytes` in total, the least recently active sessions are
+    evicted. Safe to share between threads.
+    """
+
+    # Global eviction runs once every this many saves
+    evict_every = 20
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        session_max_bytes: int = SESSION_MAX_BYTES,
+        store_max_bytes: int = STORE_MAX_BYTES,
+        ttl: Optional[float] = SESSION_TTL,
+    ):
+        self.path = path or os.path.join(get_cache_dir(), "sessions.sqlite3")
+        self.session_max_bytes = session_max_bytes
+        self.store_max_bytes = store_max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.saves = 0
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id TEXT PRIMARY KEY, data BLOB NOT NULL,"
+                " size INTEGER NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+
+    def load(self, session_id: str) -> Optional[Session]:
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT data, updated_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None or (self.ttl is not None and row[1] <= time.time() - self.ttl):
+            return None
+        try:
+            return Session(*pickle.loads(zlib.decompress(row[0])))
+        except Exception:
+            # Written by an incompatible version: start over rather than fail the chat
+            self.delete(session_id)
+            return None
+
+    def save(self, session_id: str, session: Session) -> int:
+        """Store `session`, trimmed to the per-session limit. Returns its compressed size."""
+        data = self._encode(session)
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, size, updated_at) VALUES (?, ?, ?, ?)",
+                (session_id, data, len(data), now),
+            )
+            self.saves += 1
+            if self.saves % self.evict_every == 0:
+                self._evict(now)
+        return len(data)
+
+    def delete(self, session_id: str):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def _encode(self, session: Session) -> bytes:
+        history, steps, observations = list(session.history), [_compact(step) for step in session.steps], dict(session.observations)
+        if not _pickles(steps):
+            steps = _picklable_steps(steps)
+        while True:
+            data = self._dump(history, steps, observations)
+            if len(data) <= self.session_max_bytes:
+                return data
+            runs = _run_starts(steps)
+            if observations:
+                # Keep the newer half, rounded down so the last one goes too
+                kept = list(observations.items())
+                observations = dict(kept[len(kept) - len(kept) // 2:])
+            elif len(runs) > 1:
+                steps = steps[runs[1]:]
+            elif len(history) > 1:
+                history = history[len(history) // 2:]
+            else:
+                # Even a single run does not fit: keep the messages, the agent starts afresh
+                return self._dump(history, [], {})
+
+    @staticmethod
+    def _dump(history, steps, observations) -> bytes:
+        buffer = io.BytesIO()
+        _StepPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump((history, steps, observations))
+        return zlib.compress(buffer.getvalue())
+
+    def _evict(self, now: float):
+        if self.ttl is not None:
+            self.connection.execute("DELETE FROM sessions WHERE updated_at <= ?", (now - self.ttl,))
+        # Keep the most recently active sessions whose sizes add up to the limit
+        self.connection.execute(
+            "DELETE FROM sessions WHERE id IN ("
+            " SELECT id FROM (SELECT id, SUM(size) OVER (ORDER BY updated_at DESC) AS total FROM sessions)"
+            " WHERE total > ?)",
+            (self.store_max_bytes,),
+        )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Process-wide store under Journi's cache dir."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore()
+        return _store
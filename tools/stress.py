@@ -0,0 +1,227 @@
+"""
+Concurrency stress test for the tool layer.
+
+    python -m tools.stress [--threads 16] [--rounds 20]
+
+Every tool is called from many threads at once, the way parallel tool calls and
+concurrent chat sessions share the instances built by `initialize_tools()`.
+Network access is replaced by deterministic offline stubs, so each concurrent
+result must be identical to the one produced by a single-threaded run.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+import argparse
+import hashlib
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+# API keys would route tools to live services; the stress run stays offline
+API_KEY_VARIABLES = ["WEATHER_API_KEY", "EXCHANGE_RATE_API_KEY", "VISA_API_KEY", "TRANSLATION_API_KEY", "LIBRETRANSLATE_URL"]
+
+# Clock readings differ between runs, so they are masked before comparing
+CLOCK_PATTERN = re.compile(r"\b\d{1,2}:\d{2}(?: [AP]M)?")
+
+CASES: List[Tuple[str, Dict[str, Any]]] = [
+    ("final_answer", {"answer": "Pack light and enjoy Lisbon!"}),
+    ("add_answer_section", {"title": "Weather Information", "content": "Mild and sunny, 18-24°C."}),
+    ("web_search", {"query": "best time to visit Kyoto"}),
+    ("web_search", {"query": "Lisbon tram 28 tips"}),
+    ("visit_webpage", {"url": "https://example.com/kyoto"}),
+    ("visit_webpage", {"url": "https://example.org/lisbon", "question": "when do trams run"}),
+    ("visit_webpages", {"urls": ["https://example.com/a", "https://example.com/b", "https://example.net/c"]}),
+    ("generate_image", {"prompt": "Kyoto"}),
+    ("generate_image", {"prompt": "Lisbon"}),
+    ("get_local_time", {"destination": "Tokyo"}),
+    ("get_local_time", {"destination": "São Paulo"}),
+    ("get_world_clock", {"destinations": ["Tokyo", "Bangkok", "Sydney"], "home": "London"}),
+    ("get_weather_forecast", {"destination": "Paris", "days": 3}),
+    ("get_weather_forecast", {"destination": "Reykjavik", "days": 5}),
+    ("get_weather_forecast", {"destination": "Bali", "when": "July"}),
+    ("convert_currency", {"amount": 250, "from_currency": "USD", "to_currency": "JPY"}),
+    ("convert_currency", {"amount": 99.5, "from_currency": "EUR", "to_currency": "GBP"}),
+    ("convert_budget", {"expenses": ["flights 800 USD", "hotel 120 EUR/night x5", "JR pass 50,000 JPY"], "target_currency": "GBP"}),
+    ("convert_budget", {"expenses": ["7 day JR pass 50,000 JPY", "3 day metro card 20 EUR", "5 day rail pass 300 CHF"], "target_currency": "USD"}),
+    ("translate_phrase", {"text": "thank you", "language": "Japanese"}),
+    ("translate_phrase", {"text": "where is the bathroom", "language": "Spanish"}),
+    ("translate_phrases", {"phrases": ["hello", "the bill please", "do you speak English?", "where is the nearest pharmacy"], "language": "Thai"}),
+    ("get_visa_requirements", {"nationality": "US", "destination": "Japan"}),
+    ("get_visa_requirements", {"nationality": "Kenya", "destination": "Western Sahara"}),
+    ("search_accommodations", {"destination": "Lisbon", "budget": "mid-range", "style": "hotel"}),
+]
+
+
+class FakeDDGS:
+    """Offline DuckDuckGo client that fails loudly if one instance is shared between threads."""
+
+    def __init__(self, **kwargs):
+        self.owner = threading.get_ident()
+
+    def text(self, query: str, max_results: int = 10, **kwargs) -> List[Dict[str, str]]:
+        if threading.get_ident() != self.owner:
+            raise RuntimeError("DDGS client shared between threads")
+        time.sleep(0.001)
+        digest = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        return [
+            {"title": f"Result {i} for {query}", "href": f"https://example.com/{digest[:8]}/{i}", "body": f"Snippet {digest[i:i + 12]} about {query}."}
+            for i in range(min(max_results or 10, 5))
+        ]
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, url: str):
+        self.url = url
+        self.text = (
+            f"<html><body><h1>{url}</h1>"
+            + "".join(f"<p>Paragraph {i} of {url}: trams run every {i + 5} minutes in summer.</p>" for i in range(20))
+            + "</body></html>"
+        )
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {}
+
+
+def fake_get(url: str, *args, **kwargs) -> FakeResponse:
+    time.sleep(0.002)
+    return FakeResponse(url)
+
+
+class FakeImageService:
+    """Writes a small deterministic PNG per prompt instead of calling the image Space."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def __call__(self, prompt: str) -> str:
+        from PIL import Image
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        path = os.path.join(self.directory, f"{digest[:16]}-{threading.get_ident()}.png")
+        Image.new("RGB", (64, 48), tuple(bytes.fromhex(digest[:6]))).save(path)
+        return path
+
+
+def install_stubs(directory: str):
+    """Route every network dependency of the tools to the offline stubs."""
+    import duckduckgo_search
+    import requests
+
+    for variable in API_KEY_VARIABLES:
+        os.environ.pop(variable, None)
+    duckduckgo_search.DDGS = FakeDDGS
+    requests.get = fake_get
+
+
+def build_tools(directory: str) -> Dict[str, Any]:
+    """The same tool set as app.initialize_tools(), with image rendering stubbed."""
+    from tools.add_answer_section import AddAnswerSectionTool
+    from tools.convert_budget import ConvertBudgetTool
+    from tools.convert_currency import ConvertCurrencyTool
+    from tools.final_answer_tool import FinalAnswerTool
+    from tools.generate_image_tool import GenerateImageTool
+    from tools.get_local_time import GetLocalTimeTool
+    from tools.get_visa_requirements import GetVisaRequirementsTool
+    from tools.get_weather_forecast import GetWeatherForecastTool
+    from tools.get_world_clock import GetWorldClockTool
+    from tools.image_cache import ImageCache
+    from tools.search_accommodations import SearchAccommodationsTool
+    from tools.translate_phrase import TranslatePhraseTool
+    from tools.translate_phrases import TranslatePhrasesTool
+    from tools.visit_webpage import VisitWebpageTool
+    from tools.visit_webpages import VisitWebpagesTool
+    from tools.web_search import DuckDuckGoSearchTool
+
+    image_tool = GenerateImageTool(cache=ImageCache(directory=os.path.join(directory, "images")), background=False)
+    renders = os.path.join(directory, "renders")
+    os.makedirs(renders, exist_ok=True)
+    image_tool.image_generator = FakeImageService(renders)
+
+    return {
+        'final_answer': FinalAnswerTool(),
+        'add_answer_section': AddAnswerSectionTool(),
+        'web_search': DuckDuckGoSearchTool(max_results=5),
+        'visit_webpage': VisitWebpageTool(),
+        'visit_webpages': VisitWebpagesTool(),
+        'generate_image': image_tool,
+        'get_local_time': GetLocalTimeTool(),
+        'get_world_clock': GetWorldClockTool(),
+        'get_weather_forecast': GetWeatherForecastTool(),
+        'convert_currency': ConvertCurrencyTool(),
+        'convert_budget': ConvertBudgetTool(),
+        'translate_phrase': TranslatePhraseTool(),
+        'translate_phrases': TranslatePhrasesTool(),
+        'get_visa_requirements': GetVisaRequirementsTool(),
+        'search_accommodations': SearchAccommodationsTool(max_results=8),
+    }
+
+
+def describe(result: Any) -> str:
+    """A comparable string for a tool result (images compare by file path)."""
+    if hasattr(result, "to_string"):
+        result = result.to_string()
+    return CLOCK_PATTERN.sub("<time>", str(result))
+
+
+def call(tools: Dict[str, Any], case: Tuple[str, Dict[str, Any]]) -> str:
+    name, arguments = case
+    try:
+        return describe(tools[name](**arguments))
+    except Exception as e:
+        return f"<{type(e).__name__}: {e}>"
+
+
+def run(threads: int, rounds: int, seed: int = 0) -> int:
+    """Hammer every tool concurrently; returns the number of mismatched results."""
+    tools = build_tools(os.environ["JOURNI_CACHE_DIR"])
+
+    # Single-threaded reference results (this also warms the shared caches and indexes)
+    expected = [call(tools, case) for case in CASES]
+
+    schedule = [i for i in range(len(CASES)) for _ in range(rounds)]
+    random.Random(seed).shuffle(schedule)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="stress") as pool:
+        results = list(pool.map(lambda i: (i, call(tools, CASES[i])), schedule))
+    elapsed = time.perf_counter() - started
+
+    mismatches: Dict[int, str] = {}
+    for i, result in results:
+        if result != expected[i]:
+            mismatches.setdefault(i, result)
+
+    print(f"{len(results)} calls to {len(tools)} tools from {threads} threads in {elapsed:.2f}s")
+    for i, result in sorted(mismatches.items()):
+        name, arguments = CASES[i]
+        print(f"\nMISMATCH {name}({arguments})")
+        print(f"  expected: {expected[i][:300]!r}")
+        print(f"  got:      {result[:300]!r}")
+    print("\nOK: all results deterministic" if not mismatches else f"\nFAILED: {len(mismatches)} case(s) differ")
+    return len(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Call every Journi tool from many threads and check the results are deterministic.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20, help="Calls per test case")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the call order")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="journi-stress-") as directory:
+        # Keep the stress run's caches away from the real ones
+        os.environ["JOURNI_CACHE_DIR"] = directory
+        install_stubs(directory)
+        sys.exit(1 if run(args.threads, args.rounds, args.seed) else 0)
+
+
+if __name__ == "__main__":
+    main()
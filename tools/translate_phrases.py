@@ -0,0 +1,43 @@
+from typing import List
+from tools.translate_phrase import TranslatePhraseTool
+
+class TranslatePhrasesTool(TranslatePhraseTool):
+    name = "translate_phrases"
+    description = "Translates a list of travel phrases into one local language in a single call, with pronunciation guides where available. Use this instead of calling translate_phrase for each phrase, e.g. for a set of essential phrases."
+    inputs = {
+        'phrases': {'type': 'array', 'description': 'Phrases to translate (e.g., ["hello", "thank you", "where is the train station?"])'},
+        'language': {'type': 'string', 'description': 'Target language (e.g., "Spanish", "Japanese", "French")'}
+    }
+    output_type = "string"
+
+    def forward(self, phrases: List[str], language: str) -> str:
+        try:
+            if isinstance(phrases, str):
+                phrases = phrases.split("\n")
+            # Keep the order given by the caller but drop duplicates and blanks
+            phrases = list(dict.fromkeys(p.strip() for p in phrases if p and p.strip()))
+            if not phrases:
+                return "No phrases were given to translate."
+
+            resolved, translations = self.translate_all(phrases, language)
+            if resolved is None or (resolved.code not in self.phrasebook.languages and not any(t.translated is not None for t in translations)):
+                return self._unsupported(language)
+
+            lines = [f"🗣️ Phrases in {resolved.name}:\n"]
+            missing = []
+            for translation in translations:
+                if translation.translated is not None:
+                    lines.append(f"• {translation.text}: {translation.translated}")
+                elif translation.phrases:
+                    text = " ".join(entry["text"] for _, entry in translation.phrases)
+                    pronunciation = " / ".join(entry["pronunciation"] for _, entry in translation.phrases)
+                    lines.append(f"• {translation.text}: {text}, pronounced {pronunciation}")
+                else:
+                    missing.append(translation.text)
+
+            if missing:
+                lines.append("\nNo translation available for: " + "; ".join(missing))
+            return "\n".join(lines)
+
+        except Exception as e:
+            return f"Error translating phrases: {str(e)}"
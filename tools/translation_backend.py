@@ -0,0 +1,136 @@
+"""
+LibreTranslate client used by the translation tools.
+
+The server is https://libretranslate.de unless LIBRETRANSLATE_URL points to
+another instance, e.g. a self-hosted one or the offline stand-in started with
+
+    python -m tools.translation_backend [--port 5000]
+
+and LIBRETRANSLATE_URL=http://localhost:5000.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+import argparse
+import json
+import os
+import threading
+import requests
+from tools.persistent_cache import PersistentCache
+
+DEFAULT_URL = "https://libretranslate.de"
+
+# Translations kept on disk; the least recently used are evicted beyond this many
+CACHE_ENTRIES = int(os.environ.get("JOURNI_TRANSLATION_CACHE_ENTRIES", "50000"))
+
+
+def cache_key(text: str, target: str) -> str:
+    """'  Where is the pharmacy? ' into 'es' -> 'es|where is the pharmacy'"""
+    return f"{target}|{' '.join(text.casefold().split()).strip(' .!?¿¡')}"
+
+
+class TranslationBackend:
+    """
+    Translates a batch of texts in one `/translate` request.
+
+    LibreTranslate accepts a list for `q` and answers with a list of the same
+    length, so any number of phrases costs a single round trip. Translations are
+    cached on disk by normalized text and target language, so only texts no
+    user has asked for before are sent. The public instance needs
+    TRANSLATION_API_KEY; a server set with LIBRETRANSLATE_URL is used with or
+    without a key.
+    """
+
+    def __init__(self, url: Optional[str] = None, api_key: Optional[str] = None, timeout: float = 10, cache: Optional[PersistentCache] = None):
+        url = url or os.environ.get("LIBRETRANSLATE_URL")
+        self.url = (url or DEFAULT_URL).rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.enabled = bool(url or api_key)
+        self.cache = cache or PersistentCache("translations", max_entries=CACHE_ENTRIES)
+
+    def translate(self, texts: List[str], target: str, source: str = "auto") -> List[str]:
+        """Translations of `texts` into the ISO 639-1 language `target`, in the same order."""
+        keys = [cache_key(text, target) for text in texts]
+        translations = {key: self.cache.get(key) for key in set(keys)}
+
+        # One request for every text not in the cache, each sent once
+        missing = list({key: text for key, text in zip(keys, texts) if translations[key] is None}.items())
+        if missing:
+            fetched = self._request([text for _, text in missing], target, source)
+            for (key, _), translated in zip(missing, fetched):
+                translations[key] = translated
+                self.cache.set(key, translated)
+        return [translations[key] for key in keys]
+
+    def _request(self, texts: List[str], target: str, source: str) -> List[str]:
+        payload = {"q": texts, "source": source, "target": target, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+
+        response = requests.post(f"{self.url}/translate", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        translated = response.json().get("translatedText")
+        if isinstance(translated, str):
+            translated = [translated]
+        if not isinstance(translated, list) or len(translated) != len(texts):
+            raise ValueError(f"unexpected response from {self.url}")
+        return translated
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_translation_backend() -> TranslationBackend:
+    """Process-wide backend using LIBRETRANSLATE_URL and TRANSLATION_API_KEY."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = TranslationBackend(api_key=os.environ.get("TRANSLATION_API_KEY"))
+        return _backend
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers LibreTranslate's `/translate` offline: phrasebook entries when they match, tagged echoes otherwise."""
+
+    def do_POST(self):
+        from tools.phrasebook import get_phrasebook
+
+        if self.path.rstrip("/") != "/translate":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        target = payload.get("target", "")
+        texts = payload.get("q", "")
+
+        phrasebook = get_phrasebook()
+        translated = []
+        for text in texts if isinstance(texts, list) else [texts]:
+            matches = phrasebook.match(text) if target in phrasebook.languages else []
+            if phrasebook.covers(text, matches):
+                translated.append(" ".join(phrasebook.translations[m.phrase][target]["text"] for m in matches))
+            else:
+                translated.append(f"[{target}] {text}")
+
+        body = json.dumps({"translatedText": translated if isinstance(texts, list) else translated[0]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an offline stand-in for a LibreTranslate server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    print(f"Stand-in translation server on http://{args.host}:{args.port} (set LIBRETRANSLATE_URL to use it)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from typing import Dict, NamedTuple, Optional
+import json
+import os
+import re
+import threading
+import numpy as np
+from tools.gazetteer import get_gazetteer, normalize_place
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Words around a country name in free-text input: "US citizens", "holder of a French passport"
+FILLER_PATTERN = re.compile(r"\b(?:citizens?|nationals?|passports?|holders?|of|a|an|the|from|with|residents?|people)\b")
+
+
+class VisaRequirement(NamedTuple):
+    # One of the categories in visa_index.json: "visa free", "eta", "e-visa", "visa required"...
+    category: str
+    # Maximum stay in days, if known
+    days: Optional[int] = None
+
+
+class VisaMatrix:
+    """
+    Compiled passport x destination visa requirements, indexed by ISO-3166 code.
+
+    The matrix (built by tools/data/build_visa_matrix.py) is a uint8 file that is
+    memory-mapped rather than read, so only the pages for the pairs looked up
+    are ever loaded. Country names, ISO-2/3 codes and demonyms resolve to a row
+    through the alias index stored next to it.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        with open(os.path.join(data_dir, "visa_index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        self.codes = index["codes"]
+        self.rows: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        self.names: Dict[str, str] = index["names"]
+        self.aliases: Dict[str, str] = index["aliases"]
+        self.categories = index["categories"]
+        self.durations = index["durations"]
+
+        size = len(self.codes)
+        # Plane 0: requirement category, plane 1: index into `durations`
+        self.matrix = np.memmap(os.path.join(data_dir, "visa_matrix.u8"), dtype=np.uint8, mode="r", shape=(2, size, size))
+
+    def resolve(self, country: str) -> Optional[str]:
+        """ISO-2 code for a country name, code or demonym ('UK', 'German', 'Côte d'Ivoire'), or None."""
+        key = normalize_place(country)
+        if key in self.aliases:
+            return self.aliases[key]
+        key = " ".join(FILLER_PATTERN.sub(" ", key).split())
+        if key in self.aliases:
+            return self.aliases[key]
+        # A city or region: the country it is in ("Bali" -> ID)
+        place = get_gazetteer().lookup(country)
+        if place is not None and place.country in self.rows:
+            return place.country
+        return None
+
+    def name(self, code: str) -> str:
+        return self.names.get(code, code)
+
+    def lookup(self, passport: str, destination: str) -> Optional[VisaRequirement]:
+        """Requirement for an ISO-2 passport/destination pair, or None if the pair isn't covered."""
+        i, j = self.rows.get(passport), self.rows.get(destination)
+        if i is None or j is None:
+            return None
+        category, duration = int(self.matrix[0, i, j]), int(self.matrix[1, i, j])
+        if category == 0:
+            return None
+        return VisaRequirement(self.categories[category], self.durations[duration] or None)
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_visa_matrix() -> VisaMatrix:
+    """Process-wide visa matrix, mapped on first use."""
+    global _matrix
+    if _matrix is None:
+        with _matrix_lock:
+            if _matrix is None:
+                _matrix = VisaMatrix()
+    return _matrix
@@ -1,16 +1,53 @@
 from typing import Any, Optional
 from smolagents.tools import Tool
+import re
 import requests
 import markdownify
 import smolagents
+from tools.passage_ranker import rank_passages
+
+
+def fetch_page_markdown(url: str, timeout: float = 20) -> str:
+    """Fetch a webpage and convert its HTML content to Markdown."""
+    from markdownify import markdownify
+
+    # Send a GET request to the URL with the given timeout
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()  # Raise an exception for bad status codes
+
+    # Convert the HTML content to Markdown
+    markdown_content = markdownify(response.text).strip()
+
+    # Remove multiple line breaks
+    return re.sub(r"\n{3,}", "\n\n", markdown_content)
+
+
+def render_page(markdown_content: str, question: Optional[str] = None, top_k: int = 5, max_length: int = 10000) -> str:
+    """Truncate a converted page, or reduce it to the passages relevant to `question`."""
+    from smolagents.utils import truncate_content
+
+    # Only return the passages relevant to the question, if one was asked
+    if question and question.strip():
+        passages = rank_passages(markdown_content, question, top_k=top_k)
+        if passages:
+            return truncate_content(f"Most relevant passages for: {question}\n\n{passages}", max_length)
+
+    return truncate_content(markdown_content, max_length)
+
 
 class VisitWebpageTool(Tool):
     name = "visit_webpage"
-    description = "Visits a webpage at the given url and reads its content as a markdown string. Use this to browse webpages."
-    inputs = {'url': {'type': 'string', 'description': 'The url of the webpage to visit.'}}
+    description = "Visits a webpage at the given url and reads its content as a markdown string. Use this to browse webpages. Pass a question to get only the most relevant passages of the page instead of its beginning."
+    inputs = {
+        'url': {'type': 'string', 'description': 'The url of the webpage to visit.'},
+        'question': {'type': 'string', 'description': 'Optional question; if given, only the passages of the page most relevant to it are returned.', 'nullable': True}
+    }
     output_type = "string"
 
-    def forward(self, url: str) -> str:
+    # Number of passages returned when a question is given
+    top_k = 5
+
+    def forward(self, url: str, question: Optional[str] = None) -> str:
         try:
             import requests
             from markdownify import markdownify
@@ -22,17 +59,8 @@ class VisitWebpageTool(Tool):
                 "You must install packages `markdownify` and `requests` to run this tool: for instance run `pip install markdownify requests`."
             ) from e
         try:
-            # Send a GET request to the URL with a 20-second timeout
-            response = requests.get(url, timeout=20)
-            response.raise_for_status()  # Raise an exception for bad status codes
-
-            # Convert the HTML content to Markdown
-            markdown_content = markdownify(response.text).strip()
-
-            # Remove multiple line breaks
-            markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
-
-            return truncate_content(markdown_content, 10000)
+            markdown_content = fetch_page_markdown(url, timeout=20)
+            return render_page(markdown_content, question, top_k=self.top_k)
 
         except requests.exceptions.Timeout:
             return "The request timed out. Please try again later or check the URL."
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional
+from smolagents.tools import Tool
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import threading
+import time
+import requests
+from tools.visit_webpage import fetch_page_markdown, render_page
+
+class VisitWebpagesTool(Tool):
+    name = "visit_webpages"
+    description = "Visits several webpages at once and returns the markdown content of each, with a per-URL status. Use this instead of calling visit_webpage repeatedly, e.g. to read the top results of a web search in one step."
+    inputs = {
+        'urls': {'type': 'array', 'description': 'The list of urls to visit.'},
+        'question': {'type': 'string', 'description': 'Optional question; if given, only the passages of each page most relevant to it are returned.', 'nullable': True}
+    }
+    output_type = "string"
+
+    def __init__(self, max_workers=8, per_host_limit=2, deadline=25, max_length_per_page=4000):
+        super().__init__()
+        self.per_host_limit = per_host_limit
+        self.deadline = deadline
+        self.max_length_per_page = max_length_per_page
+        # Shared pool: requests that miss the deadline keep running here without blocking the caller
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="visit_webpages")
+        self.host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self.host_lock = threading.Lock()
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self.host_lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self.host_semaphores[host]
+
+    def _fetch(self, url: str, deadline_at: float) -> str:
+        # Limit connections per host so one slow site can't hog the pool
+        with self._host_semaphore(url):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("deadline reached before the request started")
+            return fetch_page_markdown(url, timeout=min(20, remaining))
+
+    def forward(self, urls: List[str], question: Optional[str] = None) -> str:
+        try:
+            if isinstance(urls, str):
+                urls = [urls]
+
+            # Keep the order given by the caller but drop duplicates and blanks
+            unique_urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+            if not unique_urls:
+                return "No urls were given to visit."
+
+            deadline_at = time.monotonic() + self.deadline
+            futures = {url: self.executor.submit(self._fetch, url, deadline_at) for url in unique_urls}
+            wait(futures.values(), timeout=self.deadline)
+
+            sections = []
+            succeeded = 0
+            for i, url in enumerate(unique_urls, 1):
+                future = futures[url]
+                if not future.done():
+                    future.cancel()
+                    status, content = "timed out", "The page did not load before the deadline."
+                else:
+                    error = future.exception()
+                    if error is None:
+                        succeeded += 1
+                        status = "ok"
+                        content = render_page(future.result(), question, max_length=self.max_length_per_page)
+                    elif isinstance(error, (requests.exceptions.Timeout, TimeoutError)):
+                        status, content = "timed out", "The request timed out."
+                    else:
+                        status, content = "error", f"Error fetching the webpage: {str(error)}"
+
+                sections.append(f"## [{i}] {url} ({status})\n\n{content}")
+
+            header = f"Visited {len(unique_urls)} pages: {succeeded} ok, {len(unique_urls) - succeeded} failed or timed out."
+            return header + "\n\n" + "\n\n".join(sections)
+
+        except Exception as e:
+            return f"An unexpected error occurred: {str(e)}"
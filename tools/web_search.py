@@ -1,6 +1,18 @@
 from typing import Any, Optional
 from smolagents.tools import Tool
 import duckduckgo_search
+import threading
+
+_local = threading.local()
+
+
+def get_ddgs():
+    """This thread's default DuckDuckGo client, for tools that search without their own settings."""
+    # DDGS keeps an HTTP session that must not be shared: one client per thread
+    if getattr(_local, "ddgs", None) is None:
+        _local.ddgs = duckduckgo_search.DDGS()
+    return _local.ddgs
+
 
 class DuckDuckGoSearchTool(Tool):
     name = "web_search"
@@ -17,10 +29,17 @@ class DuckDuckGoSearchTool(Tool):
             raise ImportError(
                 "You must install package `duckduckgo_search` to run this tool: for instance run `pip install duckduckgo-search`."
             ) from e
-        self.ddgs = DDGS(**kwargs)
+        # DDGS keeps an HTTP session that must not be shared: one client per thread
+        self.ddgs_kwargs = kwargs
+        self.local = threading.local()
+
+    def _get_ddgs(self):
+        if getattr(self.local, "ddgs", None) is None:
+            self.local.ddgs = duckduckgo_search.DDGS(**self.ddgs_kwargs)
+        return self.local.ddgs
 
     def forward(self, query: str) -> str:
-        results = self.ddgs.text(query, max_results=self.max_results)
+        results = self._get_ddgs().text(query, max_results=self.max_results)
         if len(results) == 0:
             raise Exception("No results found! Try a less restrictive/shorter query.")
         postprocessed_results = [f"[{result['title']}]({result['href']})\n{result['body']}" for result in results]